@@ -0,0 +1,208 @@
+import asyncio
+import json
+import random
+import struct
+import threading
+import time
+
+from server_list_ping import _pack_string, _packet, _read_packet
+
+RCON_LOGIN = 3
+RCON_COMMAND = 2
+RCON_RESPONSE = 0
+RCON_AUTH_RESPONSE = 2
+# Ванильный сервер режет ответ на пакеты по 4096 байт
+RCON_CHUNK = 4096
+
+DEFAULT_STATUS = {
+    "version": {"name": "1.21.1", "protocol": 767},
+    "players": {
+        "max": 20,
+        "online": 2,
+        "sample": [{"name": "Alex", "id": "1"}, {"name": "Steve", "id": "2"}],
+    },
+    "description": {"text": "Benchmark server"},
+}
+
+
+def _rcon_packet(request_id: int, packet_type: int, body: str = "") -> bytes:
+    payload = struct.pack("<ii", request_id, packet_type) + body.encode() + b"\0\0"
+    return struct.pack("<i", len(payload)) + payload
+
+
+class FakeRconServer:
+    """
+    RCON-сервер на asyncio, отвечающий как ванильный Minecraft: длинные
+    ответы режутся на пакеты, на пакет неизвестного типа приходит
+    "Unknown request".
+
+    latency - задержка перед каждым ответом на команду (секунды);
+    failure_rate - доля команд, на которые сервер вместо ответа закрывает
+    соединение (как при перезапуске). Ответы на известные команды
+    формируются в respond(); игровое время идёт со скоростью 20 TPS.
+    """
+
+    def __init__(
+        self,
+        password: str = "bench",
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.password = password
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.commands = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._started = time.monotonic()
+        self._server = None
+        self._writers = set()
+
+    def respond(self, command: str) -> str:
+        match command:
+            case "time query daytime":
+                return f"The time is {self._gametime() % 24000}"
+            case "time query gametime":
+                return f"The time is {self._gametime()}"
+            case "gamerule doDaylightCycle":
+                return "Gamerule doDaylightCycle is currently set to: true"
+            case "list":
+                return "There are 2 of a max of 20 players online: Alex, Steve"
+            case "difficulty":
+                return "The difficulty is Normal"
+            case "help":
+                return "".join(f"/command{i} <args>\n" for i in range(600))
+        return ""
+
+    def _gametime(self) -> int:
+        return int((time.monotonic() - self._started) * 20)
+
+    async def _handle(self, reader, writer):
+        authenticated = False
+        self._writers.add(writer)
+        try:
+            while True:
+                (length,) = struct.unpack("<i", await reader.readexactly(4))
+                payload = await reader.readexactly(length)
+                request_id, packet_type = struct.unpack("<ii", payload[:8])
+                body = payload[8:-2].decode()
+                if packet_type == RCON_LOGIN:
+                    authenticated = body == self.password
+                    reply_id = request_id if authenticated else -1
+                    writer.write(_rcon_packet(reply_id, RCON_AUTH_RESPONSE))
+                elif packet_type == RCON_COMMAND and authenticated:
+                    self.commands += 1
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    if self._random.random() < self.failure_rate:
+                        self.failures += 1
+                        return
+                    text = self.respond(body)
+                    for start in range(0, max(len(text), 1), RCON_CHUNK):
+                        chunk = text[start : start + RCON_CHUNK]
+                        writer.write(_rcon_packet(request_id, RCON_RESPONSE, chunk))
+                elif packet_type != RCON_COMMAND:
+                    writer.write(
+                        _rcon_packet(
+                            request_id,
+                            RCON_RESPONSE,
+                            f"Unknown request {packet_type:x}",
+                        )
+                    )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        # Клиентские сессии долгоживущие: без закрытия их соединений
+        # wait_closed() ждал бы вечно.
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+
+
+class FakeMinecraftServer:
+    """
+    Игровой порт, отвечающий на Server List Ping (статус и ping/pong).
+    """
+
+    def __init__(self, status: dict | None = None, latency: float = 0.0):
+        self.status = status or DEFAULT_STATUS
+        self.latency = latency
+        self.pings = 0
+        self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            await _read_packet(reader)  # handshake
+            await _read_packet(reader)  # status request
+            self.pings += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            writer.write(_packet(0x00, _pack_string(json.dumps(self.status))))
+            await writer.drain()
+            packet_id, payload = await _read_packet(reader)
+            if packet_id == 0x01:
+                writer.write(_packet(0x01, payload))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+class FakeServers:
+    """
+    Оба фейковых сервера в отдельном потоке со своим циклом событий, чтобы
+    синхронный код (RconSession, asyncio.run в update_server_status)
+    работал с ними как с внешним процессом.
+
+        with FakeServers(FakeRconServer(latency=0.002)) as servers:
+            ServerManager("127.0.0.1", "bench", servers.rcon_port,
+                          game_port=servers.game_port)
+    """
+
+    def __init__(self, rcon: FakeRconServer | None = None, minecraft=None):
+        self.rcon = rcon or FakeRconServer()
+        self.minecraft = minecraft or FakeMinecraftServer()
+        self.rcon_port = None
+        self.game_port = None
+        self._loop = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self.rcon_port = self._loop.run_until_complete(self.rcon.start())
+        self.game_port = self._loop.run_until_complete(self.minecraft.start())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self.rcon.close())
+        self._loop.run_until_complete(self.minecraft.close())
+        self._loop.close()
+
+    def __enter__(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
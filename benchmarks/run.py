@@ -0,0 +1,331 @@
+"""
+Бенчмарки горячих путей на локальных фейковых серверах.
+
+    python -m benchmarks.run                     # все сценарии
+    python -m benchmarks.run -n 500 --latency-ms 2 --failure-rate 0.01
+    python -m benchmarks.run --compare benchmarks/results/<прошлый>.json
+
+Результаты (перцентили задержки и пропускная способность) пишутся в
+benchmarks/results/<время>-<коммит>.json для сравнения между коммитами.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.fake_servers import FakeMinecraftServer, FakeRconServer, FakeServers
+from fleet import Fleet, ServerDefinition
+from main import update_tick
+from mcommands import MCommands
+from rcon_async import AsyncRconClient
+from rcon_dispatcher import RconDispatcher
+from rcon_session import RconSession
+from server_manager import ServerManager
+from ui.view_model import UIRenderer
+
+RESULTS_DIR = Path(__file__).parent / "results"
+PASSWORD = "bench"
+
+
+class CountingAlerts:
+    """AlertWindow для бенчмарков: ошибки только считаются"""
+
+    def __init__(self):
+        self.errors = 0
+        self.error = None
+
+    def set_error(self, error: str):
+        self.errors += 1
+        self.error = error
+
+    def update_state(self):
+        pass
+
+
+class _NullPanel:
+    def update_state(self, *args):
+        pass
+
+
+class _NullPage:
+    def update(self):
+        pass
+
+
+def summarize(samples: list[float], errors: int = 0) -> dict:
+    """
+    Перцентили (мс) и пропускная способность (операций в секунду).
+    """
+    ordered = sorted(samples)
+    total = sum(ordered)
+
+    def percentile(p):
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[index] * 1000
+
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000,
+        "ops_per_sec": len(ordered) / total if total else float("inf"),
+    }
+
+
+def measure(fn, iterations: int, warmup: int = 5) -> list[float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def measure_async(fn, iterations: int, warmup: int = 5) -> list[float]:
+    for _ in range(warmup):
+        await fn()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+# ---- Сценарии ----
+
+
+def bench_update_server_status(servers: FakeServers, iterations: int) -> dict:
+    """Синхронный update_server_status: asyncio.run + три проверки"""
+    manager = ServerManager(
+        "127.0.0.1",
+        PASSWORD,
+        servers.rcon_port,
+        CountingAlerts(),
+        game_port=servers.game_port,
+    )
+    samples = measure(manager.update_server_status, iterations)
+    manager.get_rcon_session().close()
+    return summarize(samples)
+
+
+def bench_update_server_status_async(servers: FakeServers, iterations: int) -> dict:
+    """Те же проверки внутри уже работающего цикла событий"""
+    manager = ServerManager(
+        "127.0.0.1",
+        PASSWORD,
+        servers.rcon_port,
+        CountingAlerts(),
+        game_port=servers.game_port,
+    )
+
+    async def scenario():
+        return await measure_async(manager.update_server_status_async, iterations)
+
+    samples = asyncio.run(scenario())
+    manager.get_rcon_session().close()
+    return summarize(samples)
+
+
+def bench_send_command(servers: FakeServers, iterations: int) -> dict:
+    """MCommands.send_command через очередь общей RCON-сессии"""
+    alerts = CountingAlerts()
+    session = RconSession("127.0.0.1", PASSWORD, servers.rcon_port, min_backoff=0)
+    mcommands = MCommands(RconDispatcher(session), alerts)
+    samples = measure(lambda: mcommands.send_command("list"), iterations)
+    mcommands.close()
+    return summarize(samples, alerts.errors)
+
+
+def bench_send_command_async(servers: FakeServers, iterations: int) -> dict:
+    """MCommands.send_command_async по конвейерному AsyncRconClient"""
+    alerts = CountingAlerts()
+    client = AsyncRconClient("127.0.0.1", PASSWORD, servers.rcon_port, min_backoff=0)
+    mcommands = MCommands(None, alerts, async_rcon=client)
+
+    async def send():
+        await mcommands.send_command_async("list")
+
+    async def scenario():
+        return await measure_async(send, iterations)
+
+    samples = asyncio.run(scenario())
+    mcommands.close()
+    return summarize(samples, alerts.errors)
+
+
+def bench_get_server_time(iterations: int) -> dict:
+    """Разбор `time query daytime` без сети: только get_server_time"""
+
+    class CannedRcon:
+        def command(self, command, priority=None):
+            return "The time is 13500"
+
+    mcommands = MCommands(CannedRcon(), CountingAlerts())
+    return summarize(measure(mcommands.get_server_time, iterations))
+
+
+def bench_update_tick(servers: FakeServers, iterations: int) -> dict:
+    """
+    Полный тик periodic_update (проверки, снимок мира, построение UIState
+    и отрисовка) с пустыми панелями вместо flet.
+    """
+    alerts = CountingAlerts()
+    fleet = Fleet(
+        [
+            ServerDefinition(
+                "bench",
+                game_port=servers.game_port,
+                rcon_port=servers.rcon_port,
+                rcon_password=PASSWORD,
+            )
+        ],
+        alerts,
+    )
+    manager = fleet.primary()
+    mcommands = MCommands(
+        manager.get_rcon(), alerts, async_rcon=manager.get_async_rcon()
+    )
+    renderer = UIRenderer(_NullPage(), *(_NullPanel() for _ in range(6)))
+
+    async def tick():
+        await update_tick(renderer, manager, alerts, mcommands, fleet)
+
+    async def scenario():
+        return await measure_async(tick, iterations)
+
+    samples = asyncio.run(scenario())
+    mcommands.close()
+    return summarize(samples, alerts.errors)
+
+
+def run_all(iterations: int, latency: float = 0.0, failure_rate: float = 0.0) -> dict:
+    results = {"get_server_time": bench_get_server_time(iterations * 10)}
+    with FakeServers(FakeRconServer(PASSWORD), FakeMinecraftServer()) as servers:
+        results["update_server_status"] = bench_update_server_status(
+            servers, iterations
+        )
+        results["update_server_status_async"] = bench_update_server_status_async(
+            servers, iterations
+        )
+        results["send_command"] = bench_send_command(servers, iterations)
+        results["send_command_async"] = bench_send_command_async(servers, iterations)
+        results["update_tick"] = bench_update_tick(servers, iterations)
+    if latency or failure_rate:
+        rcon = FakeRconServer(PASSWORD, latency=latency, failure_rate=failure_rate)
+        with FakeServers(rcon, FakeMinecraftServer(latency=latency)) as servers:
+            for name, bench in (
+                ("send_command_degraded", bench_send_command),
+                ("update_tick_degraded", bench_update_tick),
+            ):
+                injected = rcon.failures
+                results[name] = bench(servers, iterations)
+                results[name]["injected_failures"] = rcon.failures - injected
+    return results
+
+
+# ---- Отчёт ----
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(results: dict, **params) -> dict:
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **params,
+        },
+        "results": results,
+    }
+
+
+def format_results(results: dict, baseline: dict | None = None) -> str:
+    lines = [
+        f"{'сценарий':<28}{'p50 мс':>10}{'p90 мс':>10}{'p99 мс':>10}"
+        f"{'оп/с':>12}{'ошибок':>8}"
+    ]
+    for name, stats in results.items():
+        line = (
+            f"{name:<28}{stats['p50_ms']:>10.3f}{stats['p90_ms']:>10.3f}"
+            f"{stats['p99_ms']:>10.3f}{stats['ops_per_sec']:>12.1f}"
+            f"{stats['errors']:>8}"
+        )
+        old = (baseline or {}).get(name)
+        if old and old["p50_ms"]:
+            change = (stats["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+            line += f"   p50 {change:+.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--iterations", type=int, default=200)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=0.0,
+        help="extra scenarios with this server-side delay per response",
+    )
+    parser.add_argument(
+        "--failure-rate",
+        type=float,
+        default=0.0,
+        help="extra scenarios where this share of RCON commands drops the link",
+    )
+    parser.add_argument("--out", type=Path, help="result file (default: results/)")
+    parser.add_argument("--compare", type=Path, help="earlier result file")
+    args = parser.parse_args(argv)
+
+    # Ошибки RCON в сценариях с отказами ожидаемы и только считаются
+    logging.getLogger("srvop").setLevel(logging.CRITICAL)
+
+    results = run_all(args.iterations, args.latency_ms / 1000, args.failure_rate)
+    report = build_report(
+        results,
+        iterations=args.iterations,
+        latency_ms=args.latency_ms,
+        failure_rate=args.failure_rate,
+    )
+    out = args.out or RESULTS_DIR / (
+        f"{datetime.now():%Y%m%d-%H%M%S}-{report['meta']['commit'] or 'nogit'}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+    print(format_results(results, baseline))
+    print(f"\nРезультаты: {out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
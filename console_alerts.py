@@ -0,0 +1,21 @@
+import logging
+
+logger = logging.getLogger("srvop")
+
+
+class ConsoleAlerts:
+    """
+    Замена AlertWindow без GUI: ошибки пишутся в журнал (stderr, под
+    systemd - в journald). Интерфейс тот же: set_error/update_state и
+    последняя ошибка в error.
+    """
+
+    def __init__(self):
+        self.error = None
+
+    def set_error(self, error: str):
+        self.error = error
+        logger.error("Ошибка %s", error)
+
+    def update_state(self):
+        pass
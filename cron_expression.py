@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+# (минимум, максимум) полей: минута, час, день месяца, месяц, день недели
+_FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# Поиск следующего запуска не дольше этого горизонта (29 февраля и т.п.)
+_HORIZON_DAYS = 366 * 5
+
+
+def _parse_field(text: str, low: int, high: int) -> frozenset[int]:
+    values = set()
+    for part in text.split(","):
+        expr, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if step < 1:
+            raise ValueError(f"шаг должен быть положительным: {part!r}")
+        if expr == "*":
+            start, stop = low, high
+        elif "-" in expr:
+            start, stop = (int(v) for v in expr.split("-", 1))
+        else:
+            start = int(expr)
+            stop = high if step_text else start
+        if not low <= start <= stop <= high:
+            raise ValueError(f"значение вне диапазона {low}-{high}: {part!r}")
+        values.update(range(start, stop + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    """
+    Cron-выражение из пяти полей: минута, час, день месяца, месяц, день
+    недели (0 или 7 - воскресенье). Поддерживаются *, списки, диапазоны,
+    шаги (*/15, 1-5/2) и макросы @hourly, @daily, @weekly, @monthly, @yearly.
+    Если ограничены и день месяца, и день недели, подходит любой из них,
+    как в классическом cron; если одно из полей начинается с * (*/2),
+    должны совпасть оба. Время - локальное.
+    """
+
+    def __init__(self, text: str):
+        self.text = text.strip()
+        fields = MACROS.get(self.text, self.text).split()
+        if len(fields) != 5:
+            raise ValueError(f"ожидается 5 полей cron: {text!r}")
+        try:
+            parsed = [_parse_field(f, *bounds) for f, bounds in zip(fields, _FIELDS)]
+        except ValueError as e:
+            raise ValueError(f"{text!r}: {e}") from None
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        # Как в cron, поле со звёздочкой (в том числе */2) не считается
+        # ограничением для правила "день месяца или день недели"
+        self._any_day = fields[2].startswith("*")
+        self._any_weekday = fields[4].startswith("*")
+
+    def __repr__(self):
+        return f"CronExpression({self.text!r})"
+
+    def _day_matches(self, day: datetime) -> bool:
+        # datetime.weekday(): понедельник = 0; в cron воскресенье = 0
+        in_days = day.day in self.days
+        in_weekdays = (day.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Ближайший момент срабатывания строго после moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=_HORIZON_DAYS)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                # Первое число следующего месяца
+                year = candidate.year + candidate.month // 12
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(
+                    year=year, month=month, day=1, hour=0, minute=0
+                )
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"{self.text!r} не срабатывает в ближайшие годы")
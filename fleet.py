@@ -0,0 +1,98 @@
+import asyncio
+from dataclasses import dataclass
+
+from server_manager import ServerManager
+from settings_field import SettingsField
+
+
+@dataclass(frozen=True)
+class ServerDefinition:
+    """
+    Описание одного экземпляра сервера во флоте (запись из settings.json).
+    """
+
+    name: str
+    host: str = "127.0.0.1"
+    game_port: int = 25565
+    rcon_port: int = 25575
+    rcon_password: str = ""
+    start_script: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ServerDefinition":
+        return cls(
+            name=str(data["name"]),
+            host=data.get("host", "127.0.0.1"),
+            game_port=int(data.get("game_port", 25565)),
+            rcon_port=int(data.get("rcon_port", 25575)),
+            rcon_password=data.get("rcon_password", ""),
+            start_script=data.get("start_script"),
+        )
+
+
+class Fleet:
+    """
+    Реестр серверов и одновременный опрос всех экземпляров.
+
+    Все ServerManager флота делят один asyncio.Semaphore на сетевые
+    проверки, поэтому тик длится столько, сколько самый медленный сервер
+    (пока их не больше max_concurrent_probes / 3), а не сумму по всем.
+    """
+
+    def __init__(
+        self,
+        definitions,
+        alert_window,
+        update_status_callback=None,
+        max_concurrent_probes: int = 32,
+    ):
+        names = [d.name for d in definitions]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Имена серверов во флоте должны быть уникальны: {names}")
+        self.limiter = asyncio.Semaphore(max_concurrent_probes)
+        self.definitions = list(definitions)
+        self.managers = {
+            d.name: ServerManager(
+                d.host,
+                d.rcon_password,
+                d.rcon_port,
+                alert_window,
+                update_status_callback=update_status_callback,
+                game_port=d.game_port,
+                start_script=d.start_script,
+                probe_limiter=self.limiter,
+                name=d.name,
+            )
+            for d in self.definitions
+        }
+
+    @classmethod
+    def from_settings(cls, settings, default: ServerDefinition, alert_window, **kwargs):
+        """
+        Флот из ключа "servers" в settings.json; если он пуст - один сервер
+        default (прежнее поведение с константами из main.py).
+        """
+        entries = settings.get(SettingsField.SERVERS.value) or []
+        definitions = [ServerDefinition.from_dict(e) for e in entries] or [default]
+        return cls(definitions, alert_window, **kwargs)
+
+    def __len__(self):
+        return len(self.managers)
+
+    def primary(self) -> ServerManager:
+        """Первый сервер флота - тот, которым управляют основные панели"""
+        return self.managers[self.definitions[0].name]
+
+    def get(self, name: str) -> ServerManager:
+        return self.managers[name]
+
+    def items(self):
+        return self.managers.items()
+
+    async def update_all(self):
+        """
+        Одновременный опрос всех серверов флота.
+        """
+        await asyncio.gather(
+            *(m.update_server_status_async() for m in self.managers.values())
+        )
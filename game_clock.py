@@ -0,0 +1,68 @@
+import threading
+import time
+
+TICKS_PER_DAY = 24000
+TICKS_PER_SECOND = 20.0
+
+
+class GameClock:
+    """
+    Локальная модель игровых часов.
+
+    Между синхронизациями время суток вычисляется на клиенте: при включённом
+    doDaylightCycle оно растёт на rate тиков в секунду, при выключенном стоит.
+    needs_sync() сообщает, когда пора снова спросить сервер: после
+    resync_interval секунд или после invalidate() (time set, переключение
+    цикла), чтобы накопленная ошибка и чужие изменения не жили долго.
+    """
+
+    def __init__(self, resync_interval: float = 60.0):
+        self.resync_interval = resync_interval
+        self._ticks = None
+        self._cycle = None
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def daylight_cycle(self) -> bool | None:
+        return self._cycle
+
+    def sync(
+        self, ticks: int | None, daylight_cycle: bool | None, at: float | None = None
+    ):
+        """Значения, только что полученные с сервера"""
+        with self._lock:
+            if ticks is None:
+                self._ticks = self._synced_at = None
+                return
+            self._ticks = ticks % TICKS_PER_DAY
+            self._cycle = daylight_cycle
+            self._synced_at = time.monotonic() if at is None else at
+
+    def invalidate(self):
+        with self._lock:
+            self._synced_at = None
+
+    def needs_sync(self, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return (
+                self._synced_at is None
+                or now - self._synced_at >= self.resync_interval
+            )
+
+    def ticks(
+        self, now: float | None = None, rate: float = TICKS_PER_SECOND
+    ) -> int | None:
+        """
+        Время суток в тиках на момент now; None, если синхронизации не было.
+        rate - фактический TPS сервера, если он известен.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._ticks is None:
+                return None
+            if not self._cycle or self._synced_at is None:
+                return self._ticks
+            elapsed = max(now - self._synced_at, 0.0)
+            return int(self._ticks + elapsed * rate) % TICKS_PER_DAY
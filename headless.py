@@ -0,0 +1,544 @@
+import asyncio
+import hmac
+import json
+import logging
+import signal
+from dataclasses import asdict
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+import settings as st
+from console_alerts import ConsoleAlerts
+from fleet import Fleet, ServerDefinition
+from mcommands import MCommands
+from metrics import serve_metrics, watch_server
+from poll_scheduler import PollScheduler, run_poll_loop
+from server_status import ServerStatus
+from settings_field import SettingsField
+from startup_profile import PROFILE
+from task_scheduler import ScheduledTask, TaskScheduler
+from tick_trace import PROFILER, TRACER, default_profile_path
+from world_backup import WorldBackup
+from world_index import WorldWatcher
+
+logger = logging.getLogger("srvop")
+
+MAX_BODY = 64 * 1024
+REQUEST_TIMEOUT = 10.0
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _job_state(progress) -> dict | None:
+    if progress is None:
+        return None
+    return {
+        "name": progress.name,
+        "stage": progress.stage.value,
+        "state": progress.state.value,
+        "elapsed": round(progress.elapsed, 1),
+        "message": progress.message,
+    }
+
+
+class HeadlessDaemon:
+    """
+    Работа без GUI: цикл опроса статуса флота и JSON API поверх HTTP/1.1
+    (TCP или Unix-сокет).
+
+    GET  /status[?server=имя]         - статус всех серверов или одного
+    POST /start|/stop|/restart|/cancel - управление сервером
+    POST /command {"command": "..."}   - команда RCON, ответ сервера
+    GET  /trace                        - разбивка последнего и медленного тика
+    POST /profile                      - включение/выключение cProfile
+    GET  /tasks                        - задачи расписания и их следующий запуск
+    POST /tasks/add {задача}           - добавление задачи (cron, at или delay)
+    POST /tasks/remove {"id": "..."}   - удаление задачи
+    GET  /backups                      - копии мира сервера и прогресс текущей
+    POST /backup                       - инкрементальная копия мира
+    POST /backup/restore {"at": ...}   - восстановление копии на момент at
+                                         (ISO 8601 или время Unix)
+    GET  /world                        - сводка мира по измерениям
+    GET  /world/stale?dimension=...    - давно не сохранявшиеся чанки
+
+    Сервер выбирается параметром ?server= или полем "server" в теле;
+    по умолчанию - первый сервер флота. Если задан token, каждый запрос
+    должен содержать заголовок Authorization: Bearer <token>.
+    """
+
+    def __init__(
+        self,
+        fleet: Fleet,
+        alerts: ConsoleAlerts,
+        scheduler,
+        token=None,
+        settings=None,
+    ):
+        self.fleet = fleet
+        self.alerts = alerts
+        self.scheduler = scheduler
+        self.token = token
+        self.commands = {
+            name: MCommands(
+                manager.get_rcon(), alerts, async_rcon=manager.get_async_rcon()
+            )
+            for name, manager in fleet.items()
+        }
+        for name, manager in fleet.items():
+            watch_server(name, manager, self.commands[name])
+        # Без settings расписание и копии отключены (тесты, встраивание)
+        self.backups = {
+            name: WorldBackup(manager, self.commands[name], settings)
+            for name, manager in fleet.items()
+            if settings
+        }
+        self.worlds = {
+            name: WorldWatcher(manager, settings)
+            for name, manager in fleet.items()
+            if settings
+        }
+        self.tasks = (
+            TaskScheduler(fleet, self.commands, settings, self.backups)
+            if settings
+            else None
+        )
+        self._stop = asyncio.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    # ---- Цикл опроса ----
+
+    async def _refresh_world(self, name, manager, probe: bool):
+        mcommands = self.commands[name]
+        if manager.get_status() != ServerStatus.ONLINE:
+            mcommands.tps.reset()
+            if len(mcommands.roster):
+                mcommands.roster.clear()
+            return
+        server_info = manager.get_server_info()
+        if probe and server_info:
+            mcommands.roster.update(server_info.player_sample, complete=False)
+            mcommands.roster.observe_count(server_info.players_online)
+        await mcommands.get_snapshot_async()
+
+    async def _tick(self, probe: bool):
+        if probe:
+            with TRACER.span("fleet.update_all"):
+                await self.fleet.update_all()
+        with TRACER.span("world snapshots"):
+            await asyncio.gather(
+                *(self._refresh_world(n, m, probe) for n, m in self.fleet.items())
+            )
+
+    async def status_loop(self):
+        """
+        Тот же цикл, что periodic_update в GUI, но без отрисовки: снимок
+        мира онлайн-серверов каждую секунду, опрос флота - по адаптивному
+        интервалу.
+        """
+        await run_poll_loop(
+            self.scheduler,
+            self.fleet,
+            self._tick,
+            running=lambda: not self._stop.is_set(),
+            first_mark="first probe done",
+        )
+
+    # ---- Состояние ----
+
+    def server_state(self, name: str) -> dict:
+        manager = self.fleet.get(name)
+        mcommands = self.commands[name]
+        status = manager.get_status()
+        state = {
+            "name": name,
+            "status": status.name.lower(),
+            "status_text": status.value,
+            "start_progress": manager.get_start_progress(),
+            "job": _job_state(manager.get_job_progress()),
+            "server": None,
+            "world": None,
+        }
+        info = manager.get_server_info()
+        if info:
+            state["server"] = {
+                "version": info.version_name,
+                "motd": info.motd,
+                "players_online": info.players_online,
+                "players_max": info.players_max,
+                "latency_ms": round(info.latency_ms, 1),
+            }
+        snapshot = mcommands.peek_snapshot()
+        if status == ServerStatus.ONLINE and snapshot is not None:
+            reading = mcommands.tps.reading
+            state["world"] = {
+                "time": snapshot.time,
+                "daylight_cycle": snapshot.daylight_cycle,
+                "weather": snapshot.weather,
+                "difficulty": snapshot.difficulty,
+                "players": list(mcommands.roster.players()),
+                "tps": round(reading.tps, 2) if reading else None,
+                "mspt": round(reading.mspt, 1) if reading else None,
+            }
+        return state
+
+    # ---- API ----
+
+    def _server_name(self, query: dict, body: dict) -> str:
+        name = body.get("server") or query.get("server", [None])[0]
+        if name is None:
+            return self.fleet.definitions[0].name
+        if name not in self.commands:
+            raise ApiError(404, f"Неизвестный сервер: {name}")
+        return name
+
+    async def dispatch(self, method: str, target: str, body: dict):
+        """
+        Выполнение запроса; возвращает (HTTP-код, JSON-объект).
+        """
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        path = url.path.rstrip("/") or "/"
+        routes = {
+            "/status": "GET",
+            "/start": "POST",
+            "/stop": "POST",
+            "/restart": "POST",
+            "/cancel": "POST",
+            "/command": "POST",
+            "/trace": "GET",
+            "/profile": "POST",
+            "/tasks": "GET",
+            "/tasks/add": "POST",
+            "/tasks/remove": "POST",
+            "/backups": "GET",
+            "/backup": "POST",
+            "/backup/restore": "POST",
+            "/world": "GET",
+            "/world/stale": "GET",
+        }
+        if path not in routes:
+            raise ApiError(404, f"Нет такого пути: {path}")
+        if method != routes[path]:
+            raise ApiError(405, f"{path} принимает только {routes[path]}")
+
+        if path == "/status" and "server" not in query:
+            return 200, {
+                "servers": [self.server_state(name) for name in self.commands]
+            }
+        if path == "/trace":
+            return 200, {
+                "budget_ms": round(TRACER.budget * 1000, 1),
+                "slow_ticks": TRACER.slow_ticks,
+                "last": TRACER.last.as_dict() if TRACER.last else None,
+                "last_slow": TRACER.last_slow.as_dict() if TRACER.last_slow else None,
+            }
+        if path == "/profile":
+            # Путь выбирает демон: клиент API не должен писать произвольные файлы
+            return 200, self._toggle_profiler()
+        if path.startswith("/tasks"):
+            return 200, self._tasks_route(path, body)
+
+        name = self._server_name(query, body)
+        manager = self.fleet.get(name)
+        match path:
+            case "/status":
+                return 200, self.server_state(name)
+            case "/start":
+                # Итог именно этого запуска, а не последняя ошибка в общем
+                # ConsoleAlerts, куда пишут все серверы и цикл статуса
+                error = await asyncio.to_thread(manager.start_server, False)
+                if error:
+                    raise ApiError(409, error)
+            case "/stop":
+                manager.stop_server()
+            case "/restart":
+                manager.restart_server()
+            case "/cancel":
+                manager.cancel_job()
+            case "/backups" | "/backup" | "/backup/restore":
+                return 200, self._backup_route(path, name, body)
+            case "/world" | "/world/stale":
+                return 200, await self._world_route(path, name, query)
+            case "/command":
+                command = body.get("command")
+                if not isinstance(command, str) or not command.strip():
+                    raise ApiError(400, "Поле command обязательно")
+                try:
+                    response = await asyncio.to_thread(
+                        self.commands[name].rcon.command, command.strip()
+                    )
+                except Exception as e:
+                    raise ApiError(502, f"RCON: {e}")
+                return 200, {"server": name, "response": response}
+        self.scheduler.wake()
+        return 200, self.server_state(name)
+
+    def _tasks_route(self, path: str, body: dict) -> dict:
+        if self.tasks is None:
+            raise ApiError(404, "Расписание отключено")
+        if path == "/tasks/add":
+            data = dict(body)
+            delay = data.pop("delay", None)
+            try:
+                if delay is not None:
+                    data["at"] = self.tasks.clock() + float(delay)
+                self.tasks.add(ScheduledTask.from_dict(data))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ApiError(400, f"Некорректная задача: {e}")
+        elif path == "/tasks/remove":
+            if not self.tasks.remove(str(body.get("id"))):
+                raise ApiError(404, f"Нет задачи: {body.get('id')}")
+        return {
+            "tasks": [
+                {**task.to_dict(), "next_run": when}
+                for task, when in self.tasks.tasks()
+            ]
+        }
+
+    def _backup_route(self, path: str, name: str, body: dict) -> dict:
+        backup = self.backups.get(name)
+        if backup is None:
+            raise ApiError(404, "Резервные копии отключены")
+        try:
+            if path == "/backup":
+                if not backup.start():
+                    raise ApiError(409, "Резервная копия уже выполняется")
+            elif path == "/backup/restore":
+                at = body.get("at")
+                if isinstance(at, str):
+                    at = datetime.fromisoformat(at).timestamp()
+                backup.restore(float(at))
+            snapshots = backup.snapshots()
+        except (LookupError, RuntimeError, TypeError, ValueError) as e:
+            raise ApiError(409 if isinstance(e, RuntimeError) else 400, str(e))
+        progress = backup.progress
+        return {
+            "server": name,
+            "snapshots": [
+                {"id": s.id, "created": s.created, "files": s.files, "size": s.size}
+                for s in snapshots
+            ],
+            "progress": None
+            if progress is None
+            else {
+                "stage": progress.stage.value,
+                "state": progress.state.value,
+                "files_done": progress.files_done,
+                "files_total": progress.files_total,
+                "new_objects": progress.new_objects,
+                "bytes_written": progress.bytes_written,
+                "message": progress.message,
+                "snapshot": progress.snapshot,
+            },
+        }
+
+    async def _world_route(self, path: str, name: str, query: dict) -> dict:
+        world = self.worlds.get(name)
+        if world is None:
+            raise ApiError(404, "Индекс мира отключён")
+        # Неизменившиеся регионы берутся из кэша, поэтому обход дешёвый
+        summary = await asyncio.to_thread(world.refresh)
+        if summary is None:
+            raise ApiError(404, "Папка сервера не найдена")
+        if path == "/world/stale":
+            dimension = query.get("dimension", ["overworld"])[0]
+            try:
+                limit = int(query.get("limit", ["1000"])[0])
+            except ValueError:
+                raise ApiError(400, "limit должен быть числом")
+            chunks = await asyncio.to_thread(world.stale_chunks, dimension)
+            return {
+                "server": name,
+                "dimension": dimension,
+                "total": len(chunks),
+                "chunks": [list(chunk) for chunk in chunks[:limit]],
+            }
+        return {"server": name, "dimensions": [asdict(s) for s in summary]}
+
+    def _toggle_profiler(self) -> dict:
+        path = default_profile_path()
+        running = PROFILER.toggle(path)
+        return {"profiling": running, "path": None if running else path}
+
+    def _authorized(self, headers: dict) -> bool:
+        if not self.token:
+            return True
+        expected = f"Bearer {self.token}".encode()
+        return hmac.compare_digest(
+            headers.get("authorization", "").encode("latin-1"), expected
+        )
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise ApiError(400, "Некорректная строка запроса")
+        method, target, _ = parts
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        if not self._authorized(headers):
+            raise ApiError(401, "Нужен заголовок Authorization: Bearer <token>")
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            raise ApiError(413, "Слишком большое тело запроса")
+        body = {}
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError:
+                raise ApiError(400, "Тело запроса должно быть JSON-объектом")
+            if not isinstance(body, dict):
+                raise ApiError(400, "Тело запроса должно быть JSON-объектом")
+        return method.upper(), target, body
+
+    async def handle_client(self, reader, writer):
+        try:
+            async with asyncio.timeout(REQUEST_TIMEOUT):
+                method, target, body = await self._read_request(reader)
+            status, payload = await self.dispatch(method, target, body)
+        except ApiError as e:
+            status, payload = e.status, {"error": e.message}
+        except (TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            logger.exception("Ошибка обработки запроса API")
+            status, payload = 500, {"error": str(e)}
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+            + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_socket=None):
+        if unix_socket:
+            return await asyncio.start_unix_server(self.handle_client, unix_socket)
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def run(
+        self,
+        host="127.0.0.1",
+        port=8765,
+        unix_socket=None,
+        metrics_host="127.0.0.1",
+        metrics_port=None,
+    ):
+        """
+        Работает до stop() (SIGTERM/SIGINT под systemd). metrics_port
+        включает эндпоинт Prometheus /metrics.
+        """
+        loop = asyncio.get_running_loop()
+        handlers = {signal.SIGTERM: self.stop, signal.SIGINT: self.stop}
+        if hasattr(signal, "SIGUSR1"):
+            # kill -USR1 <pid>: профиль без перезапуска демона
+            handlers[signal.SIGUSR1] = self._toggle_profiler
+        for sig, handler in handlers.items():
+            try:
+                loop.add_signal_handler(sig, handler)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: останавливается по Ctrl+C через KeyboardInterrupt
+        server = await self.serve(host, port, unix_socket)
+        PROFILE.mark("API listening")
+        logger.info("API: %s", unix_socket or f"http://{host}:{port}")
+        exporter = None
+        if metrics_port:
+            exporter = await serve_metrics(metrics_host, metrics_port)
+            logger.info("Метрики: http://%s:%s/metrics", metrics_host, metrics_port)
+        poller = asyncio.create_task(self.status_loop())
+        timer = asyncio.create_task(self.tasks.run()) if self.tasks else None
+        try:
+            await self._stop.wait()
+        finally:
+            poller.cancel()
+            if timer:
+                timer.cancel()
+                self.tasks.close()
+            server.close()
+            await server.wait_closed()
+            if exporter:
+                exporter.close()
+                await exporter.wait_closed()
+            for mcommands in self.commands.values():
+                mcommands.close()
+
+
+def run_headless(
+    default: ServerDefinition,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    unix_socket: str | None = None,
+    token: str | None = None,
+    poll_max_interval: float = 30,
+    metrics_host: str = "127.0.0.1",
+    metrics_port: int | None = None,
+    tick_budget: float | None = None,
+):
+    """
+    Точка входа --headless: ServerManager, цикл статуса и MCommands без flet.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    async def main():
+        PROFILE.mark("event loop started")
+        TRACER.budget = st.get_settings().get_with_override(
+            SettingsField.TICK_BUDGET.value, tick_budget, TRACER.budget
+        )
+        alerts = ConsoleAlerts()
+        scheduler = PollScheduler(
+            max_interval=st.get_settings().get(
+                SettingsField.POLL_MAX_INTERVAL.value, poll_max_interval
+            )
+        )
+        fleet = Fleet.from_settings(
+            st.get_settings(),
+            default,
+            alerts,
+            update_status_callback=scheduler.wake,
+        )
+        daemon = HeadlessDaemon(
+            fleet, alerts, scheduler, token, settings=st.get_settings()
+        )
+        await daemon.run(
+            host,
+            port,
+            unix_socket,
+            metrics_host,
+            st.get_settings().get_with_override(
+                SettingsField.METRICS_PORT.value, metrics_port
+            ),
+        )
+
+    asyncio.run(main())
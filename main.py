@@ -1,15 +1,43 @@
-import asyncio
+from __future__ import annotations
 
-import flet as ft
-from mcommands import MCommands
-from server_manager import ServerManager
-from ui import (
-    ServerControlPanel,
-    ServerStatePanel,
-    ServerTimePanel,
-    AlertWindow,
-    FileDialog,
-)
+# Первым импортом: от него отсчитывается профиль запуска (--profile-startup)
+from startup_profile import PROFILE
+
+import argparse
+import asyncio
+import os
+import signal
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from server_status import ServerStatus
+import settings as st
+from settings_field import SettingsField
+
+# Тяжёлые модули (flet, панели, psutil через fleet) загружаются лениво:
+# окно рисуется до инициализации серверов, а --headless обходится без flet.
+if TYPE_CHECKING:
+    import flet as ft
+    from fleet import Fleet
+    from mcommands import MCommands
+    from poll_scheduler import PollScheduler
+    from server_manager import ServerManager
+    from task_scheduler import TaskScheduler
+    from world_backup import WorldBackup
+    from world_index import WorldWatcher
+    from ui import (
+        ServerControlPanel,
+        ServerStatePanel,
+        ServerTimePanel,
+        AlertWindow,
+        FleetPanel,
+        ResourcePanel,
+        PlayersPanel,
+        SchedulePanel,
+        BackupPanel,
+        WorldPanel,
+    )
+    from ui.view_model import UIRenderer
 
 # ===========================
 # Server Configuration
@@ -17,44 +45,207 @@ from ui import (
 RCON_HOST = "127.0.0.1"  # RCON server IP address (localhost by default)
 RCON_PORT = 25575  # RCON server port
 RCON_PASSWORD = "777"  # RCON authentication password
-
-
-async def periodic_update(
-    page: ft.Page,
-    server_manager: ServerManager,
-    control_panel: ServerControlPanel,
-    server_state_panel: ServerStatePanel,
-    server_time_panel: ServerTimePanel,
-    alert_window: AlertWindow,
-):
+POLL_MAX_INTERVAL = 30  # Upper bound (s) for the status poll interval while stable
+RENDER_INTERVAL = 1.0  # Seconds between world snapshots and renders, probed or not
+SAMPLER_INTERVAL = 5  # Seconds between CPU/memory samples of the server process
+API_HOST = "127.0.0.1"  # --headless: address of the JSON control API
+API_PORT = 8765  # --headless: port of the JSON control API
+METRICS_HOST = "127.0.0.1"  # Address of the Prometheus /metrics endpoint
+METRICS_PORT = None  # Port of /metrics; None disables the exporter
+CLI_METRICS_PORT = None  # --metrics-port; overrides "metrics_port" of settings.json
+TICK_BUDGET = 0.25  # Seconds; slower ticks are logged with a per-stage breakdown
+CLI_TICK_BUDGET = None  # --tick-budget; overrides "tick_budget" of settings.json
+WORLD_SCAN_INTERVAL = 600  # Seconds between rescans of the world region headers
+
+
+@dataclass
+class AppContext:
     """
-    Periodically checks the server status and updates the control panel UI.
+    Collaborators of the GUI update loop, built once in main().
 
-    Args:
+    Attributes:
         page (ft.Page): The main application page.
         server_manager (ServerManager): Instance handling server control commands.
+        alert_window (AlertWindow): Error and warning dialogs.
+        mcommands (MCommands): RCON commands; provides the shared world snapshot.
+        scheduler (PollScheduler): Adaptive interval between ticks.
+        fleet (Fleet): All configured servers; server_manager is its primary.
+        task_scheduler (TaskScheduler): Timer of the scheduled tasks.
+        backup (WorldBackup): World backups of the primary server.
+        world (WorldWatcher): Region header index of the primary server world.
         control_panel (ServerControlPanel): UI component for controlling the server.
+        server_state_panel (ServerStatePanel): Status and address of the server.
+        server_time_panel (ServerTimePanel): In-game time of the primary server.
+        fleet_panel (FleetPanel): One dashboard row per server of the fleet.
+        resource_panel (ResourcePanel): CPU/memory of the primary server process.
+        players_panel (PlayersPanel): Players online on the primary server.
+        schedule_panel (SchedulePanel): Scheduled tasks and their next runs.
+        backup_panel (BackupPanel): Backup button and progress.
+        world_panel (WorldPanel): Per-dimension summary of the world.
+    """
+
+    page: ft.Page
+    server_manager: ServerManager
+    alert_window: AlertWindow
+    mcommands: MCommands
+    scheduler: PollScheduler
+    fleet: Fleet
+    task_scheduler: TaskScheduler
+    backup: WorldBackup
+    world: WorldWatcher
+    control_panel: ServerControlPanel
+    server_state_panel: ServerStatePanel
+    server_time_panel: ServerTimePanel
+    fleet_panel: FleetPanel
+    resource_panel: ResourcePanel
+    players_panel: PlayersPanel
+    schedule_panel: SchedulePanel
+    backup_panel: BackupPanel
+    world_panel: WorldPanel
+
+
+async def periodic_update(context: AppContext):
+    """
+    Periodically checks the server status and updates the control panel UI.
 
-    This coroutine runs in an infinite loop and:
-        - Checks whether the server is running.
-        - Updates the control panel state accordingly.
-        - Refreshes the UI every 0.5 seconds.
+    Args:
+        context (AppContext): The page, the servers and the panels to update.
+
+    This coroutine runs in an infinite loop, one tick every RENDER_INTERVAL
+    at most, and:
+        - Checks whether the servers of the fleet are running (all probes of
+          all servers run concurrently without blocking the event loop) when
+          the adaptive poll interval has elapsed.
+        - Collects one world snapshot per tick (time, gamerules, players...)
+          that every panel reads from; its game tick counter feeds the
+          TPS estimate shown next to the server address. The player roster
+          is refreshed on its own adaptive interval and only join/leave
+          changes reach the players panel.
+        - Updates the panels accordingly, sending a single batched page
+          update only when the rendered state actually changed.
+        - Waits until the next render or the next probe, whichever comes
+          first. The poll interval is short during transitions, backs off
+          while the status is stable and is cut short by user actions or
+          process events (scheduler.wake()); the render cadence stays fixed.
+
+    Every stage of a tick is traced (tick_trace.TRACER); a tick over its
+    budget is logged with the per-stage breakdown.
     """
-    while True:
-        server_manager.update_server_status()
+    from ui.view_model import UIRenderer
+
+    renderer = UIRenderer(
+        context.page,
+        context.control_panel,
+        context.server_state_panel,
+        context.server_time_panel,
+        context.fleet_panel,
+        context.resource_panel,
+        context.players_panel,
+        context.schedule_panel,
+        context.backup_panel,
+        context.world_panel,
+    )
 
-        server_ip = server_manager.get_local_ip()
+    from poll_scheduler import run_poll_loop
+
+    async def tick(probe: bool):
+        await update_tick(
+            renderer,
+            context.server_manager,
+            context.alert_window,
+            context.mcommands,
+            context.fleet,
+            context.task_scheduler,
+            context.backup,
+            context.world,
+            probe=probe,
+        )
 
-        server_state_panel.update_state(server_manager.get_status(), server_ip)
+    await run_poll_loop(
+        context.scheduler,
+        context.fleet,
+        tick,
+        RENDER_INTERVAL,
+        first_mark="first status frame",
+    )
 
-        control_panel.update_state(server_manager.get_status())
 
-        alert_window.update_state()
+async def update_tick(
+    renderer: UIRenderer,
+    server_manager: ServerManager,
+    alert_window: AlertWindow,
+    mcommands: MCommands,
+    fleet: Fleet,
+    task_scheduler: TaskScheduler | None = None,
+    backup: WorldBackup | None = None,
+    world: WorldWatcher | None = None,
+    probe: bool = True,
+):
+    """
+    One iteration of periodic_update without the wait: probes the fleet
+    (unless probe is False, then the last probe results are reused),
+    collects the world snapshot and renders the panels. Also used by the
+    benchmarks to time a full tick.
+    """
+    from tick_trace import TRACER
+    from ui.view_model import (
+        BackupPanelView,
+        FleetRowView,
+        PlayersPanelView,
+        ResourcePanelView,
+        ScheduleRowView,
+        UIState,
+        WorldRowView,
+    )
 
-        server_time_panel.update_state(server_manager.get_status())
+    if probe:
+        with TRACER.span("fleet.update_all"):
+            await fleet.update_all()
+
+    snapshot = None
+    if server_manager.get_status() == ServerStatus.ONLINE:
+        server_info = server_manager.get_server_info()
+        if probe and server_info:
+            # Выборка SLP бесплатна: входы видны сразу, а расхождение
+            # числа игроков назначает внеочередной `list`
+            mcommands.roster.update(server_info.player_sample, complete=False)
+            mcommands.roster.observe_count(server_info.players_online)
+        with TRACER.span("world snapshot"):
+            snapshot = await mcommands.get_snapshot_async()
+    else:
+        # После простоя оценка TPS начинается заново
+        mcommands.tps.reset()
+        if len(mcommands.roster):
+            mcommands.roster.clear()
+
+    server_ip = server_manager.get_local_ip()
+
+    with TRACER.span("build state"):
+        state = UIState.build(
+            server_manager.get_status(),
+            server_ip,
+            server_manager.get_server_info(),
+            snapshot,
+            server_manager.get_start_progress(),
+            server_manager.get_job_progress(),
+            [
+                FleetRowView.build(name, m.get_status(), m.get_server_info())
+                for name, m in fleet.items()
+            ],
+            ResourcePanelView.build(server_manager.resource_sampler),
+            mcommands.tps.reading,
+            PlayersPanelView.build(mcommands.roster),
+            ScheduleRowView.build_all(task_scheduler, fleet.definitions[0].name),
+            BackupPanelView.build(backup.progress) if backup else None,
+            WorldRowView.build_all(world.summary if world else None),
+        )
 
-        await asyncio.sleep(1)
-        page.update()
+    # Одно пакетное обновление и только если что-то изменилось
+    with TRACER.span("render"):
+        renderer.render(state)
+
+    with TRACER.span("alert window"):
+        alert_window.update_state()
 
 
 async def main(page: ft.Page):
@@ -68,89 +259,324 @@ async def main(page: ft.Page):
         - Initializes the UI layout.
         - Creates the server control panel with start/stop/restart buttons.
         - Registers event handlers for these buttons.
-        - Starts a background task to periodically update the UI based on server status.
+        - Paints the window in the "unknown" state before any server is probed.
+        - Starts a background task to periodically update the UI based on server status;
+          its first iteration performs the initial probe.
     """
+    import flet as ft
+
+    with PROFILE.stage("import ui panels"):
+        from ui import (
+            ServerControlPanel,
+            ServerStatePanel,
+            ServerTimePanel,
+            AlertWindow,
+            FileDialog,
+            FleetPanel,
+            ResourcePanel,
+            PlayersPanel,
+            SchedulePanel,
+            BackupPanel,
+            WorldPanel,
+        )
+        from ui.view_model import StatePanelView
+
+    # The window is painted first, in the "unknown" state; servers are set up
+    # afterwards and probed in the background by periodic_update.
+    with PROFILE.stage("init: window and panels"):
+        # Set basic application window properties
+        page.title = "SrvOp"
+        page.window.width = 1000
+        page.window.height = 500
+
+        alert_window = AlertWindow(page)
+
+        fleet_panel = FleetPanel()
+        resource_panel = ResourcePanel()
+        players_panel = PlayersPanel()
+        schedule_panel = SchedulePanel()
+
+        def on_backup_click(e):
+            """Starts a world backup of the primary server in the background."""
+            backup.start()
+            scheduler.wake()
+
+        backup_panel = BackupPanel(on_backup=on_backup_click)
+        world_panel = WorldPanel()
+
+        file_dialog = FileDialog(page)
+
+        server_state_panel = ServerStatePanel()
+
+        # RCON commands and the manager are bound once the fleet exists
+        server_time_panel = ServerTimePanel(page, None, None)
+
+        def on_file_dialog_open(e):
+            file_dialog.open_dialog()
+
+        # Event handlers for control panel buttons. They are disabled in the
+        # UNKNOWN state, i.e. until server_manager below is created.
+        def on_start_click(e):
+            """Triggered when the 'Start' button is clicked."""
+            server_manager.start_server()
+            scheduler.wake()
+            page.update()
+
+        def on_stop_click(e):
+            """Triggered when the 'Stop' button is clicked."""
+            server_manager.stop_server()
+            scheduler.wake()
+            page.update()
+
+        def on_restart_click(e):
+            """Triggered when the 'Restart' button is clicked."""
+            server_manager.restart_server()
+            scheduler.wake()
+            page.update()
+
+        def on_cancel_click(e):
+            """Cancels a running background stop/restart job."""
+            server_manager.cancel_job()
+            scheduler.wake()
+
+        # Create control panel UI component
+        control_panel = ServerControlPanel(
+            on_file_dialog=on_file_dialog_open,
+            on_start=on_start_click,
+            on_stop=on_stop_click,
+            on_restart=on_restart_click,
+            on_cancel=on_cancel_click,
+        )
+        control_panel.update_state(ServerStatus.UNKNOWN)
+        server_state_panel.update_state(
+            StatePanelView(ServerStatus.UNKNOWN, None, None, None)
+        )
 
-    # Set basic application window properties
-    page.title = "SrvOp"
-    page.window.width = 1000
-    page.window.height = 500
-    page.update()
-
-    def ui_status_callback():
-        page.update()
-
-    alert_window = AlertWindow(page)
-    # Initialize server manager
-    server_manager = ServerManager(
-        RCON_HOST,
-        RCON_PASSWORD,
-        RCON_PORT,
-        alert_window,
-        update_status_callback=ui_status_callback,
-    )
-
-    server_manager.update_server_status()  # Check initial server status
-
-    file_dialog = FileDialog(page)
-
-    server_state_panel = ServerStatePanel()
-
-    mcommands = MCommands(server_manager.get_mcrcon(), alert_window)
-
-    server_time_panel = ServerTimePanel(page, mcommands, server_manager)
+        # Add control panel to the page
+        page.add(
+            ft.Row(
+                [control_panel, server_state_panel, server_time_panel],
+                alignment=ft.MainAxisAlignment.CENTER,
+                spacing=10,
+            ),
+            fleet_panel,
+            resource_panel,
+            players_panel,
+            schedule_panel,
+            backup_panel,
+            world_panel,
+        )
+    PROFILE.mark("first frame")
+
+    with PROFILE.stage("import server modules"):
+        from fleet import Fleet, ServerDefinition
+        from mcommands import MCommands
+        from metrics import serve_metrics, watch_server
+        from poll_scheduler import PollScheduler
+        from task_scheduler import TaskScheduler
+        from world_backup import WorldBackup
+        from world_index import WorldWatcher
+        from tick_trace import PROFILER, TRACER, default_profile_path
+
+    with PROFILE.stage("init: fleet and RCON"):
+        scheduler = PollScheduler(
+            max_interval=st.get_settings().get(
+                SettingsField.POLL_MAX_INTERVAL.value, POLL_MAX_INTERVAL
+            )
+        )
 
-    def on_file_dialog_open(e):
-        file_dialog.open_dialog()
+        # Initialize the fleet ("servers" in settings.json, or the single
+        # server configured above); status changes and process events wake
+        # the poll loop
+        fleet = Fleet.from_settings(
+            st.get_settings(),
+            ServerDefinition("main", RCON_HOST, 25565, RCON_PORT, RCON_PASSWORD),
+            alert_window,
+            update_status_callback=scheduler.wake,
+        )
+        server_manager = fleet.primary()
 
-    # Event handlers for control panel buttons
-    def on_start_click(e):
-        """Triggered when the 'Start' button is clicked."""
-        server_manager.start_server()
-        page.update()
+        mcommands = MCommands(
+            server_manager.get_rcon(),
+            alert_window,
+            async_rcon=server_manager.get_async_rcon(),
+        )
+        server_time_panel.mcommands = mcommands
+        server_time_panel.server_manager = server_manager
+        server_time_panel.scheduler = scheduler
 
-    def on_stop_click(e):
-        """Triggered when the 'Stop' button is clicked."""
-        server_manager.stop_server()
-        page.update()
+        # Sample CPU/memory of the primary server process off the UI loop
+        server_manager.resource_sampler.interval = st.get_settings().get(
+            SettingsField.SAMPLER_INTERVAL.value, SAMPLER_INTERVAL
+        )
+        server_manager.resource_sampler.start()
+
+        commands = {}
+        for name, manager in fleet.items():
+            # The GUI collects the world snapshot of the primary server only
+            primary = manager is server_manager
+            watch_server(name, manager, mcommands if primary else None)
+            commands[name] = (
+                mcommands if primary else MCommands(manager.get_rcon(), alert_window)
+            )
+        # Incremental world backups of every server, started from the panel
+        # (primary server) or by scheduled "backup" tasks
+        backups = {
+            name: WorldBackup(
+                manager, commands[name], st.get_settings(), on_change=scheduler.refresh
+            )
+            for name, manager in fleet.items()
+        }
+        backup = backups[fleet.definitions[0].name]
+        # Region header index of the primary server world, rescanned in the
+        # background (unchanged region files are served from its cache)
+        world = WorldWatcher(
+            server_manager, st.get_settings(), on_change=scheduler.refresh
+        )
+        # Restarts, stops, commands and backups on a schedule ("scheduled_tasks")
+        task_scheduler = TaskScheduler(fleet, commands, st.get_settings(), backups)
+        metrics_port = st.get_settings().get_with_override(
+            SettingsField.METRICS_PORT.value, CLI_METRICS_PORT, METRICS_PORT
+        )
+        TRACER.budget = st.get_settings().get_with_override(
+            SettingsField.TICK_BUDGET.value, CLI_TICK_BUDGET, TICK_BUDGET
+        )
 
-    def on_restart_click(e):
-        """Triggered when the 'Restart' button is clicked."""
-        server_manager.restart_server()
+    # cProfile capture toggled at runtime: Ctrl+Shift+P or SIGUSR1
+    def toggle_profiler():
+        path = default_profile_path()
+        if PROFILER.toggle(path):
+            message = "Профилирование включено (Ctrl+Shift+P - остановить)"
+        else:
+            message = f"Профиль сохранён: {path}"
+        page.snack_bar = ft.SnackBar(ft.Text(message))
+        page.snack_bar.open = True
         page.update()
 
-    # Create control panel UI component
-    control_panel = ServerControlPanel(
-        on_file_dialog=on_file_dialog_open,
-        on_start=on_start_click,
-        on_stop=on_stop_click,
-        on_restart=on_restart_click,
-    )
-
-    # Add control panel to the page
-    page.add(
-        ft.Row(
-            [control_panel, server_state_panel, server_time_panel],
-            alignment=ft.MainAxisAlignment.CENTER,
-            spacing=10,
-        ),
+    def on_keyboard(e: ft.KeyboardEvent):
+        if e.ctrl and e.shift and e.key.upper() == "P":
+            toggle_profiler()
+
+    page.on_keyboard_event = on_keyboard
+    if hasattr(signal, "SIGUSR1"):
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGUSR1, toggle_profiler
+            )
+        except (NotImplementedError, RuntimeError):
+            pass  # The loop does not run in the main thread
+
+    # Prometheus exporter, only when a port is configured
+    async def exporter():
+        try:
+            server = await serve_metrics(METRICS_HOST, metrics_port)
+        except OSError as e:
+            alert_window.set_error(f"Порт метрик {metrics_port} недоступен:\n{e}")
+            return
+        await server.serve_forever()
+
+    if metrics_port:
+        page.run_task(exporter)
+
+    page.run_task(task_scheduler.run)
+
+    async def world_indexer():
+        await world.run(WORLD_SCAN_INTERVAL)
+
+    page.run_task(world_indexer)
+
+    context = AppContext(
+        page=page,
+        server_manager=server_manager,
+        alert_window=alert_window,
+        mcommands=mcommands,
+        scheduler=scheduler,
+        fleet=fleet,
+        task_scheduler=task_scheduler,
+        backup=backup,
+        world=world,
+        control_panel=control_panel,
+        server_state_panel=server_state_panel,
+        server_time_panel=server_time_panel,
+        fleet_panel=fleet_panel,
+        resource_panel=resource_panel,
+        players_panel=players_panel,
+        schedule_panel=schedule_panel,
+        backup_panel=backup_panel,
+        world_panel=world_panel,
     )
 
     # Background updater coroutine
     async def updater():
-        await periodic_update(
-            page,
-            server_manager,
-            control_panel,
-            server_state_panel,
-            server_time_panel,
-            alert_window,
-        )
+        await periodic_update(context)
 
     # Schedule background task for server status updates
     page.run_task(updater)
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Minecraft server operator")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run without GUI, controlled through a local JSON API",
+    )
+    parser.add_argument("--host", default=API_HOST, help="API listen address")
+    parser.add_argument("--port", type=int, default=API_PORT, help="API port")
+    parser.add_argument("--socket", help="serve the API on a Unix socket instead")
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("SRVOP_API_TOKEN"),
+        help="require 'Authorization: Bearer <token>' (env SRVOP_API_TOKEN)",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print import and initialisation timings to stderr",
+    )
+    parser.add_argument(
+        "--metrics-host", default=METRICS_HOST, help="Prometheus /metrics address"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="serve Prometheus metrics on this port (overrides settings.json; "
+        "off by default)",
+    )
+    parser.add_argument(
+        "--tick-budget",
+        type=float,
+        help="log a per-stage breakdown of status ticks slower than this (s); "
+        "overrides settings.json",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    # Launch the application using Flet
-    ft.app(target=main)
+    args = parse_args()
+    PROFILE.enabled = args.profile_startup
+    PROFILE.mark("main.py imported")
+    METRICS_HOST, CLI_METRICS_PORT = args.metrics_host, args.metrics_port
+    CLI_TICK_BUDGET = args.tick_budget
+    if args.headless:
+        with PROFILE.stage("import headless"):
+            from fleet import ServerDefinition
+            from headless import run_headless
+
+        run_headless(
+            ServerDefinition("main", RCON_HOST, 25565, RCON_PORT, RCON_PASSWORD),
+            host=args.host,
+            port=args.port,
+            unix_socket=args.socket,
+            token=args.token,
+            poll_max_interval=POLL_MAX_INTERVAL,
+            metrics_host=METRICS_HOST,
+            metrics_port=CLI_METRICS_PORT,
+            tick_budget=CLI_TICK_BUDGET,
+        )
+    else:
+        with PROFILE.stage("import flet"):
+            import flet as ft
+
+        # Launch the application using Flet
+        ft.app(target=main)
@@ -1,20 +1,92 @@
-from mcrcon import MCRcon
-from ui.alert_window import AlertWindow
+import asyncio
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from game_clock import TICKS_PER_SECOND, GameClock
+from player_roster import PlayerRoster, RosterChange
+from rcon_async import AsyncRconClient
+from rcon_dispatcher import Priority, RconDispatcher
+from server_snapshot import (
+    ServerSnapshot,
+    parse_difficulty,
+    parse_gamerule_bool,
+    parse_time_query,
+    ticks_to_clock,
+)
+from tick_trace import TRACER
+from tps_estimator import TpsEstimator, TpsReading
+
+if TYPE_CHECKING:
+    # Только для аннотаций: в режиме --headless flet не загружается
+    from ui.alert_window import AlertWindow
+
+logger = logging.getLogger("srvop")
 
 
 class MCommands:
-    def __init__(self, rcon: MCRcon, alert_window: AlertWindow):
+    def __init__(
+        self,
+        rcon: RconDispatcher,
+        alert_window: "AlertWindow",
+        snapshot_ttl: float = 1.0,
+        async_rcon: AsyncRconClient | None = None,
+    ):
         self.rcon = rcon
+        # Конвейерный клиент для снимка мира в цикле событий (без потоков)
+        self.async_rcon = async_rcon
         self.alert_window = alert_window
+        self.snapshot_ttl = snapshot_ttl
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
+        self._weather = None
+        self.tps = TpsEstimator(on_alert=self._on_low_tps)
+        self.clock = GameClock()
+        self.roster = PlayerRoster()
+        self.roster.subscribe(self._log_roster_events)
+
+    @staticmethod
+    def _log_roster_events(events):
+        for event in events:
+            if event.kind == RosterChange.JOINED:
+                logger.info("Игрок %s вошёл на сервер", event.name)
+            else:
+                logger.info(
+                    "Игрок %s вышел с сервера (сессия %d мин)",
+                    event.name,
+                    event.session_seconds // 60,
+                )
+
+    def send_command(
+        self,
+        command: str,
+        priority: Priority = Priority.USER,
+        read_timeout: float | None = None,
+    ) -> str:
+        """
+        Отправка команды на сервер через очередь общей RCON-сессии.
+        Периодические чтения (Priority.PERIODIC) уступают действиям
+        пользователя; read_timeout - таймаут ответа для долгой команды.
+        """
+        try:
+            with TRACER.span(f"rcon {command}"):
+                if read_timeout is None:
+                    return self.rcon.command(command, priority=priority)
+                return self.rcon.command(
+                    command, priority=priority, read_timeout=read_timeout
+                )
+        except Exception as e:
+            self.alert_window.set_error(f"при выполнении команды '{command}': {e}")
+            return ""
 
-    def send_command(self, command: str) -> str:
+    async def send_command_async(self, command: str) -> str:
         """
-        Отправка команды на сервер через RCON.
+        То же, что send_command, через AsyncRconClient в цикле событий.
         """
         try:
-            with self.rcon as mcr:
-                response = mcr.command(command)
-                return response
+            with TRACER.span(f"rcon {command}"):
+                return await self.async_rcon.command(command)
         except Exception as e:
             self.alert_window.set_error(f"при выполнении команды '{command}': {e}")
             return ""
@@ -25,17 +97,27 @@ class MCommands:
         """
         response = self.send_command("time query daytime")
 
-        try:
-            # Извлекаем тики из ответа
-            time_ticks = int(response.strip().split()[-1])
-            # Конвертируем тики в минуты: 0 тик = 6:00
-            total_minutes = (time_ticks / 1000 * 60 + 360) % 1440
-            hours = int(total_minutes // 60)
-            minutes = int(total_minutes % 60)
-            return f"{hours:02d}:{minutes:02d}"
-        except Exception as e:
-            self.alert_window.set_error(f"конвертации времени: {e}")
+        time_ticks = parse_time_query(response)
+        if time_ticks is None:
+            self.alert_window.set_error(f"конвертации времени: {response!r}")
             return "00:00"
+        return ticks_to_clock(time_ticks)
+
+    def get_game_time(
+        self, priority: Priority = Priority.USER
+    ) -> tuple[int | None, float]:
+        """
+        Абсолютный счётчик тиков мира (`time query gametime`) и момент
+        получения ответа. В отличие от daytime, он не меняется командой
+        `time set` и не стоит при выключенном doDaylightCycle.
+        """
+        ticks = parse_time_query(self.send_command("time query gametime", priority))
+        return ticks, time.monotonic()
+
+    def _on_low_tps(self, reading: TpsReading):
+        self.alert_window.set_error(
+            f"низкий TPS: {reading.tps:.1f} (MSPT {reading.mspt:.0f} мс)"
+        )
 
     def set_server_time(self, hours, minutes):
         """
@@ -45,27 +127,143 @@ class MCommands:
         total_minutes = (hours * 60 + minutes - 360) % 1440
         ticks = int(total_minutes / 60 * 1000)
         self.send_command(f"time set {str(ticks)}")
+        self.clock.invalidate()
+        self.invalidate_snapshot()
 
     def do_day_light_cycle(self, value: str):
         self.send_command(f"gamerule doDaylightCycle {value.lower()}")
+        self.clock.invalidate()
+        self.invalidate_snapshot()
+
+    def get_do_day_light_cycle(self, priority: Priority = Priority.USER):
+        return parse_gamerule_bool(
+            self.send_command("gamerule doDaylightCycle", priority)
+        )
+
+    def set_weather(self, weather: str):
+        """
+        Установка погоды (clear, rain, thunder).
+
+        В ванильном RCON нет команды запроса погоды, поэтому снимок знает
+        только погоду, установленную через приложение.
+        """
+        self.send_command(f"weather {weather}")
+        self._weather = weather
+        self.invalidate_snapshot()
+
+    def collect_snapshot(self) -> ServerSnapshot:
+        """
+        Сбор состояния мира за один проход: время, doDaylightCycle,
+        список игроков и сложность. Счётчик тиков из того же прохода
+        передаётся в оценку TPS.
+
+        Время суток и doDaylightCycle запрашиваются только когда GameClock
+        требует синхронизации; между ними время экстраполируется локально
+        с текущим TPS. Список игроков обновляется по адаптивному интервалу
+        PlayerRoster.
+        """
+        read = Priority.PERIODIC
+        gametime, gametime_at = self.get_game_time(read)
+        responses = {q: self.send_command(q, read) for q in self._snapshot_queries()}
+        return self._build_snapshot(gametime, gametime_at, responses)
+
+    async def collect_snapshot_async(self) -> ServerSnapshot:
+        """
+        То же, что collect_snapshot, но все запросы уходят разом по
+        конвейеру AsyncRconClient: сбор занимает один RTT вместо пяти.
+        """
+
+        async def game_time():
+            response = await self.send_command_async("time query gametime")
+            return parse_time_query(response), time.monotonic()
+
+        queries = self._snapshot_queries()
+        (gametime, gametime_at), *replies = await asyncio.gather(
+            game_time(), *(self.send_command_async(q) for q in queries)
+        )
+        return self._build_snapshot(gametime, gametime_at, dict(zip(queries, replies)))
+
+    def _snapshot_queries(self) -> list[str]:
+        queries = []
+        if self.clock.needs_sync():
+            queries += ["time query daytime", "gamerule doDaylightCycle"]
+        if self.roster.due():
+            queries.append("list")
+        queries.append("difficulty")
+        return queries
+
+    def _build_snapshot(self, gametime, gametime_at, responses) -> ServerSnapshot:
+        self.tps.add_sample(gametime, gametime_at)
+        if "time query daytime" in responses:
+            self.clock.sync(
+                parse_time_query(responses["time query daytime"]),
+                parse_gamerule_bool(responses["gamerule doDaylightCycle"]),
+            )
+        reading = self.tps.reading
+        daytime = self.clock.ticks(rate=reading.tps if reading else TICKS_PER_SECOND)
+        daylight_cycle = self.clock.daylight_cycle
+        if "list" in responses:
+            self.roster.update_from_list(responses["list"])
+        players = self.roster.players()
+        difficulty = parse_difficulty(responses["difficulty"])
+        return ServerSnapshot(
+            daytime_ticks=daytime,
+            daylight_cycle=daylight_cycle,
+            weather=self._weather,
+            players_online=len(players),
+            players_max=self.roster.players_max,
+            players=players,
+            difficulty=difficulty,
+            gametime_ticks=gametime,
+            gametime_at=gametime_at,
+        )
+
+    def get_snapshot(self, max_age: float | None = None) -> ServerSnapshot:
+        """
+        Снимок состояния из кэша; новый сбор — только если кэш старше
+        max_age (по умолчанию snapshot_ttl). Все панели читают отсюда,
+        поэтому за тик выполняется не больше одного сбора.
+        """
+        max_age = self.snapshot_ttl if max_age is None else max_age
+        with self._snapshot_lock:
+            if self._snapshot is None or self._snapshot.age() >= max_age:
+                with TRACER.span("collect_snapshot"):
+                    self._snapshot = self.collect_snapshot()
+            return self._snapshot
+
+    async def get_snapshot_async(self, max_age: float | None = None) -> ServerSnapshot:
+        """
+        get_snapshot для цикла событий: через AsyncRconClient, если он
+        задан, иначе - get_snapshot в потоке.
+        """
+        if self.async_rcon is None:
+            return await asyncio.to_thread(self.get_snapshot, max_age)
+        max_age = self.snapshot_ttl if max_age is None else max_age
+        if self._snapshot is None or self._snapshot.age() >= max_age:
+            with TRACER.span("collect_snapshot"):
+                self._snapshot = await self.collect_snapshot_async()
+        return self._snapshot
+
+    def peek_snapshot(self) -> ServerSnapshot | None:
+        """Последний собранный снимок без нового сбора"""
+        return self._snapshot
 
-    def get_do_day_light_cycle(self):
-        result = self.send_command("gamerule doDaylightCycle")
-        if result == "Gamerule doDaylightCycle is currently set to: true":
-            return True
-        if result == "Gamerule doDaylightCycle is currently set to: false":
-            return False
+    def invalidate_snapshot(self):
+        self._snapshot = None
 
     def stop_server(self):
         self.send_command("stop")
 
     def close(self):
         """
-        Закрытие RCON-подключения.
+        Закрытие RCON-подключений.
         """
+        if self.async_rcon:
+            self.async_rcon.close()
+            self.async_rcon = None
         if self.rcon:
             try:
-                self.rcon.disconnect()
+                self.rcon.close()
             except Exception as e:
                 self.alert_window.set_error(f"при закрытии RCON-подключения: {e}")
             self.rcon = None
@@ -0,0 +1,393 @@
+import asyncio
+import math
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from server_status import ServerStatus
+
+# Границы по умолчанию: от локального RCON (~1 мс) до таймаутов проверок
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+DURATION_BUCKETS = (1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _CounterChild:
+    """
+    Счётчик без блокировок: каждый поток пишет только в свою ячейку
+    (ключ - ident потока), сумма считается при выгрузке. Вставка ключа и
+    запись значения в dict атомарны под GIL, поэтому inc() - это одно
+    обращение к словарю без Lock.
+    """
+
+    __slots__ = ("_cells",)
+
+    def __init__(self):
+        self._cells = {}
+
+    def inc(self, amount: float = 1.0):
+        cells = self._cells
+        ident = threading.get_ident()
+        cells[ident] = cells.get(ident, 0.0) + amount
+
+    def value(self) -> float:
+        return sum(list(self._cells.values()))
+
+
+class _GaugeChild:
+    __slots__ = ("_value",)
+
+    def __init__(self):
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    def value(self) -> float:
+        return self._value
+
+
+class _HistogramChild:
+    """
+    Гистограмма по тем же правилам, что _CounterChild: у каждого потока
+    свой список [счётчики корзин..., +Inf, сумма, количество].
+    """
+
+    __slots__ = ("_bounds", "_cells")
+
+    def __init__(self, bounds):
+        self._bounds = bounds
+        self._cells = {}
+
+    def observe(self, value: float):
+        ident = threading.get_ident()
+        cell = self._cells.get(ident)
+        if cell is None:
+            cell = self._cells[ident] = [0] * (len(self._bounds) + 3)
+        cell[bisect_left(self._bounds, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    def snapshot(self) -> tuple[list[int], float, int]:
+        """Накопленные (cumulative) корзины, сумма и количество"""
+        totals = [0] * (len(self._bounds) + 3)
+        for cell in list(self._cells.values()):
+            for i, v in enumerate(list(cell)):
+                totals[i] += v
+        buckets, running = [], 0
+        for count in totals[: len(self._bounds) + 1]:
+            running += count
+            buckets.append(running)
+        return buckets, totals[-2], totals[-1]
+
+
+class _Metric:
+    kind = ""
+    child_class = None
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        return self.child_class()
+
+    def labels(self, *values, **kwargs):
+        """
+        Дочерняя метрика для набора меток. Её стоит получить один раз и
+        хранить: горячий путь - это только inc()/observe() на ней.
+        """
+        if kwargs:
+            values = tuple(str(kwargs[n]) for n in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    @property
+    def family(self) -> str:
+        """Имя семейства в строках HELP и TYPE"""
+        return self.name
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield self.name, values, (), child.value()
+
+    def render(self) -> list[str]:
+        family = self.family
+        lines = [f"# HELP {family} {self.help}", f"# TYPE {family} {self.kind}"]
+        for name, values, extra, value in self.samples():
+            labels = _format_labels(self.labelnames, values, extra)
+            lines.append(f"{name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+    child_class = _CounterChild
+
+    @property
+    def family(self) -> str:
+        # Как в client_python: иначе отсчёты *_total - чужое семейство без типа
+        return f"{self.name}_total"
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield self.family, values, (), child.value()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+    child_class = _GaugeChild
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            buckets, total, count = child.snapshot()
+            for bound, cumulative in zip(self.buckets + (math.inf,), buckets):
+                yield (
+                    f"{self.name}_bucket",
+                    values,
+                    (("le", _format_value(bound)),),
+                    cumulative,
+                )
+            yield f"{self.name}_sum", values, (), total
+            yield f"{self.name}_count", values, (), count
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, callback):
+        """
+        callback() вызывается перед каждой выгрузкой (обновление Gauge).
+        Связанные методы хранятся по слабой ссылке и не держат объект.
+        """
+        if hasattr(callback, "__self__"):
+            self._collectors.append(weakref.WeakMethod(callback))
+        else:
+            self._collectors.append(lambda: callback)
+
+    def render(self) -> str:
+        """Текстовый формат экспозиции Prometheus 0.0.4"""
+        alive = []
+        for ref in list(self._collectors):
+            callback = ref()
+            if callback is not None:
+                alive.append(ref)
+                callback()
+        self._collectors = alive
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+PROBE_DURATION = REGISTRY.register(
+    Histogram(
+        "srvop_probe_duration_seconds",
+        "Duration of status checks by port",
+        ("server", "check"),
+    )
+)
+RCON_DURATION = REGISTRY.register(
+    Histogram(
+        "srvop_rcon_command_duration_seconds",
+        "RCON command round-trip time",
+        ("server",),
+    )
+)
+RCON_COMMANDS = REGISTRY.register(
+    Counter("srvop_rcon_commands", "RCON commands sent", ("server",))
+)
+RCON_ERRORS = REGISTRY.register(
+    Counter("srvop_rcon_errors", "RCON failures by kind", ("server", "kind"))
+)
+STATUS = REGISTRY.register(
+    Gauge("srvop_status", "1 for the current server status", ("server", "status"))
+)
+STATUS_SECONDS = REGISTRY.register(
+    Counter(
+        "srvop_status_seconds",
+        "Time spent in each status",
+        ("server", "status"),
+    )
+)
+STATUS_TRANSITIONS = REGISTRY.register(
+    Counter(
+        "srvop_status_transitions",
+        "Status changes",
+        ("server", "from_status", "to_status"),
+    )
+)
+START_DURATION = REGISTRY.register(
+    Histogram(
+        "srvop_start_duration_seconds",
+        "Time from STARTING to ONLINE",
+        ("server",),
+        DURATION_BUCKETS,
+    )
+)
+STOP_DURATION = REGISTRY.register(
+    Histogram(
+        "srvop_stop_duration_seconds",
+        "Duration of completed stop/restart jobs",
+        ("server", "job"),
+        DURATION_BUCKETS,
+    )
+)
+TICK_DURATION = REGISTRY.register(
+    Histogram("srvop_tick_duration_seconds", "Duration of one status/UI tick")
+)
+PLAYERS_ONLINE = REGISTRY.register(
+    Gauge("srvop_players_online", "Players online (Server List Ping)", ("server",))
+)
+TPS = REGISTRY.register(Gauge("srvop_tps", "Estimated ticks per second", ("server",)))
+
+
+class StatusTracker:
+    """
+    Время в каждом ServerStatus, переходы и длительность запуска одного
+    сервера. observe() вызывается там, где статус окончательно определён;
+    повторный вызов с тем же статусом ничего не стоит.
+    """
+
+    def __init__(self, server: str, registry: Registry = REGISTRY):
+        self.server = server
+        self._status = None
+        self._since = time.monotonic()
+        self._starting_since = None
+        self._lock = threading.Lock()
+        self._gauges = {s: STATUS.labels(server, s.name.lower()) for s in ServerStatus}
+        self._seconds = {
+            s: STATUS_SECONDS.labels(server, s.name.lower()) for s in ServerStatus
+        }
+        self._start_duration = START_DURATION.labels(server)
+        registry.add_collector(self.flush)
+
+    def observe(self, status: ServerStatus, now: float | None = None):
+        if status == self._status:
+            return
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            previous, self._status = self._status, status
+            if previous is not None:
+                self._seconds[previous].inc(now - self._since)
+                self._gauges[previous].set(0)
+                STATUS_TRANSITIONS.labels(
+                    self.server, previous.name.lower(), status.name.lower()
+                ).inc()
+            self._since = now
+            self._gauges[status].set(1)
+            if status == ServerStatus.STARTING and self._starting_since is None:
+                self._starting_since = now
+            elif status == ServerStatus.ONLINE and self._starting_since is not None:
+                self._start_duration.observe(now - self._starting_since)
+                self._starting_since = None
+            elif status not in (ServerStatus.STARTING, ServerStatus.RESTATING):
+                self._starting_since = None
+
+    def flush(self, now: float | None = None):
+        """Переносит время текущего статуса в счётчик (перед выгрузкой)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._status is not None:
+                self._seconds[self._status].inc(now - self._since)
+                self._since = now
+
+
+def watch_server(name: str, manager, mcommands=None, registry: Registry = REGISTRY):
+    """
+    Gauge игроков и TPS сервера обновляются при выгрузке, а не в цикле
+    опроса: без сборщика метрик они ничего не стоят. Без mcommands
+    (снимок мира не собирается) TPS не экспортируется.
+    """
+    players = PLAYERS_ONLINE.labels(name)
+    tps = TPS.labels(name) if mcommands is not None else None
+
+    def collect():
+        info = manager.get_server_info()
+        online = manager.get_status() == ServerStatus.ONLINE
+        players.set(info.players_online if online and info else 0)
+        if mcommands is not None:
+            reading = mcommands.tps.reading
+            tps.set(reading.tps if online and reading else math.nan)
+
+    registry.add_collector(collect)
+
+
+async def serve_metrics(
+    host: str = "127.0.0.1", port: int = 9108, registry: Registry = REGISTRY
+):
+    """
+    HTTP-эндпоинт GET /metrics для Prometheus на asyncio.
+    """
+
+    async def handle(reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 5)
+            target = request.split(b" ", 2)[1] if request.count(b" ") >= 2 else b""
+            if target.split(b"?")[0] in (b"/metrics", b"/"):
+                status, body = "200 OK", registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                (
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,84 @@
+import socket
+import time
+
+import psutil
+
+
+class LocalAddressCache:
+    """
+    Кэш IP-адреса компьютера.
+
+    Адрес пересчитывается только когда меняется снимок сетевых интерфейсов
+    (psutil.net_if_addrs / net_if_stats), а сам снимок снимается не чаще
+    одного раза в check_interval секунд. Ошибка определения адреса
+    сообщается один раз на каждое изменение интерфейсов, а не каждый тик.
+    """
+
+    def __init__(self, on_error=None, check_interval: float = 5.0):
+        self.on_error = on_error
+        self.check_interval = check_interval
+        self._ip = None
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    @staticmethod
+    def _take_snapshot() -> tuple[tuple[str, str], ...]:
+        """
+        IPv4-адреса поднятых интерфейсов в виде (интерфейс, адрес).
+        """
+        stats = psutil.net_if_stats()
+        addresses = []
+        for name, addrs in psutil.net_if_addrs().items():
+            if name in stats and not stats[name].isup:
+                continue
+            for addr in addrs:
+                if addr.family == socket.AF_INET:
+                    addresses.append((name, addr.address))
+        return tuple(sorted(addresses))
+
+    @staticmethod
+    def _route_ip() -> str:
+        # connect() у UDP-сокета ничего не отправляет, а только выбирает
+        # исходящий адрес по таблице маршрутизации.
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+        finally:
+            s.close()
+
+    def _resolve(self, snapshot) -> str:
+        lan = [addr for _, addr in snapshot if not addr.startswith("127.")]
+        try:
+            ip = self._route_ip()
+            if ip in lan or not snapshot:
+                return ip
+        except OSError as e:
+            if not lan and self.on_error:
+                self.on_error(e)
+        # Нет маршрута по умолчанию (офлайн-сеть): берём первый LAN-адрес.
+        return lan[0] if lan else "127.0.0.1"
+
+    def refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and self._ip and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        snapshot = self._take_snapshot()
+        if force or self._ip is None or snapshot != self._snapshot:
+            self._snapshot = snapshot
+            self._ip = self._resolve(snapshot)
+
+    def get(self) -> str:
+        """
+        Основной IP-адрес компьютера (из кэша).
+        """
+        self.refresh()
+        return self._ip
+
+    def all_addresses(self) -> list[str]:
+        """
+        Все IPv4-адреса поднятых интерфейсов, включая loopback.
+        """
+        self.refresh()
+        return [addr for _, addr in self._snapshot]
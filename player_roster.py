@@ -0,0 +1,154 @@
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+from server_snapshot import parse_player_list
+
+# Так ванильный сервер подписывает игроков, скрытых в Server List Ping
+ANONYMOUS_PLAYER = "Anonymous Player"
+
+
+class RosterChange(Enum):
+    JOINED = "joined"
+    LEFT = "left"
+
+
+@dataclass(frozen=True)
+class RosterEvent:
+    kind: RosterChange
+    name: str
+    at: float
+    # Длительность завершённой сессии (только для LEFT)
+    session_seconds: float | None = None
+
+
+class PlayerRoster:
+    """
+    Текущий состав игроков и поток событий входа/выхода.
+
+    Полный список приходит из RCON `list`, частичный - из выборки игроков
+    Server List Ping (до 12 имён): по нему фиксируются только входы. Подписчики
+    получают лишь изменения, а не весь список. Для каждого игрока хранится
+    время входа текущей сессии и суммарное время завершённых сессий.
+
+    Интервал опроса `list` адаптивный: после изменения состава он
+    сбрасывается до min_interval и растёт вдвое за каждый опрос без
+    изменений, до max_interval. Расхождение числа игроков в SLP с составом
+    (observe_count) назначает опрос немедленно.
+    """
+
+    def __init__(self, min_interval: float = 2.0, max_interval: float = 30.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.players_max = 0
+        self._interval = min_interval
+        self._next_refresh = 0.0
+        self._joined_at = {}
+        self._played = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._joined_at)
+
+    def __contains__(self, name):
+        return name in self._joined_at
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    def players(self) -> tuple[str, ...]:
+        """Игроки онлайн в порядке входа"""
+        with self._lock:
+            return tuple(self._joined_at)
+
+    def subscribe(self, callback):
+        """
+        callback(events) вызывается со списком RosterEvent при каждом
+        изменении состава. Возвращает функцию отписки.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def due(self, now: float | None = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return now >= self._next_refresh
+
+    def wake(self):
+        """Следующая проверка due() вернёт True"""
+        self._next_refresh = 0.0
+
+    def observe_count(self, online: int):
+        """
+        Число игроков из Server List Ping: если оно расходится с составом,
+        состав устарел.
+        """
+        if online != len(self._joined_at):
+            self.wake()
+
+    def session_seconds(self, name: str, now: float | None = None) -> float:
+        """Суммарное время игрока на сервере, включая текущую сессию"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            total = self._played.get(name, 0.0)
+            if name in self._joined_at:
+                total += now - self._joined_at[name]
+            return total
+
+    def update_from_list(self, response: str, now: float | None = None):
+        """Разбор ответа RCON `list` и применение полного состава"""
+        online, self.players_max, names = parse_player_list(response)
+        if online and not names:
+            # Ответ без имён (обрезан или формат другой версии) - не
+            # считаем, что все вышли, но и не переспрашиваем каждый тик.
+            now = time.monotonic() if now is None else now
+            with self._lock:
+                self._interval = min(self._interval * 2, self.max_interval)
+                self._next_refresh = now + self._interval
+            return []
+        return self.update(names, complete=True, now=now)
+
+    def update(self, names, complete: bool = True, now: float | None = None):
+        """
+        Применение наблюдаемого состава; возвращает список событий.
+
+        complete=False - частичная выборка (SLP): выходы из неё не выводятся.
+        """
+        now = time.monotonic() if now is None else now
+        seen = {name for name in names if name and name != ANONYMOUS_PLAYER}
+        events = []
+        with self._lock:
+            for name in names:
+                if name in seen and name not in self._joined_at:
+                    self._joined_at[name] = now
+                    events.append(RosterEvent(RosterChange.JOINED, name, now))
+            if complete:
+                for name in [n for n in self._joined_at if n not in seen]:
+                    duration = now - self._joined_at.pop(name)
+                    self._played[name] = self._played.get(name, 0.0) + duration
+                    events.append(
+                        RosterEvent(RosterChange.LEFT, name, now, duration)
+                    )
+                if events:
+                    self._interval = self.min_interval
+                else:
+                    self._interval = min(self._interval * 2, self.max_interval)
+                self._next_refresh = now + self._interval
+            callbacks = list(self._subscribers) if events else []
+        for callback in callbacks:
+            callback(events)
+        return events
+
+    def clear(self, now: float | None = None):
+        """Сервер остановлен: все текущие сессии завершаются"""
+        events = self.update((), complete=True, now=now)
+        self.wake()
+        return events
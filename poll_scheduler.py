@@ -0,0 +1,171 @@
+import asyncio
+import random
+import threading
+import time
+
+from metrics import TICK_DURATION
+from server_status import ServerStatus
+from startup_profile import PROFILE
+from tick_trace import TRACER
+
+TRANSITIONAL_STATUSES = {
+    ServerStatus.UNKNOWN,
+    ServerStatus.STARTING,
+    ServerStatus.STOPING,
+    ServerStatus.RESTATING,
+}
+
+
+class PollScheduler:
+    """
+    Адаптивный интервал опроса для periodic_update.
+
+    Во время переходных состояний (запуск, остановка, перезапуск) опрос идёт
+    с fast_interval. Пока статус не меняется, интервал растёт в backoff_factor
+    раз за тик, но не выше max_interval. wake() из любого потока прерывает
+    текущее ожидание и сбрасывает интервал (действие пользователя, событие
+    процесса). К каждому ожиданию добавляется джиттер ±jitter.
+
+    Интервал относится к опросу серверов: sleep(limit) просыпается и
+    раньше, для отрисовки, а probe_due() говорит, пора ли опрашивать.
+    """
+
+    def __init__(
+        self,
+        fast_interval: float = 0.5,
+        base_interval: float = 1.0,
+        max_interval: float = 30.0,
+        backoff_factor: float = 2.0,
+        jitter: float = 0.1,
+    ):
+        self.fast_interval = fast_interval
+        self.base_interval = base_interval
+        self.max_interval = max(max_interval, base_interval)
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self._interval = base_interval
+        self._last_status = None
+        self._last_sleep = 0.0
+        # Момент следующего опроса (time.monotonic); None - опросов ещё
+        # не было
+        self._probe_at = None
+        self._loop = None
+        self._event = None
+        self._pending_wake = False
+        self._lock = threading.Lock()
+
+    @property
+    def interval(self) -> float:
+        """Текущий интервал без джиттера"""
+        return self._interval
+
+    @property
+    def last_sleep(self) -> float:
+        """Фактическая длительность последнего запланированного ожидания"""
+        return self._last_sleep
+
+    def observe(self, status: ServerStatus | tuple[ServerStatus, ...]) -> float:
+        """
+        Пересчёт интервала по статусу, полученному в этом тике. Для флота
+        передаётся кортеж статусов: переход любого сервера ускоряет опрос.
+        """
+        statuses = status if isinstance(status, tuple) else (status,)
+        if TRANSITIONAL_STATUSES.intersection(statuses):
+            self._interval = self.fast_interval
+        elif status != self._last_status:
+            self._interval = self.base_interval
+        else:
+            self._interval = min(
+                self._interval * self.backoff_factor, self.max_interval
+            )
+        self._last_status = status
+        jitter = random.uniform(-self.jitter, self.jitter)
+        with self._lock:
+            self._probe_at = time.monotonic() + self._interval * (1 + jitter)
+        return self._interval
+
+    def probe_due(self) -> bool:
+        """Истёк ли интервал опроса (или был wake()) с последнего observe()"""
+        with self._lock:
+            return self._probe_at is None or time.monotonic() >= self._probe_at
+
+    def wake(self):
+        """
+        Немедленно разбудить цикл опроса. Потокобезопасно.
+        """
+        with self._lock:
+            self._interval = self.fast_interval
+            self._probe_at = 0.0
+            if self._loop is None:
+                self._pending_wake = True
+                return
+            loop, event = self._loop, self._event
+        loop.call_soon_threadsafe(event.set)
+
+    def refresh(self):
+        """
+        Прервать ожидание ради перерисовки, не опрашивая серверы и не
+        сбрасывая интервал (прогресс фоновой задачи). Потокобезопасно.
+        """
+        with self._lock:
+            if self._loop is None:
+                return  # Первый тик и так всё нарисует
+            loop, event = self._loop, self._event
+        loop.call_soon_threadsafe(event.set)
+
+    async def sleep(self, limit: float | None = None):
+        """
+        Ожидание до следующего опроса: interval с джиттером или до wake(),
+        но не дольше limit секунд.
+        """
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.get_running_loop()
+                self._event = asyncio.Event()
+            if self._pending_wake:
+                self._pending_wake = False
+                self._event.set()
+            now = time.monotonic()
+            if self._probe_at is None:
+                jitter = random.uniform(-self.jitter, self.jitter)
+                self._probe_at = now + self._interval * (1 + jitter)
+            delay = max(self._probe_at - now, 0.0)
+        if limit is not None:
+            delay = min(delay, limit)
+        self._last_sleep = delay
+        try:
+            await asyncio.wait_for(self._event.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+        self._event.clear()
+
+
+async def run_poll_loop(
+    scheduler: PollScheduler,
+    fleet,
+    tick,
+    render_interval: float = 1.0,
+    running=lambda: True,
+    first_mark: str = "first tick",
+):
+    """
+    Общий цикл статуса GUI и --headless. await tick(probe) выполняется раз
+    в render_interval (снимок мира, отрисовка) и после wake(); probe=True,
+    только когда истёк адаптивный интервал опроса серверов - отступление
+    при стабильном статусе не замедляет снимки и отрисовку.
+    """
+    tick_duration = TICK_DURATION.labels()
+    first = True
+    while running():
+        started = time.perf_counter()
+        probe = scheduler.probe_due()
+        with TRACER.tick():
+            await tick(probe)
+        tick_duration.observe(time.perf_counter() - started)
+        if first:
+            first = False
+            PROFILE.mark(first_mark)
+            PROFILE.report()
+        if probe:
+            scheduler.observe(tuple(m.get_status() for _, m in fleet.items()))
+        await scheduler.sleep(render_interval)
@@ -0,0 +1,242 @@
+import asyncio
+import itertools
+import struct
+import time
+
+from metrics import RCON_COMMANDS, RCON_DURATION, RCON_ERRORS
+from rcon_session import RconUnavailable
+
+PACKET_LOGIN = 3
+PACKET_COMMAND = 2
+PACKET_AUTH_RESPONSE = 2
+PACKET_RESPONSE = 0
+# Пакет неизвестного типа: ванильный сервер отвечает на него "Unknown
+# request" с тем же ID. Он идёт после команды и отмечает конец её ответа.
+PACKET_MARKER = 200
+
+# Максимальный размер пакета от сервера (тело до 4096 байт + заголовок)
+MAX_PACKET = 4110 + 4096
+
+
+def encode_packet(request_id: int, packet_type: int, body: str = "") -> bytes:
+    payload = struct.pack("<ii", request_id, packet_type) + body.encode() + b"\0\0"
+    return struct.pack("<i", len(payload)) + payload
+
+
+async def read_packet(reader: asyncio.StreamReader) -> tuple[int, int, str]:
+    (length,) = struct.unpack("<i", await reader.readexactly(4))
+    if not 10 <= length <= MAX_PACKET:
+        raise ConnectionError(f"некорректная длина пакета RCON: {length}")
+    payload = await reader.readexactly(length)
+    request_id, packet_type = struct.unpack("<ii", payload[:8])
+    return request_id, packet_type, payload[8:-2].decode("utf-8", "replace")
+
+
+class _Pending:
+    __slots__ = ("future", "chunks")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.chunks = []
+
+
+class AsyncRconClient:
+    """
+    RCON-клиент на asyncio с конвейером запросов.
+
+    Все команды идут по одному соединению без ожидания ответа на
+    предыдущую; ответы сопоставляются по ID пакета. Длинный ответ
+    (`list` на большом сервере, `help`) приходит несколькими пакетами по
+    4096 байт: за каждой командой отправляется пакет-маркер, и ответ
+    считается полным, когда пришёл ответ на маркер. Таймаут у каждого
+    запроса свой (asyncio.timeout), без signal.alarm и без потоков.
+
+    Соединение поднимается при первой команде в текущем цикле событий;
+    после обрыва - снова, с экспоненциальной задержкой, как у RconSession.
+    """
+
+    def __init__(
+        self,
+        host,
+        password,
+        port,
+        timeout=5.0,
+        min_backoff=0.5,
+        max_backoff=8.0,
+        name=None,
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._markers = {}
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._loop = None
+        self._connecting = None
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        label = name or f"{host}:{port}"
+        self._m_duration = RCON_DURATION.labels(label)
+        self._m_commands = RCON_COMMANDS.labels(label)
+        self._m_errors = {
+            kind: RCON_ERRORS.labels(label, kind) for kind in ("connect", "command")
+        }
+
+    def is_connected(self) -> bool:
+        return self._writer is not None and self._loop is _running_loop()
+
+    def _next_id(self) -> int:
+        # ID - положительный int32; -1 сервер использует для отказа в логине
+        return next(self._ids) % 0x7FFFFFFF + 1
+
+    # ---- Соединение ----
+
+    async def _connect(self):
+        if time.monotonic() < self._next_attempt:
+            raise RconUnavailable("ожидание переподключения к RCON")
+        try:
+            async with asyncio.timeout(self.timeout):
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                login_id = self._next_id()
+                writer.write(encode_packet(login_id, PACKET_LOGIN, self.password))
+                await writer.drain()
+                request_id, _, _ = await read_packet(reader)
+        except (OSError, TimeoutError, asyncio.IncompleteReadError, struct.error) as e:
+            self._m_errors["connect"].inc()
+            self._schedule_retry()
+            raise RconUnavailable(str(e) or type(e).__name__) from e
+        if request_id != login_id:
+            writer.close()
+            self._m_errors["connect"].inc()
+            self._schedule_retry()
+            raise RconUnavailable("неверный пароль RCON")
+        self._reader, self._writer = reader, writer
+        self._loop = asyncio.get_running_loop()
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        self._reader_task = asyncio.create_task(self._read_loop(reader))
+
+    async def _ensure_connected(self):
+        if self._writer is not None and self._loop is not asyncio.get_running_loop():
+            # Соединение от другого цикла событий (например, прошлого asyncio.run)
+            self._drop(RconUnavailable("цикл событий сменился"))
+        if self._writer is not None:
+            return
+        # Одновременные команды ждут одного подключения
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._connect())
+        connecting = self._connecting
+        try:
+            await asyncio.shield(connecting)
+        finally:
+            if connecting.done() and self._connecting is connecting:
+                self._connecting = None
+
+    def _schedule_retry(self):
+        if self._backoff:
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+        else:
+            self._backoff = self.min_backoff
+        self._next_attempt = time.monotonic() + self._backoff
+
+    def _drop(self, error: Exception):
+        writer, self._writer, self._reader = self._writer, None, None
+        task, self._reader_task = self._reader_task, None
+        if task is not None and task is not _current_task():
+            task.cancel()
+        if writer is not None:
+            try:
+                writer.close()
+            except RuntimeError:
+                pass  # Цикл событий, к которому привязан сокет, уже закрыт
+        pending, self._pending = self._pending, {}
+        self._markers = {}
+        for entry in pending.values():
+            if not entry.future.done():
+                entry.future.set_exception(error)
+
+    async def _read_loop(self, reader):
+        try:
+            while True:
+                request_id, _, body = await read_packet(reader)
+                if request_id in self._pending:
+                    self._pending[request_id].chunks.append(body)
+                elif request_id in self._markers:
+                    entry = self._pending.pop(self._markers.pop(request_id), None)
+                    if entry is not None and not entry.future.done():
+                        entry.future.set_result("".join(entry.chunks))
+                # Ответы на запросы, снятые по таймауту, отбрасываются
+        except asyncio.CancelledError:
+            raise
+        except (OSError, asyncio.IncompleteReadError, struct.error) as e:
+            self._m_errors["command"].inc()
+            self._schedule_retry()
+            self._drop(RconUnavailable(f"соединение RCON разорвано: {e}"))
+
+    # ---- Команды ----
+
+    async def command(self, command: str, timeout: float | None = None) -> str:
+        """
+        Отправка команды; ответ собирается из всех пакетов. Таймаут
+        (по умолчанию self.timeout) действует только на этот запрос.
+        При недоступности сервера выбрасывается RconUnavailable.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        await self._ensure_connected()
+        writer = self._writer
+        request_id, marker_id = self._next_id(), self._next_id()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = _Pending(future)
+        self._markers[marker_id] = request_id
+        writer.write(
+            encode_packet(request_id, PACKET_COMMAND, command)
+            + encode_packet(marker_id, PACKET_MARKER)
+        )
+        try:
+            async with asyncio.timeout(timeout):
+                await writer.drain()
+                response = await future
+        except TimeoutError:
+            self._pending.pop(request_id, None)
+            self._markers.pop(marker_id, None)
+            self._m_errors["command"].inc()
+            raise RconUnavailable(f"RCON не ответил за {timeout} с на '{command}'")
+        except OSError as e:
+            self._m_errors["command"].inc()
+            self._drop(RconUnavailable(str(e)))
+            raise RconUnavailable(str(e)) from e
+        self._m_commands.inc()
+        self._m_duration.observe(time.perf_counter() - started)
+        return response
+
+    async def ping(self) -> bool:
+        """Готовность RCON: соединение с логином есть или поднимается"""
+        try:
+            await self._ensure_connected()
+        except RconUnavailable:
+            return False
+        return True
+
+    def close(self):
+        self._drop(RconUnavailable("RCON закрыт"))
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _current_task():
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        return None
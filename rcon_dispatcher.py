@@ -0,0 +1,276 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future, TimeoutError
+from enum import IntEnum
+
+from rcon_session import RconSession, RconUnavailable
+
+# Запас сверх таймаута сокета: команда ждёт и свою очередь
+DEFAULT_WAIT = 30.0
+# Ключ проверки сессии (RconSession.ping) в очереди: ожидающие проверки
+# объединяются, как одинаковые чтения
+_PING = ("ping",)
+
+
+class Priority(IntEnum):
+    # Меньше - раньше
+    USER = 0  # кнопки, выбор времени, API, остановка сервера
+    PERIODIC = 10  # чтения для снимка мира в цикле опроса
+
+
+class RconBusy(RconUnavailable):
+    """Очередь RCON переполнена: команда не принята."""
+
+
+def coalesce_key(command: str) -> tuple | None:
+    """
+    Ключ, по которому ожидающие в очереди команды заменяют друг друга.
+
+    Установка состояния (`time set`, `weather`, `difficulty <x>`,
+    `gamerule <имя> <значение>`) идемпотентна: выполнится только последняя
+    из ожидающих. Одинаковые запросы (`time query`, `list`, `gamerule
+    <имя>`) выполняются один раз для всех ожидающих. Остальные команды
+    (`say`, `give`, `time add`, `stop`...) не объединяются.
+    """
+    parts = command.split()
+    if not parts:
+        return None
+    match parts:
+        case ["time", "set", _]:
+            return ("set", "time")
+        case ["weather", _, *_]:
+            return ("set", "weather")
+        case ["difficulty", _]:
+            return ("set", "difficulty")
+        case ["gamerule", rule, _]:
+            return ("set", "gamerule", rule)
+        case ["time", "query", _] | ["list", *_] | ["difficulty"] | ["gamerule", _]:
+            return ("get", " ".join(parts))
+    return None
+
+
+def _state_of(key: tuple) -> tuple:
+    """Состояние сервера, которое меняет или читает команда с ключом key"""
+    if key[0] != "get":
+        return key[1:] or key
+    parts = key[1].split()
+    return tuple(parts[:2]) if parts[0] == "gamerule" else (parts[0],)
+
+
+class _Request:
+    __slots__ = ("command", "priority", "key", "futures", "done", "read_timeout")
+
+    def __init__(self, command, priority, key, read_timeout=None):
+        self.command = command
+        self.priority = priority
+        self.key = key
+        self.futures = []
+        self.done = False
+        self.read_timeout = read_timeout
+
+
+class RconDispatcher:
+    """
+    Единственная точка отправки команд в RconSession.
+
+    Команды из любых потоков (UI, задачи остановки, API, цикл опроса)
+    ставятся в ограниченную очередь с приоритетом и выполняются по одной
+    рабочим потоком; результат возвращается через Future. Пользовательские
+    действия (Priority.USER) обгоняют периодические чтения. Ожидающие
+    команды с одинаковым coalesce_key объединяются: десять быстрых `time set`
+    превращаются в последний, а все вызвавшие получают его ответ.
+    Объединение идёт, только пока ожидающая команда - последняя,
+    затронувшая своё состояние: после необъединяемой команды или
+    чтения/установки того же состояния новая команда встаёт в очередь
+    отдельно, и порядок выполнения совпадает с порядком отправки.
+
+    При заполненной очереди submit() выбрасывает RconBusy (это
+    RconUnavailable, поэтому вызывающий код обрабатывает его как
+    недоступный RCON).
+    """
+
+    def __init__(self, session: RconSession, maxsize: int = 64):
+        self.session = session
+        self.maxsize = maxsize
+        self.coalesced = 0
+        self._size = 0
+        self._heap = []
+        self._pending = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._worker = None
+        self._closing = False
+
+    def __len__(self):
+        return self._size
+
+    def submit(
+        self,
+        command: str,
+        priority: Priority = Priority.USER,
+        read_timeout: float | None = None,
+    ) -> Future:
+        """
+        Постановка команды в очередь. read_timeout - свой таймаут чтения
+        ответа (RconSession.command); такие команды не объединяются.
+        """
+        future = Future()
+        key = coalesce_key(command) if read_timeout is None else None
+        with self._cond:
+            request = self._pending.get(key) if key else None
+            if request is not None:
+                # Ожидающая команда ещё не отправлена: она заменяется новой
+                self.coalesced += 1
+                request.command = command
+                request.futures.append(future)
+                if priority < request.priority:
+                    request.done = True
+                    merged = _Request(command, priority, key)
+                    merged.futures = request.futures
+                    self._push(merged)
+                return future
+            if self._size >= self.maxsize:
+                raise RconBusy(f"очередь RCON заполнена ({self.maxsize})")
+            request = _Request(command, priority, key, read_timeout)
+            request.futures.append(future)
+            self._size += 1
+            self._push(request)
+        return future
+
+    def ping(self, priority: Priority = Priority.PERIODIC) -> Future:
+        """
+        RconSession.ping() через очередь: keepalive проверки состояния
+        уступает действиям пользователя и виден в ней, как любая команда.
+        Результат Future - bool.
+        """
+        future = Future()
+        with self._cond:
+            request = self._pending.get(_PING)
+            if request is not None:
+                self.coalesced += 1
+                request.futures.append(future)
+                return future
+            if self._size >= self.maxsize:
+                raise RconBusy(f"очередь RCON заполнена ({self.maxsize})")
+            request = _Request(None, priority, _PING)
+            request.futures.append(future)
+            self._size += 1
+            self._push(request)
+        return future
+
+    def command(
+        self,
+        command: str,
+        priority: Priority = Priority.USER,
+        timeout: float | None = DEFAULT_WAIT,
+        read_timeout: float | None = None,
+    ) -> str:
+        """
+        Синхронный вызов с тем же контрактом, что RconSession.command.
+        """
+        future = self.submit(command, priority, read_timeout)
+        if read_timeout is not None and timeout is not None:
+            timeout = max(timeout, read_timeout + DEFAULT_WAIT)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            # Не начатая команда снимается с очереди
+            future.cancel()
+            raise RconUnavailable(f"RCON не ответил за {timeout} с")
+
+    def close(self):
+        """
+        Останавливает рабочий поток (ожидающие команды завершаются
+        RconUnavailable) и закрывает сессию. Следующая команда запустит
+        поток снова.
+        """
+        with self._cond:
+            worker = self._worker
+            if worker is not None:
+                self._closing = True
+                self._cond.notify_all()
+        if worker is not None and worker is not threading.current_thread():
+            worker.join()
+        self.session.close()
+
+    # ---- Внутреннее ----
+
+    def _forget_overtaken(self, key: tuple | None):
+        """
+        Ожидающие команды, которые новая команда обгонять не должна,
+        больше не принимают объединение.
+        """
+        if key is None:
+            self._pending.clear()
+            return
+        state = _state_of(key)
+        for other in [k for k in self._pending if k != key]:
+            if _state_of(other) == state:
+                del self._pending[other]
+
+    def _push(self, request: _Request):
+        heapq.heappush(self._heap, (request.priority, next(self._seq), request))
+        self._forget_overtaken(request.key)
+        if request.key:
+            self._pending[request.key] = request
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="rcon-dispatcher", daemon=True
+            )
+            self._worker.start()
+        self._cond.notify()
+
+    def _take(self) -> _Request | None:
+        with self._cond:
+            while True:
+                if self._closing:
+                    self._abort_pending()
+                    return None
+                while self._heap:
+                    _, _, request = heapq.heappop(self._heap)
+                    if request.done:
+                        continue
+                    request.done = True
+                    self._size -= 1
+                    if request.key and self._pending.get(request.key) is request:
+                        del self._pending[request.key]
+                    # Future, отменённые по таймауту, не ждут ответа
+                    live = [
+                        f for f in request.futures if f.set_running_or_notify_cancel()
+                    ]
+                    if live:
+                        request.futures = live
+                        return request
+                self._cond.wait()
+
+    def _abort_pending(self):
+        for _, _, request in self._heap:
+            if not request.done:
+                request.done = True
+                for future in request.futures:
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(RconUnavailable("RCON закрыт"))
+        self._heap.clear()
+        self._pending.clear()
+        self._size = 0
+        self._worker = None
+        self._closing = False
+
+    def _run(self):
+        while (request := self._take()) is not None:
+            try:
+                if request.key == _PING:
+                    result = self.session.ping()
+                elif request.read_timeout is not None:
+                    result = self.session.command(
+                        request.command, read_timeout=request.read_timeout
+                    )
+                else:
+                    result = self.session.command(request.command)
+            except Exception as e:
+                for future in request.futures:
+                    future.set_exception(e)
+            else:
+                for future in request.futures:
+                    future.set_result(result)
@@ -0,0 +1,220 @@
+import select
+import socket
+import struct
+import threading
+import time
+
+from mcrcon import MCRcon, MCRconException
+
+from metrics import RCON_COMMANDS, RCON_DURATION, RCON_ERRORS
+
+
+class RconUnavailable(Exception):
+    """RCON-сессия недоступна: сервер выключен или идёт переподключение."""
+
+
+class _SessionRcon(MCRcon):
+    """
+    MCRcon с таймаутами на уровне сокета.
+
+    Штатный MCRcon ограничивает чтение через signal.alarm и бесконечно крутится
+    в _read, если сервер закрыл соединение. Для долгоживущей сессии это
+    недопустимо, поэтому чтение и подключение переопределены. Обработчик
+    SIGALRM не ставится: его можно установить только из главного потока.
+    """
+
+    def __init__(self, host, password, port=25575, tlsmode=0, timeout=5):
+        self.host = host
+        self.password = password
+        self.port = port
+        self.tlsmode = tlsmode
+        self.timeout = timeout
+
+    def connect(self):
+        self.socket = socket.create_connection(
+            (self.host, self.port), timeout=self.timeout
+        )
+        self._send(3, self.password)
+
+    def _read(self, length):
+        data = b""
+        while len(data) < length:
+            chunk = self.socket.recv(length - len(data))
+            if not chunk:
+                raise MCRconException("Соединение закрыто сервером")
+            data += chunk
+        return data
+
+
+class RconSession:
+    """
+    Долгоживущее авторизованное RCON-подключение.
+
+    Сессия логинится один раз и держит сокет открытым, пока жив сервер.
+    Если соединение простаивает дольше keepalive_interval, ping() отправляет
+    keepalive-команду. После перезапуска сервера сессия переподключается
+    с экспоненциальной задержкой (min_backoff .. max_backoff секунд).
+    Один экземпляр используют и ServerManager, и MCommands.
+    """
+
+    def __init__(
+        self,
+        host,
+        password,
+        port,
+        timeout=5,
+        keepalive_interval=30.0,
+        keepalive_command="list",
+        min_backoff=0.5,
+        max_backoff=8.0,
+        name=None,
+    ):
+        self.host = host
+        self.port = port
+        self.keepalive_interval = keepalive_interval
+        self.keepalive_command = keepalive_command
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._rcon = _SessionRcon(host, password, port, timeout=timeout)
+        self._lock = threading.RLock()
+        self._connected = False
+        self._last_activity = 0.0
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        label = name or f"{host}:{port}"
+        self._m_duration = RCON_DURATION.labels(label)
+        self._m_commands = RCON_COMMANDS.labels(label)
+        self._m_errors = {
+            kind: RCON_ERRORS.labels(label, kind)
+            for kind in ("connect", "reconnect", "command")
+        }
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def _schedule_retry(self):
+        if self._backoff:
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+        else:
+            self._backoff = self.min_backoff
+        self._next_attempt = time.monotonic() + self._backoff
+
+    def _drop(self):
+        self._connected = False
+        try:
+            self._rcon.disconnect()
+        except OSError:
+            self._rcon.socket = None
+
+    def _connect(self):
+        if time.monotonic() < self._next_attempt:
+            raise RconUnavailable("ожидание переподключения к RCON")
+        try:
+            self._rcon.connect()
+        except (OSError, MCRconException, struct.error) as e:
+            self._m_errors["connect"].inc()
+            self._drop()
+            self._schedule_retry()
+            raise RconUnavailable(str(e)) from e
+        self._connected = True
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        self._last_activity = time.monotonic()
+
+    def _socket_alive(self) -> bool:
+        """
+        Локальная проверка сокета без сетевого трафика.
+
+        Сервер ничего не присылает в простаивающее RCON-соединение, поэтому
+        готовность сокета к чтению означает, что сервер его закрыл.
+        """
+        sock = self._rcon.socket
+        if sock is None:
+            return False
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+            if not readable:
+                return True
+            return sock.recv(1, socket.MSG_PEEK) != b""
+        except (OSError, ValueError):
+            return False
+
+    def _send(self, command: str, read_timeout: float | None) -> str:
+        sock = self._rcon.socket
+        if read_timeout is None:
+            return self._rcon.command(command)
+        sock.settimeout(read_timeout)
+        try:
+            return self._rcon.command(command)
+        finally:
+            try:
+                sock.settimeout(self._rcon.timeout)
+            except OSError:
+                pass  # Сокет уже закрыт
+
+    def command(self, command: str, read_timeout: float | None = None) -> str:
+        """
+        Выполнение команды в текущей сессии.
+
+        Если сокет оказался устаревшим (сервер перезапускался), сессия один раз
+        переподключается и повторяет команду. При недоступности сервера
+        выбрасывается RconUnavailable. read_timeout заменяет таймаут сокета
+        для одной долгой команды (`save-all flush` большого мира).
+        """
+        with self._lock:
+            started = time.perf_counter()
+            reused = self._connected and self._socket_alive()
+            if not reused:
+                self._drop()
+                self._connect()
+            try:
+                response = self._send(command, read_timeout)
+            except (OSError, MCRconException, struct.error) as e:
+                self._drop()
+                if not reused:
+                    self._m_errors["command"].inc()
+                    self._schedule_retry()
+                    raise RconUnavailable(str(e)) from e
+                self._m_errors["reconnect"].inc()
+                self._connect()
+                try:
+                    response = self._send(command, read_timeout)
+                except (OSError, MCRconException, struct.error) as e:
+                    self._m_errors["command"].inc()
+                    self._drop()
+                    self._schedule_retry()
+                    raise RconUnavailable(str(e)) from e
+            self._last_activity = time.monotonic()
+            self._m_commands.inc()
+            self._m_duration.observe(time.perf_counter() - started)
+            return response
+
+    def ping(self) -> bool:
+        """
+        Проверка готовности RCON без повторного логина.
+
+        Поднимает соединение, если его нет (с учётом задержки переподключения),
+        и отправляет keepalive, если сессия простаивала дольше keepalive_interval.
+        """
+        with self._lock:
+            if self._connected and not self._socket_alive():
+                self._drop()
+            if not self._connected:
+                try:
+                    self._connect()
+                except RconUnavailable:
+                    return False
+                return True
+            if time.monotonic() - self._last_activity >= self.keepalive_interval:
+                try:
+                    self.command(self.keepalive_command)
+                except RconUnavailable:
+                    return False
+            return True
+
+    def close(self):
+        """
+        Закрытие сессии.
+        """
+        with self._lock:
+            self._drop()
@@ -0,0 +1,200 @@
+import logging
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+
+import psutil
+
+METRICS = (
+    "cpu_percent",
+    "rss",
+    "threads",
+    "open_fds",
+    "read_bytes",
+    "write_bytes",
+)
+
+logger = logging.getLogger("srvop")
+
+
+class RingBuffer:
+    """
+    Кольцевой буфер фиксированного размера на array('d').
+
+    Память выделяется один раз; добавление O(1) без аллокаций.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = array("d", bytes(8 * capacity))
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value: float):
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def values(self) -> list[float]:
+        """Значения от старых к новым"""
+        start = (self._head - self._count) % self.capacity
+        if start + self._count <= self.capacity:
+            return self._data[start : start + self._count].tolist()
+        return (self._data[start:] + self._data[: self._head]).tolist()
+
+    def last(self) -> float | None:
+        if not self._count:
+            return None
+        return self._data[(self._head - 1) % self.capacity]
+
+    def downsample(self, buckets: int) -> list[tuple[float, float]]:
+        """
+        (min, max) по buckets равным отрезкам истории - для графика, на
+        котором не должны теряться короткие пики.
+        """
+        values = self.values()
+        if not values:
+            return []
+        buckets = min(buckets, len(values))
+        result = []
+        size = len(values)
+        for i in range(buckets):
+            chunk = values[i * size // buckets : (i + 1) * size // buckets]
+            result.append((min(chunk), max(chunk)))
+        return result
+
+
+@dataclass(frozen=True)
+class ResourceSample:
+    cpu_percent: float
+    rss: int
+    threads: int
+    open_fds: int
+    read_bytes: int
+    write_bytes: int
+
+
+class ResourceSampler:
+    """
+    Фоновый сбор потребления ресурсов процессом сервера через psutil.
+
+    find_processes возвращает процессы сервера (скрипт запуска и его
+    потомки или найденный java-процесс); значения суммируются по ним.
+    Каждая метрика хранится в своём RingBuffer, сбор идёт в daemon-потоке
+    раз в interval секунд и не затрагивает цикл UI. Поиск процессов
+    (для внешнего сервера это обход сокетов системы) повторяется только
+    каждые rediscover_every замеров или когда отслеживаемый процесс исчез.
+    """
+
+    def __init__(
+        self,
+        find_processes,
+        interval: float = 5.0,
+        capacity: int = 720,
+        rediscover_every: int = 12,
+    ):
+        self.find_processes = find_processes
+        self.interval = interval
+        self.rediscover_every = rediscover_every
+        self._samples_since_discovery = 0
+        self.timestamps = RingBuffer(capacity)
+        self.series = {name: RingBuffer(capacity) for name in METRICS}
+        self._procs = {}
+        self._latest = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception:
+                # Одна неудачная итерация не должна останавливать сбор
+                logger.exception("Ошибка замера ресурсов сервера")
+            self._stop.wait(self.interval)
+
+    def _tracked(self) -> list:
+        self._samples_since_discovery += 1
+        if (
+            self._procs
+            and self._samples_since_discovery < self.rediscover_every
+            and all(proc.is_running() for proc in self._procs.values())
+        ):
+            return list(self._procs.values())
+        self._samples_since_discovery = 0
+        # psutil считает cpu_percent между вызовами для одного и того же
+        # объекта Process, поэтому объекты переиспользуются по pid.
+        current = {}
+        for proc in self.find_processes():
+            current[proc.pid] = self._procs.get(proc.pid, proc)
+        self._procs = current
+        return list(current.values())
+
+    def sample(self) -> ResourceSample | None:
+        """
+        Один замер; None, если процесс сервера не найден или хотя бы один
+        из отслеживаемых процессов завершился во время замера.
+        """
+        procs = self._tracked()
+        if not procs:
+            self._latest = None
+            return None
+        totals = dict.fromkeys(METRICS, 0)
+        measured = 0
+        for proc in procs:
+            try:
+                with proc.oneshot():
+                    totals["cpu_percent"] += proc.cpu_percent(None)
+                    totals["rss"] += proc.memory_info().rss
+                    totals["threads"] += proc.num_threads()
+                    if hasattr(proc, "num_fds"):
+                        totals["open_fds"] += proc.num_fds()
+                    else:
+                        totals["open_fds"] += proc.num_handles()
+                    try:
+                        io = proc.io_counters()
+                        totals["read_bytes"] += io.read_bytes
+                        totals["write_bytes"] += io.write_bytes
+                    except (AttributeError, psutil.AccessDenied):
+                        pass
+            except psutil.NoSuchProcess:
+                # Сумма без завершившегося процесса выглядела бы как провал
+                # нагрузки; замер пропускается, процессы ищутся заново.
+                self._procs = {}
+                self._latest = None
+                return None
+            except psutil.AccessDenied:
+                continue
+            measured += 1
+        if not measured:
+            # Нули в истории выглядели бы как простаивающий сервер
+            self._latest = None
+            return None
+        sample = ResourceSample(**totals)
+        self._latest = sample
+        with self._lock:
+            self.timestamps.append(time.time())
+            for name in METRICS:
+                self.series[name].append(getattr(sample, name))
+        return sample
+
+    def latest(self) -> ResourceSample | None:
+        """Последний замер (None, пока процесс не найден)"""
+        return self._latest
+
+    def downsample(self, metric: str, buckets: int) -> list[tuple[float, float]]:
+        with self._lock:
+            return self.series[metric].downsample(buckets)
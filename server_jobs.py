@@ -0,0 +1,225 @@
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+import psutil
+
+
+class JobState(Enum):
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class StopStage(Enum):
+    RCON_STOP = "Команда stop"
+    WAIT_EXIT = "Ожидание завершения"
+    SIGTERM = "SIGTERM"
+    SIGKILL = "SIGKILL"
+    START = "Запуск"
+    FINISHED = "Готово"
+
+
+@dataclass(frozen=True)
+class JobProgress:
+    name: str
+    stage: StopStage
+    state: JobState
+    elapsed: float
+    message: str = ""
+
+    @property
+    def running(self) -> bool:
+        return self.state == JobState.RUNNING
+
+
+def find_server_processes(popen=None, game_port: int = 25565) -> list:
+    """
+    Процессы сервера для ожидания и эскалации остановки.
+
+    Если сервер запущен из приложения, это скрипт запуска и все его потомки
+    (java работает внуком bash/cmd). Иначе ищем процесс, слушающий игровой
+    порт. Процессы, к которым нет доступа, пропускаются.
+    """
+    try:
+        if popen is not None and popen.poll() is None:
+            root = psutil.Process(popen.pid)
+            return [root] + root.children(recursive=True)
+        for conn in psutil.net_connections(kind="tcp"):
+            if (
+                conn.status == psutil.CONN_LISTEN
+                and conn.laddr
+                and conn.laddr.port == game_port
+                and conn.pid
+            ):
+                root = psutil.Process(conn.pid)
+                return [root] + root.children(recursive=True)
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        pass
+    return []
+
+
+def port_open(host: str, port: int, timeout: float = 0.5) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        return sock.connect_ex((host, port)) == 0
+
+
+class StopJob:
+    """
+    Фоновая остановка сервера со ступенчатой эскалацией.
+
+    Этапы: RCON `stop` -> ожидание выхода (stop_timeout) -> SIGTERM
+    (term_timeout) -> SIGKILL. Каждое изменение прогресса передаётся в
+    on_progress; cancel() прерывает задачу между опросами. Если задан
+    then (перезапуск), он вызывается после успешной остановки.
+
+    Если процессы сервера найти не удалось (сервер запущен не из приложения
+    и недоступен через psutil), эскалация невозможна: задача только ждёт,
+    пока is_stopped() не вернёт True.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        send_stop,
+        find_processes,
+        on_progress=None,
+        then=None,
+        is_stopped=None,
+        stop_timeout: float = 60.0,
+        term_timeout: float = 10.0,
+        kill_timeout: float = 5.0,
+        poll_interval: float = 0.5,
+    ):
+        self.name = name
+        self.send_stop = send_stop
+        self.find_processes = find_processes
+        self.on_progress = on_progress
+        self.then = then
+        self.is_stopped = is_stopped
+        self.stop_timeout = stop_timeout
+        self.term_timeout = term_timeout
+        self.kill_timeout = kill_timeout
+        self.poll_interval = poll_interval
+        self._cancel = threading.Event()
+        self._started_at = None
+        self._progress = JobProgress(
+            name, StopStage.RCON_STOP, JobState.RUNNING, 0.0
+        )
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def progress(self) -> JobProgress:
+        if self._progress.running and self._started_at is not None:
+            elapsed = time.monotonic() - self._started_at
+            return JobProgress(
+                self.name,
+                self._progress.stage,
+                self._progress.state,
+                elapsed,
+                self._progress.message,
+            )
+        return self._progress
+
+    def start(self):
+        self._started_at = time.monotonic()
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _report(self, stage, state=JobState.RUNNING, message=""):
+        self._progress = JobProgress(
+            self.name, stage, state, time.monotonic() - self._started_at, message
+        )
+        if self.on_progress:
+            self.on_progress(self._progress)
+
+    def _wait(self, procs, timeout) -> list:
+        """
+        Ждёт завершения procs до timeout; возвращает оставшиеся процессы.
+        """
+        deadline = time.monotonic() + timeout
+        alive = procs
+        while alive and time.monotonic() < deadline:
+            if self._cancel.is_set():
+                return alive
+            _, alive = psutil.wait_procs(
+                alive, timeout=min(self.poll_interval, deadline - time.monotonic())
+            )
+        return alive
+
+    def _signal(self, procs, method):
+        for proc in procs:
+            try:
+                getattr(proc, method)()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+    def _run(self):
+        try:
+            self._report(StopStage.RCON_STOP)
+            procs = self.find_processes()
+            try:
+                self.send_stop()
+            except Exception as e:
+                self._report(StopStage.RCON_STOP, message=str(e))
+
+            if not procs and self.is_stopped:
+                self._report(StopStage.WAIT_EXIT)
+                deadline = time.monotonic() + self.stop_timeout
+                while not self.is_stopped():
+                    if self._cancel.is_set():
+                        self._report(
+                            StopStage.WAIT_EXIT, JobState.CANCELLED, "Отменено"
+                        )
+                        return
+                    if time.monotonic() >= deadline:
+                        self._report(
+                            StopStage.WAIT_EXIT,
+                            JobState.FAILED,
+                            "Сервер не остановился, процесс не найден",
+                        )
+                        return
+                    time.sleep(self.poll_interval)
+
+            alive = procs
+            for stage, timeout, method in (
+                (StopStage.WAIT_EXIT, self.stop_timeout, None),
+                (StopStage.SIGTERM, self.term_timeout, "terminate"),
+                (StopStage.SIGKILL, self.kill_timeout, "kill"),
+            ):
+                if not alive:
+                    break
+                if self._cancel.is_set():
+                    self._report(stage, JobState.CANCELLED, "Отменено")
+                    return
+                self._report(stage)
+                if method:
+                    self._signal(alive, method)
+                alive = self._wait(alive, timeout)
+
+            if self._cancel.is_set():
+                self._report(self._progress.stage, JobState.CANCELLED, "Отменено")
+                return
+            if alive:
+                self._report(
+                    StopStage.SIGKILL,
+                    JobState.FAILED,
+                    f"Процессы не завершились: {[p.pid for p in alive]}",
+                )
+                return
+
+            if self.then:
+                self._report(StopStage.START)
+                self.then()
+            self._report(StopStage.FINISHED, JobState.DONE)
+        except Exception as e:
+            self._report(self._progress.stage, JobState.FAILED, str(e))
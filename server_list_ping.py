@@ -0,0 +1,177 @@
+import asyncio
+import json
+import struct
+import time
+from dataclasses import dataclass, field
+
+
+class ServerListPingError(Exception):
+    """Порт принимает соединения, но сервер не вернул корректный статус."""
+
+
+@dataclass(frozen=True)
+class ServerInfo:
+    version_name: str
+    protocol: int
+    motd: str
+    players_online: int
+    players_max: int
+    latency_ms: float
+    player_sample: tuple[str, ...] = field(default_factory=tuple)
+
+
+def _pack_varint(value: int) -> bytes:
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _unpack_varint(data: bytes, offset: int = 0) -> tuple[int, int]:
+    result = 0
+    for i in range(5):
+        if offset >= len(data):
+            raise ServerListPingError("обрезанный VarInt")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            if result & 0x80000000:
+                result -= 1 << 32
+            return result, offset
+    raise ServerListPingError("слишком длинный VarInt")
+
+
+def _pack_string(value: str) -> bytes:
+    raw = value.encode("utf-8")
+    return _pack_varint(len(raw)) + raw
+
+
+def _packet(packet_id: int, payload: bytes = b"") -> bytes:
+    body = _pack_varint(packet_id) + payload
+    return _pack_varint(len(body)) + body
+
+
+async def _read_varint(reader: asyncio.StreamReader) -> int:
+    raw = b""
+    for _ in range(5):
+        byte = await reader.readexactly(1)
+        raw += byte
+        if not byte[0] & 0x80:
+            return _unpack_varint(raw)[0]
+    raise ServerListPingError("слишком длинный VarInt")
+
+
+async def _read_packet(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    length = await _read_varint(reader)
+    if length <= 0 or length > 1 << 21:
+        raise ServerListPingError(f"некорректная длина пакета: {length}")
+    data = await reader.readexactly(length)
+    packet_id, offset = _unpack_varint(data)
+    return packet_id, data[offset:]
+
+
+def _motd_text(description) -> str:
+    """
+    Склейка текста из chat-компонента (строка, словарь с extra или список).
+    """
+    if isinstance(description, str):
+        return description
+    if isinstance(description, list):
+        return "".join(_motd_text(part) for part in description)
+    if isinstance(description, dict):
+        return description.get("text", "") + "".join(
+            _motd_text(part) for part in description.get("extra", [])
+        )
+    return ""
+
+
+def parse_status(payload: bytes, latency_ms: float) -> ServerInfo:
+    """
+    Разбор JSON из пакета Status Response.
+    """
+    raw, offset = _unpack_varint(payload)
+    try:
+        status = json.loads(payload[offset : offset + raw].decode("utf-8"))
+        version = status.get("version", {})
+        players = status.get("players", {})
+        return ServerInfo(
+            version_name=str(version.get("name", "")),
+            protocol=int(version.get("protocol", -1)),
+            motd=_motd_text(status.get("description", "")),
+            players_online=int(players.get("online", 0)),
+            players_max=int(players.get("max", 0)),
+            latency_ms=latency_ms,
+            player_sample=tuple(
+                p["name"] for p in players.get("sample", []) if "name" in p
+            ),
+        )
+    except (ValueError, TypeError, AttributeError, KeyError) as e:
+        raise ServerListPingError(f"некорректный ответ статуса: {e}") from e
+
+
+async def server_list_ping(
+    host: str, port: int = 25565, timeout: float = 1.0, protocol_version: int = -1
+) -> ServerInfo:
+    """
+    Запрос статуса сервера по протоколу Server List Ping (handshake + status).
+
+    Ошибки подключения (порт закрыт, таймаут connect) пробрасываются как
+    OSError / TimeoutError. Если порт принял соединение, но сервер не прислал
+    статус (мир ещё загружается), выбрасывается ServerListPingError.
+    Все этапы укладываются в общий дедлайн timeout.
+    """
+    deadline = asyncio.get_running_loop().time() + timeout
+    async with asyncio.timeout_at(deadline):
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        try:
+            async with asyncio.timeout_at(deadline):
+                handshake = (
+                    _pack_varint(protocol_version)
+                    + _pack_string(host)
+                    + struct.pack(">H", port)
+                    + _pack_varint(1)
+                )
+                started = time.perf_counter()
+                writer.write(_packet(0x00, handshake) + _packet(0x00))
+                await writer.drain()
+                packet_id, payload = await _read_packet(reader)
+                latency_ms = (time.perf_counter() - started) * 1000
+        except (TimeoutError, asyncio.IncompleteReadError, OSError) as e:
+            raise ServerListPingError(f"нет ответа на статус-запрос: {e!r}") from e
+        if packet_id != 0x00:
+            raise ServerListPingError(f"неожиданный пакет 0x{packet_id:02x}")
+
+        # Ping/Pong даёт более точную задержку, чем статус, но часть
+        # серверов закрывает соединение сразу после статуса.
+        token = struct.pack(">q", time.monotonic_ns() & 0x7FFFFFFFFFFFFFFF)
+        try:
+            async with asyncio.timeout_at(deadline):
+                started = time.perf_counter()
+                writer.write(_packet(0x01, token))
+                await writer.drain()
+                pong_id, pong = await _read_packet(reader)
+                if pong_id == 0x01 and pong == token:
+                    latency_ms = (time.perf_counter() - started) * 1000
+        except (
+            TimeoutError,
+            asyncio.IncompleteReadError,
+            OSError,
+            ServerListPingError,
+        ):
+            pass
+
+        return parse_status(payload, latency_ms)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
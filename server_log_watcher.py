@@ -0,0 +1,91 @@
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+
+
+class LifecycleEvent(Enum):
+    STARTING = "starting"
+    PROGRESS = "progress"
+    READY = "ready"
+    STOPPING = "stopping"
+    CRASHED = "crashed"
+    EXITED = "exited"
+
+
+@dataclass(frozen=True)
+class LogEvent:
+    kind: LifecycleEvent
+    line: str = ""
+    progress: int | None = None
+    startup_seconds: float | None = None
+    exit_code: int | None = None
+
+
+_PATTERNS = [
+    (LifecycleEvent.STARTING, re.compile(r"Starting minecraft server", re.I)),
+    (LifecycleEvent.PROGRESS, re.compile(r"Preparing spawn area:\s*(\d+)%")),
+    (LifecycleEvent.READY, re.compile(r"Done \((\d+(?:[.,]\d+)?)s\)!")),
+    (LifecycleEvent.STOPPING, re.compile(r"Stopping (?:the )?server", re.I)),
+    (
+        LifecycleEvent.CRASHED,
+        re.compile(
+            r"This crash report has been saved to"
+            r"|Exception in server tick loop"
+            r"|Encountered an unexpected exception"
+            r"|Failed to start the minecraft server"
+        ),
+    ),
+]
+
+
+def parse_line(line: str) -> LogEvent | None:
+    """
+    Распознавание строки лога сервера, означающей смену состояния.
+    """
+    for kind, pattern in _PATTERNS:
+        match = pattern.search(line)
+        if not match:
+            continue
+        if kind == LifecycleEvent.PROGRESS:
+            return LogEvent(kind, line, progress=int(match.group(1)))
+        if kind == LifecycleEvent.READY:
+            seconds = float(match.group(1).replace(",", "."))
+            return LogEvent(kind, line, progress=100, startup_seconds=seconds)
+        return LogEvent(kind, line)
+    return None
+
+
+class ServerOutputWatcher:
+    """
+    Чтение stdout/stderr процесса сервера и превращение строк жизненного
+    цикла в события.
+
+    Процесс запускается из обработчика нажатия Flet, где нет цикла asyncio,
+    поэтому чтение идёт в отдельном daemon-потоке. Поток постоянно вычитывает
+    канал (иначе сервер заблокируется на записи в полный pipe) и хранит
+    последние tail_size строк для отчёта о падении.
+    """
+
+    def __init__(self, process, on_event, tail_size: int = 200):
+        self.process = process
+        self.on_event = on_event
+        self._tail = deque(maxlen=tail_size)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def tail(self) -> list[str]:
+        return list(self._tail)
+
+    def _run(self):
+        for raw in self.process.stdout:
+            line = raw.rstrip("\r\n")
+            self._tail.append(line)
+            event = parse_line(line)
+            if event:
+                self.on_event(event)
+        exit_code = self.process.wait()
+        self.on_event(LogEvent(LifecycleEvent.EXITED, exit_code=exit_code))
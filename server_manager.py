@@ -1,11 +1,27 @@
-import socket
+import asyncio
 import os
 import platform
 import subprocess
 import threading
-from ui.alert_window import AlertWindow
+from console_alerts import ConsoleAlerts
+from metrics import STOP_DURATION, StatusTracker
 from server_status import ServerStatus
-from mcrcon import MCRcon
+from network_info import LocalAddressCache
+from server_log_watcher import LifecycleEvent, LogEvent, ServerOutputWatcher
+from rcon_async import AsyncRconClient
+from rcon_dispatcher import RconDispatcher
+from rcon_session import RconSession
+from resource_sampler import ResourceSampler
+from server_jobs import (
+    JobProgress,
+    JobState,
+    StopJob,
+    find_server_processes,
+    port_open,
+)
+from server_list_ping import ServerInfo
+from status_probe import ProbeResult, StatusProbe
+from tick_trace import TRACER
 import settings as st
 from settings_field import SettingsField
 
@@ -16,122 +32,319 @@ class ServerManager:
         rcon_host,
         rcon_password,
         rcon_port,
-        alert_window=AlertWindow,
+        alert_window=None,
         update_status_callback=None,
+        game_port=25565,
+        start_script=None,
+        probe_limiter=None,
+        name=None,
     ):
         self.rcon_host = rcon_host
         self.rcon_password = rcon_password
         self.rcon_port = rcon_port
-        self.mcrcon = MCRcon(self.rcon_host, self.rcon_password, self.rcon_port)
+        # Скрипт запуска конкретного сервера флота; None - из settings.json
+        self.start_script = start_script
+        # Метка server в метриках; имя из флота или host:port
+        self.name = name or f"{rcon_host}:{game_port}"
+        self.rcon_session = RconSession(
+            self.rcon_host, self.rcon_password, self.rcon_port, name=self.name
+        )
+        # Все команды (UI, задачи остановки, API, опрос) идут через очередь
+        self.rcon = RconDispatcher(self.rcon_session)
+        # Отдельное конвейерное соединение для чтений из цикла событий
+        self.async_rcon = AsyncRconClient(
+            self.rcon_host, self.rcon_password, self.rcon_port, name=self.name
+        )
+        self.status_probe = StatusProbe(
+            self.rcon_host,
+            self.rcon,
+            game_port=game_port,
+            rcon_port=self.rcon_port,
+            limiter=probe_limiter,
+            name=self.name,
+        )
         self.update_status_callback = update_status_callback
-        self.status = ServerStatus.OFFLINE
-        self.alert_window = alert_window
+        # До первой проверки состояние неизвестно (UI рисуется раньше неё)
+        self.status = ServerStatus.UNKNOWN
+        self.status_tracker = StatusTracker(self.name)
+        self.status_tracker.observe(self.status)
+        self.server_info = None
+        self.process = None
+        self.output_watcher = None
+        # Статус по логу процесса, запущенного из приложения; пока он есть,
+        # проверки портов служат только запасным источником.
+        self.event_status = None
+        self.start_progress = None
+        # Фоновая задача остановки/перезапуска и статус, который она держит.
+        self.job = None
+        self.job_status = None
+        # AlertWindow в GUI, ConsoleAlerts в режиме --headless
+        self.alert_window = alert_window or ConsoleAlerts()
+        self.local_address = LocalAddressCache(on_error=self._on_local_ip_error)
+        # CPU/память/потоки процесса сервера; запускается через start()
+        self.resource_sampler = ResourceSampler(self._server_processes)
+
+    def _server_processes(self) -> list:
+        return find_server_processes(self.process, self.status_probe.game_port)
+
+    def _on_local_ip_error(self, e):
+        self.alert_window.set_error(
+            f"получение ip компьютера:{e}. Переключение на локальный local_ip."
+        )
 
     def get_local_ip(self) -> str:
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
-        except Exception as e:
-            self.alert_window.set_error(
-                f"получение ip компьютера:{e}. Переключение на локальный local_ip."
-            )
-            return "127.0.0.1"
+        with TRACER.span("get_local_ip"):
+            return self.local_address.get()
 
-    def _check_port(self, port: int) -> bool:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            sock.settimeout(1)
-            return sock.connect_ex((self.rcon_host, port)) == 0
+    def get_local_addresses(self) -> list[str]:
+        return self.local_address.all_addresses()
 
-    def _rcon_is_ok(self) -> bool:
+    def update_server_status(self):
+        """
+        Синхронная обёртка над update_server_status_async для вызова вне
+        цикла событий. Внутри цикла asyncio.run невозможен, поэтому там
+        вызов сразу отклоняется с понятной ошибкой.
+        """
         try:
-            with MCRcon(self.rcon_host, self.rcon_password, self.rcon_port) as mcr:
-                mcr.connect()
-                return True
-        except Exception:
-            return False
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(self.update_server_status_async())
+            return
+        raise RuntimeError(
+            "update_server_status() вызван в работающем цикле событий: "
+            "используйте await update_server_status_async()"
+        )
 
-    def update_server_status(self):
-        ports = [25565, 25575]
+    async def update_server_status_async(self):
+        """
+        Неблокирующий вариант update_server_status для цикла событий UI:
+        все проверки выполняются одновременно.
+        """
+        with TRACER.span(f"probe {self.name}"):
+            self._apply_probe(await self.status_probe.probe())
 
-        port_65_ok = self._check_port(ports[0])
-        port_75_ok = self._check_port(ports[1])
-        rcon_ok = self._rcon_is_ok()
+    def _apply_probe(self, result: ProbeResult):
+        # ONLINE только после ответа на Server List Ping: пока мир грузится,
+        # JVM уже держит порт, но статус не отдаёт.
+        self.server_info = result.server_info
+        previous = self.status
 
-        if port_65_ok and port_75_ok and rcon_ok:
+        if self.job_status is not None:
+            self.status = self.job_status
+        elif self.event_status is not None:
+            self.status = self.event_status
+        elif result.game_ready and result.rcon_port_ok and result.rcon_ok:
             self.status = ServerStatus.ONLINE
-        elif port_65_ok and port_75_ok and not rcon_ok:
+        elif result.game_port_ok and result.rcon_port_ok:
             self.status = ServerStatus.STARTING
-        elif not port_65_ok and port_75_ok:
+        elif not result.game_port_ok and result.rcon_port_ok:
             if self.status != ServerStatus.RESTATING:
                 self.status = ServerStatus.STOPING
-        elif port_65_ok and not port_75_ok:
+        elif result.game_port_ok and not result.rcon_port_ok:
             self.status = ServerStatus.RCON_CLOSED
         else:
             self.status = ServerStatus.OFFLINE
+        self.status_tracker.observe(self.status)
 
-        if self.update_status_callback:
+        # Колбэк только при смене статуса: он будит цикл опроса, и вызов
+        # на каждом тике свёл бы адаптивный интервал на нет.
+        if self.status != previous and self.update_status_callback:
             self.update_status_callback()
 
-    def get_mcrcon(self):
-        return self.mcrcon
+    def get_rcon_session(self) -> RconSession:
+        return self.rcon_session
+
+    def get_rcon(self) -> RconDispatcher:
+        return self.rcon
+
+    def get_async_rcon(self) -> AsyncRconClient:
+        return self.async_rcon
 
     def get_status(self):
         return self.status
 
+    def get_server_info(self) -> ServerInfo | None:
+        """Последний ответ Server List Ping (игроки, MOTD, задержка)."""
+        return self.server_info
+
     def set_status(self, status):
         self.status = status
+        self.status_tracker.observe(status)
 
-    def start_server(self):
-        app_settings = st.Settings()
-        script = app_settings.get(SettingsField.SERVER_START_SCRIPT.value)
-        if not script:
-            self.alert_window.set_error(
-                "Скрипт для запуска сервера не указан!\nНажмите кнопку   Открыть папку с сервером и найдите файл со скриптом запуска сервера"
-            )
-            return
-        if not os.path.isfile(script):
-            self.alert_window.set_error(f"Скрипт не найден:\n{script}")
-            return
-        system = platform.system()
+    def get_start_progress(self) -> int | None:
+        """Процент подготовки spawn-зоны во время запуска (из лога сервера)."""
+        return self.start_progress
 
-        def run():
-            if system == "Windows" and script.endswith(".bat"):
-                self.process = subprocess.Popen(
-                    ["cmd.exe", "/c", script], cwd=os.path.dirname(script)
-                )
-            elif system == "Linux" and script.endswith(".sh"):
-                self.process = subprocess.Popen(
-                    ["bash", script], cwd=os.path.dirname(script)
+    def _on_lifecycle_event(self, event: LogEvent, process=None):
+        if process is not None and process is not self.process:
+            # Событие от предыдущего процесса (например, после перезапуска).
+            return
+        match event.kind:
+            case LifecycleEvent.STARTING:
+                self.event_status = ServerStatus.STARTING
+                self.start_progress = 0
+            case LifecycleEvent.PROGRESS:
+                self.event_status = ServerStatus.STARTING
+                self.start_progress = event.progress
+            case LifecycleEvent.READY:
+                self.event_status = ServerStatus.ONLINE
+                self.start_progress = None
+            case LifecycleEvent.STOPPING:
+                if self.status != ServerStatus.RESTATING:
+                    self.event_status = ServerStatus.STOPING
+            case LifecycleEvent.CRASHED:
+                self.event_status = ServerStatus.ERROR
+                self.alert_window.set_error(
+                    f"сервер завершился с ошибкой:\n{event.line}"
                 )
-            else:
-                self.alert_window.set_error(f"Неподдерживаемый скрипт!\n{script}")
+            case LifecycleEvent.EXITED:
+                crashed = self.event_status == ServerStatus.ERROR
+                self.event_status = None
+                self.start_progress = None
+                self.process = None
+                self.output_watcher = None
+                if crashed:
+                    self.status = ServerStatus.ERROR
+                elif self.status != ServerStatus.RESTATING:
+                    self.status = ServerStatus.OFFLINE
 
-        threading.Thread(target=run, daemon=True).start()
+        if self.event_status is not None:
+            self.status = self.event_status
+        if self.job_status is not None:
+            self.status = self.job_status
+        self.status_tracker.observe(self.status)
 
         if self.update_status_callback:
             self.update_status_callback()
 
-    def stop_server(self):
-        try:
-            with self.mcrcon as mcr:
-                responce = mcr.command("stop")
-        except Exception as e:
-            self.alert_window.set_error(f"при выполнении команды '{responce}': {e}")
-        if self.process:
+    def _spawn(self, args, cwd):
+        self.process = subprocess.Popen(
+            args,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        )
+        process = self.process
+        self.output_watcher = ServerOutputWatcher(
+            process, lambda event: self._on_lifecycle_event(event, process)
+        )
+        self.output_watcher.start()
+
+    def _start_script(self) -> str | None:
+        if self.start_script is not None:
+            return self.start_script
+        return st.get_settings().get(SettingsField.SERVER_START_SCRIPT.value)
+
+    def server_directory(self) -> str | None:
+        """Папка сервера - та, где лежит скрипт запуска"""
+        script = self._start_script()
+        return os.path.dirname(os.path.abspath(script)) if script else None
+
+    def start_server(self, background: bool = True) -> str | None:
+        """
+        Запуск сервера скриптом. Возвращает текст ошибки (он же показывается
+        в alert_window) или None. С background=False процесс запускается в
+        текущем потоке, и возвращается также ошибка самого запуска.
+        """
+        script = self._start_script()
+        system = platform.system()
+        args = None
+        if not script:
+            error = (
+                "Скрипт для запуска сервера не указан!\nНажмите кнопку   Открыть папку с сервером и найдите файл со скриптом запуска сервера"
+            )
+        elif not os.path.isfile(script):
+            error = f"Скрипт не найден:\n{script}"
+        elif system == "Windows" and script.endswith(".bat"):
+            args = ["cmd.exe", "/c", script]
+        elif system == "Linux" and script.endswith(".sh"):
+            args = ["bash", script]
+        else:
+            error = f"Неподдерживаемый скрипт!\n{script}"
+        if args is None:
+            self.alert_window.set_error(error)
+            return error
+
+        def run() -> str | None:
             try:
-                self.process.wait(timeout=60)  # ждем до 30 секунд
-            except subprocess.TimeoutExpired:
-                self.process.kill()
-                self.process.wait()
+                self._spawn(args, os.path.dirname(script))
+            except OSError as e:
+                message = f"Не удалось запустить сервер:\n{e}"
+                self.alert_window.set_error(message)
+                return message
+            return None
+
+        if background:
+            threading.Thread(target=run, daemon=True).start()
+            error = None
+        else:
+            error = run()
 
         if self.update_status_callback:
             self.update_status_callback()
+        return error
 
-    def restart_server(self):
-        self.stop_server()
+    def _run_stop_job(self, name, kind, status, then=None) -> StopJob:
+        if self.job and self.job.progress.running:
+            return self.job
+        duration = STOP_DURATION.labels(self.name, kind)
+
+        def on_progress(progress: JobProgress):
+            if not progress.running:
+                if progress.state == JobState.DONE:
+                    duration.observe(progress.elapsed)
+                elif progress.state == JobState.FAILED:
+                    self.alert_window.set_error(
+                        f"{progress.name}: {progress.message}"
+                    )
+                self.job_status = None
+            if self.update_status_callback:
+                self.update_status_callback()
+
+        self.job_status = status
+        self.status = status
+        self.status_tracker.observe(status)
+        self.job = StopJob(
+            name,
+            send_stop=lambda: self.rcon.command("stop"),
+            find_processes=self._server_processes,
+            is_stopped=lambda: not port_open(
+                self.rcon_host, self.status_probe.game_port
+            ),
+            on_progress=on_progress,
+            then=then,
+        )
+        self.job.start()
+        return self.job
+
+    def stop_server(self) -> StopJob:
+        """
+        Остановка сервера в фоне: RCON stop -> ожидание -> SIGTERM -> SIGKILL.
+        Не блокирует вызывающий поток; прогресс доступен через get_job_progress.
+        """
+        return self._run_stop_job("Остановка", "stop", ServerStatus.STOPING)
+
+    def restart_server(self) -> StopJob:
+        """
+        Перезапуск в фоне: та же остановка, затем start_server.
+        """
+        return self._run_stop_job(
+            "Перезапуск",
+            "restart",
+            ServerStatus.RESTATING,
+            then=self._start_after_stop,
+        )
+
+    def _start_after_stop(self):
+        self.job_status = None
         self.start_server()
-        if self.update_status_callback:
-            self.update_status_callback()
+
+    def cancel_job(self):
+        if self.job:
+            self.job.cancel()
+
+    def get_job_progress(self) -> JobProgress | None:
+        return self.job.progress if self.job else None
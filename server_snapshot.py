@@ -0,0 +1,76 @@
+import re
+import time
+from dataclasses import dataclass, field
+
+_TIME_RE = re.compile(r"(-?\d+)\s*$")
+_GAMERULE_RE = re.compile(r"currently set to:\s*(true|false)", re.IGNORECASE)
+_LIST_RE = re.compile(
+    r"There are (\d+) of a max(?: of)? (\d+) players online:?\s*(.*)", re.DOTALL
+)
+_DIFFICULTY_RE = re.compile(r"The difficulty is (\w+)")
+
+
+@dataclass(frozen=True)
+class ServerSnapshot:
+    """
+    Неизменяемый снимок состояния мира, собранный за один проход по RCON.
+    """
+
+    daytime_ticks: int | None
+    daylight_cycle: bool | None
+    weather: str | None
+    players_online: int
+    players_max: int
+    players: tuple[str, ...] = field(default_factory=tuple)
+    difficulty: str | None = None
+    # Абсолютный счётчик тиков мира и момент (time.monotonic()) его получения
+    gametime_ticks: int | None = None
+    gametime_at: float | None = None
+    collected_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def time(self) -> str:
+        return ticks_to_clock(self.daytime_ticks)
+
+    def age(self) -> float:
+        return time.monotonic() - self.collected_at
+
+
+def ticks_to_clock(ticks: int | None) -> str:
+    """
+    Конвертация тиков в 24-часовой формат: 0 тик = 6:00.
+    """
+    if ticks is None:
+        return "00:00"
+    total_minutes = (ticks / 1000 * 60 + 360) % 1440
+    return f"{int(total_minutes // 60):02d}:{int(total_minutes % 60):02d}"
+
+
+def parse_time_query(response: str) -> int | None:
+    """«The time is 1234» -> 1234."""
+    match = _TIME_RE.search(response.strip())
+    return int(match.group(1)) if match else None
+
+
+def parse_gamerule_bool(response: str) -> bool | None:
+    """«Gamerule doDaylightCycle is currently set to: true» -> True."""
+    match = _GAMERULE_RE.search(response)
+    return match.group(1).lower() == "true" if match else None
+
+
+def parse_player_list(response: str) -> tuple[int, int, tuple[str, ...]]:
+    """
+    «There are 2 of a max of 20 players online: Alex, Steve»
+    -> (2, 20, ("Alex", "Steve")).
+    """
+    match = _LIST_RE.search(response)
+    if not match:
+        return 0, 0, ()
+    names = tuple(n.strip() for n in match.group(3).split(",") if n.strip())
+    return int(match.group(1)), int(match.group(2)), names
+
+
+def parse_difficulty(response: str) -> str | None:
+    """«The difficulty is Normal» -> "Normal"."""
+    match = _DIFFICULTY_RE.search(response)
+    return match.group(1) if match else None
@@ -2,6 +2,7 @@ from enum import Enum
 
 
 class ServerStatus(Enum):
+    UNKNOWN = "Проверка состояния сервера..."
     OFFLINE = "Сервер выключен"
     ONLINE = "Сервер работает. Подключение совершено."
     STARTING = "Запуск сервера..."
@@ -1,16 +1,61 @@
+import atexit
 import json
 import os
+import tempfile
+import threading
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_settings(filename="settings.json") -> "Settings":
+    """
+    Общее на процесс хранилище настроек для файла filename.
+
+    Все компоненты приложения получают один и тот же экземпляр, поэтому файл
+    читается один раз и перечитывается только при его изменении на диске.
+    """
+    key = os.path.abspath(filename)
+    with _instances_lock:
+        if key not in _instances:
+            _instances[key] = Settings(filename)
+        return _instances[key]
 
 
 class Settings:
-    def __init__(self, filename="settings.json"):
+    def __init__(self, filename="settings.json", write_delay=0.5):
         self.filename = filename
+        self.write_delay = write_delay
         self._data = {}
+        self._signature = None
+        self._lock = threading.RLock()
+        self._timer = None
+        self._subscribers = {}
         self.load()
+        atexit.register(self.flush)
+
+    def _stat_signature(self):
+        """(mtime, inode, размер) файла или None, если файла нет"""
+        try:
+            st = os.stat(self.filename)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_ino, st.st_size
 
     def load(self):
         """Загрузка настроек из файла"""
-        if os.path.exists(self.filename):
+        with self._lock:
+            pending = self._load_locked()
+        self._fire(pending)
+
+    def _load_locked(self):
+        """
+        Перечитывает файл под self._lock. Подписчиков не вызывает, а
+        возвращает отложенные уведомления для _fire после снятия блокировки.
+        """
+        old = self._data
+        self._signature = self._stat_signature()
+        if self._signature is not None:
             try:
                 with open(self.filename, "r", encoding="utf-8") as f:
                     self._data = json.load(f)
@@ -18,27 +63,128 @@ class Settings:
                 self._data = {}
         else:
             self._data = {}
+        return [
+            self._pending(key, self._data.get(key))
+            for key in old.keys() | self._data.keys()
+            if old.get(key) != self._data.get(key)
+        ]
+
+    def _reload_if_changed(self):
+        """Перечитывает файл, только если его mtime/inode/размер изменились"""
+        pending = []
+        with self._lock:
+            # При отложенной записи несохранённые изменения в памяти новее файла.
+            if self._timer is None and self._stat_signature() != self._signature:
+                pending = self._load_locked()
+        self._fire(pending)
 
     def save(self):
-        """Сохранение настроек в файл"""
-        with open(self.filename, "w", encoding="utf-8") as f:
-            json.dump(self._data, f, ensure_ascii=False, indent=2)
+        """Атомарное сохранение настроек: временный файл + fsync + rename"""
+        with self._lock:
+            self._cancel_timer()
+            directory = os.path.dirname(os.path.abspath(self.filename))
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=".settings-", suffix=".tmp", dir=directory
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.filename)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+            self._signature = self._stat_signature()
+
+    def flush(self):
+        """Немедленная запись отложенных изменений"""
+        with self._lock:
+            if self._timer is not None:
+                self.save()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _schedule_save(self):
+        """Отложенная запись: серия изменений сохраняется одной записью"""
+        with self._lock:
+            self._cancel_timer()
+            self._timer = threading.Timer(self.write_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
 
     def get(self, key, default=None):
         """Получение значения по ключу"""
+        self._reload_if_changed()
         return self._data.get(key, default)
 
+    def get_with_override(self, key, override, default=None):
+        """
+        Параметр, который можно задать и в командной строке: override
+        (если не None) важнее значения из файла, оно - важнее default
+        """
+        if override is not None:
+            return override
+        return self.get(key, default)
+
     def set(self, key, value):
         """Установка значения"""
-        self._data[key] = value
-        self.save()
+        # Сначала подхватываем правку файла извне, иначе запись её затрёт.
+        self._reload_if_changed()
+        with self._lock:
+            if self._data.get(key) == value and key in self._data:
+                return
+            self._data[key] = value
+            self._schedule_save()
+            pending = [self._pending(key, value)]
+        self._fire(pending)
 
     def remove(self, key):
         """Удаление ключа"""
-        if key in self._data:
+        self._reload_if_changed()
+        with self._lock:
+            if key not in self._data:
+                return
             del self._data[key]
-            self.save()
+            self._schedule_save()
+            pending = [self._pending(key, None)]
+        self._fire(pending)
 
     def all(self):
         """Возвращает весь словарь настроек"""
+        self._reload_if_changed()
         return self._data
+
+    def subscribe(self, key, callback):
+        """
+        Подписка на изменение значения key: callback(value) вызывается при
+        set/remove и при изменении файла извне. Возвращает функцию отписки.
+        """
+        with self._lock:
+            self._subscribers.setdefault(key, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers.get(key, []).remove(callback)
+
+        return unsubscribe
+
+    def _pending(self, key, value):
+        """Снимок подписчиков key; вызывать под self._lock"""
+        return list(self._subscribers.get(key, [])), value
+
+    @staticmethod
+    def _fire(pending):
+        """
+        Вызывает подписчиков уже без блокировки: они могут читать настройки
+        или ждать другие потоки, которым нужен тот же Settings
+        """
+        for callbacks, value in pending:
+            for callback in callbacks:
+                callback(value)
@@ -3,3 +3,12 @@ from enum import Enum
 
 class SettingsField(Enum):
     SERVER_START_SCRIPT = "server_start_script"
+    POLL_MAX_INTERVAL = "poll_max_interval"
+    SERVERS = "servers"
+    SAMPLER_INTERVAL = "sampler_interval"
+    METRICS_PORT = "metrics_port"
+    TICK_BUDGET = "tick_budget"
+    SCHEDULED_TASKS = "scheduled_tasks"
+    BACKUP_DIR = "backup_dir"
+    BACKUP_KEEP = "backup_keep"
+    WORLD_STALE_DAYS = "world_stale_days"
@@ -0,0 +1,55 @@
+import sys
+import time
+from contextlib import contextmanager
+
+# Отсчёт от импорта этого модуля - первого импорта main.py
+_ORIGIN = time.perf_counter()
+
+
+class StartupProfile:
+    """
+    Тайминги холодного запуска для --profile-startup.
+
+    stage() измеряет длительность этапа (импорт, инициализация), mark() -
+    момент события от начала запуска (первый кадр, первая проверка).
+    Замеры копятся всегда (это пара вызовов perf_counter) до report():
+    он завершает профиль и печатает его в stderr, только если
+    профилирование включено. Замеры после report() не сохраняются.
+    """
+
+    def __init__(self, origin: float = _ORIGIN):
+        self.origin = origin
+        self.enabled = False
+        self.stages = []
+        self.marks = []
+        self._reported = False
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if not self._reported:
+                self.stages.append((name, time.perf_counter() - started))
+
+    def mark(self, name: str):
+        if not self._reported:
+            self.marks.append((name, time.perf_counter() - self.origin))
+
+    def format(self) -> str:
+        lines = ["Профиль запуска:"]
+        lines += [f"  {name:<32} {sec * 1000:8.1f} мс" for name, sec in self.stages]
+        lines += [f"  @ {name:<30} {sec * 1000:8.1f} мс" for name, sec in self.marks]
+        return "\n".join(lines)
+
+    def report(self, file=None):
+        """Один отчёт за запуск, если профилирование включено"""
+        if self._reported:
+            return
+        self._reported = True
+        if self.enabled:
+            print(self.format(), file=file or sys.stderr, flush=True)
+
+
+PROFILE = StartupProfile()
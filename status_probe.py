@@ -0,0 +1,131 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from metrics import PROBE_DURATION
+from tick_trace import TRACER
+from rcon_dispatcher import RconDispatcher
+from rcon_session import RconUnavailable
+from server_list_ping import ServerInfo, ServerListPingError, server_list_ping
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    game_port_ok: bool
+    rcon_port_ok: bool
+    rcon_ok: bool
+    server_info: ServerInfo | None = None
+
+    @property
+    def game_ready(self) -> bool:
+        """Сервер ответил на Server List Ping, мир загружен."""
+        return self.server_info is not None
+
+
+class StatusProbe:
+    """
+    Асинхронная проверка состояния сервера.
+
+    Server List Ping на игровом порту, проверка порта RCON и логина в RCON
+    запускаются одновременно, у каждой свой дедлайн. Тик длится столько,
+    сколько самая медленная проверка, а не сумму всех трёх, и не блокирует
+    цикл событий UI.
+
+    limiter (asyncio.Semaphore) ограничивает число одновременных сетевых
+    проверок; во флоте серверов он общий для всех StatusProbe.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        rcon: RconDispatcher,
+        game_port: int = 25565,
+        rcon_port: int = 25575,
+        port_timeout: float = 1.0,
+        rcon_timeout: float = 2.0,
+        limiter: asyncio.Semaphore | None = None,
+        name: str | None = None,
+    ):
+        self.host = host
+        self.rcon = rcon
+        self.game_port = game_port
+        self.rcon_port = rcon_port
+        self.port_timeout = port_timeout
+        self.rcon_timeout = rcon_timeout
+        self.limiter = limiter
+        # Незавершённый ping сессии: следующий тик ждёт его, а не ставит
+        # в очередь ещё один
+        self._ping = None
+        label = name or f"{host}:{game_port}"
+        self._durations = {
+            check: PROBE_DURATION.labels(label, check)
+            for check in ("game", "rcon_port", "rcon")
+        }
+
+    async def _limited(self, coro):
+        if self.limiter is None:
+            return await coro
+        async with self.limiter:
+            return await coro
+
+    async def _timed(self, coro, check: str):
+        # Отсчёт после захвата limiter: в метрике только сама проверка
+        started = time.perf_counter()
+        try:
+            with TRACER.span(check):
+                return await coro
+        finally:
+            self._durations[check].observe(time.perf_counter() - started)
+
+    async def check_port(self, port: int) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, port), self.port_timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def check_game(self) -> tuple[bool, ServerInfo | None]:
+        """
+        Server List Ping на игровом порту.
+
+        Возвращает (порт принимает соединения, статус сервера или None, если
+        сервер ещё не отвечает на статус-запрос).
+        """
+        try:
+            info = await server_list_ping(
+                self.host, self.game_port, timeout=self.port_timeout
+            )
+        except ServerListPingError:
+            return True, None
+        except (OSError, asyncio.TimeoutError):
+            return False, None
+        return True, info
+
+    async def check_rcon(self) -> bool:
+        # ping идёт через очередь RconDispatcher, как все команды сессии.
+        # Дедлайн короче сокетного таймаута сессии: ping может пережить
+        # проверку, и пока он не выполнен, новый не ставится в очередь.
+        if self._ping is None or self._ping.done():
+            try:
+                self._ping = asyncio.wrap_future(self.rcon.ping())
+            except RconUnavailable:
+                return False
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._ping), self.rcon_timeout)
+        except (asyncio.TimeoutError, RconUnavailable):
+            return False
+
+    async def probe(self) -> ProbeResult:
+        (game_port_ok, server_info), rcon_port_ok, rcon_ok = await asyncio.gather(
+            self._limited(self._timed(self.check_game(), "game")),
+            self._limited(self._timed(self.check_port(self.rcon_port), "rcon_port")),
+            self._limited(self._timed(self.check_rcon(), "rcon")),
+        )
+        return ProbeResult(game_port_ok, rcon_port_ok, rcon_ok, server_info)
@@ -0,0 +1,388 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from enum import Enum
+
+from cron_expression import CronExpression
+from settings_field import SettingsField
+
+logger = logging.getLogger("srvop")
+
+# Пропущенный разовый запуск (приложение было закрыто) выполняется, если
+# опоздание меньше этого порога, иначе отбрасывается.
+MISSED_GRACE = 300.0
+# Таймер просыпается не реже, чем раз в столько секунд: переход на
+# летнее время, сон ноутбука и перевод часов не сдвигают расписание.
+MAX_SLEEP = 60.0
+# Пауза таймера после ошибки, чтобы она не повторялась в цикле без сна
+ERROR_DELAY = 1.0
+
+
+class TaskAction(Enum):
+    COMMAND = "command"
+    RESTART = "restart"
+    STOP = "stop"
+    START = "start"
+    BACKUP = "backup"
+
+
+_DEFAULT_MESSAGES = {
+    TaskAction.RESTART: "Перезапуск сервера через {left}",
+    TaskAction.STOP: "Остановка сервера через {left}",
+}
+
+
+def parse_at(value) -> float:
+    """Момент разовой задачи: время Unix или строка ISO 8601 (локальное время)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    raise ValueError(f"некорректное время запуска: {value!r}")
+
+
+def format_left(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds >= 60 and seconds % 60 == 0:
+        return f"{seconds // 60} мин"
+    return f"{seconds} с"
+
+
+@dataclass(frozen=True)
+class ScheduledTask:
+    """
+    Задача расписания в том виде, в каком она хранится в settings.json.
+
+    cron - повторяющаяся задача, at - разовая (время Unix). countdown -
+    за сколько секунд до запуска объявить об этом в чат (`say`), message -
+    текст объявления с подстановкой {left}.
+    """
+
+    id: str
+    action: TaskAction
+    server: str | None = None
+    command: str | None = None
+    cron: str | None = None
+    at: float | None = None
+    countdown: tuple[int, ...] = ()
+    message: str | None = None
+
+    def __post_init__(self):
+        if (self.cron is None) == (self.at is None):
+            raise ValueError(f"задача {self.id}: нужен ровно один из cron и at")
+        # Строка вместо числа в куче сломала бы сравнения в таймере
+        if self.at is not None:
+            object.__setattr__(self, "at", parse_at(self.at))
+        try:
+            countdown = tuple(sorted((int(s) for s in self.countdown), reverse=True))
+        except (TypeError, ValueError):
+            raise ValueError(f"задача {self.id}: countdown - список секунд") from None
+        object.__setattr__(self, "countdown", countdown)
+        if self.action == TaskAction.COMMAND and not self.command:
+            raise ValueError(f"задача {self.id}: не указана команда")
+        if self.cron is not None:
+            CronExpression(self.cron)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ScheduledTask":
+        return cls(
+            id=str(data["id"]),
+            action=TaskAction(data.get("action", TaskAction.COMMAND.value)),
+            server=data.get("server"),
+            command=data.get("command"),
+            cron=data.get("cron"),
+            at=data.get("at"),
+            countdown=tuple(data.get("countdown", ())),
+            message=data.get("message"),
+        )
+
+    def to_dict(self) -> dict:
+        data = {k: v for k, v in asdict(self).items() if v not in (None, ())}
+        data["action"] = self.action.value
+        if self.countdown:
+            data["countdown"] = list(self.countdown)
+        return data
+
+    def describe(self) -> str:
+        if self.action == TaskAction.COMMAND:
+            return f"/{self.command}"
+        return self.action.value
+
+    def announcement(self, left: float) -> str:
+        template = self.message or _DEFAULT_MESSAGES.get(
+            self.action, f"{self.describe()} через {{left}}"
+        )
+        return template.format(left=format_left(left))
+
+
+@dataclass(order=True)
+class _Entry:
+    when: float
+    seq: int
+    task_id: str = field(compare=False)
+    generation: int = field(compare=False)
+    # None - запуск задачи, число - объявление за столько секунд
+    countdown: int | None = field(compare=False, default=None)
+
+
+class TaskScheduler:
+    """
+    Расписание операций над серверами флота.
+
+    Все задачи обслуживает одна корутина run() над min-кучей моментов
+    срабатывания: она спит до ближайшего, выполняет наступившие и кладёт
+    в кучу следующий запуск. Добавление и удаление задач будят её. Отмена
+    ленивая: записи кучи со старым поколением задачи просто пропускаются,
+    поэтому операции стоят O(log n) и сотни задач не нагружают цикл.
+
+    Команды отправляются через MCommands.send_command сервера, перезапуск
+    и остановка - через ServerManager, резервные копии - через WorldBackup
+    из backups. Задачи хранятся в settings.json
+    (ключ scheduled_tasks); правка файла извне применяется на лету.
+    """
+
+    def __init__(self, fleet, commands: dict, settings, backups=None, clock=time.time):
+        self.fleet = fleet
+        self.commands = commands
+        self.backups = backups or {}
+        self.settings = settings
+        self.clock = clock
+        self._tasks = {}
+        self._generation = {}
+        self._next_run = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = None
+        self._loop = None
+        self._running = set()
+        self._saved = None
+        self._load(settings.get(SettingsField.SCHEDULED_TASKS.value) or [])
+        self._unsubscribe = settings.subscribe(
+            SettingsField.SCHEDULED_TASKS.value, self._on_settings
+        )
+
+    # ---- Задачи ----
+
+    def tasks(self) -> list[tuple[ScheduledTask, float | None]]:
+        """Задачи и время их следующего запуска, ближайшие первыми"""
+        with self._lock:
+            items = [(t, self._next_run.get(t.id)) for t in self._tasks.values()]
+        return sorted(items, key=lambda item: (item[1] is None, item[1] or 0))
+
+    def add(self, task: ScheduledTask):
+        """Добавление или замена задачи с тем же id"""
+        self._validate_server(task)
+        now = self.clock()
+        # Ошибка расписания выясняется до изменения задач и кучи
+        when = self._first_run(task, now)
+        with self._lock:
+            self._tasks[task.id] = task
+            self._plan(task, now, when)
+        self._persist()
+        self._notify()
+
+    def add_once(self, task_id: str, delay: float, action: TaskAction, **kwargs):
+        """Разовая задача через delay секунд"""
+        task = ScheduledTask(task_id, action, at=self.clock() + delay, **kwargs)
+        self.add(task)
+        return task
+
+    def remove(self, task_id: str) -> bool:
+        with self._lock:
+            if self._tasks.pop(task_id, None) is None:
+                return False
+            self._generation[task_id] = self._generation.get(task_id, 0) + 1
+            self._next_run.pop(task_id, None)
+        self._persist()
+        self._notify()
+        return True
+
+    def close(self):
+        self._unsubscribe()
+
+    # ---- Таймер ----
+
+    async def run(self):
+        """Единственная корутина-таймер; работает до отмены"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        try:
+            while True:
+                self._wake.clear()
+                try:
+                    for task, countdown in self._pop_due(self.clock()):
+                        self._spawn(task, countdown)
+                    delay = self._delay(self.clock())
+                except Exception:
+                    # Таймер обслуживает все задачи: он не должен умирать
+                    logger.exception("Ошибка таймера расписания")
+                    self._drop_bad_entries()
+                    delay = ERROR_DELAY
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except TimeoutError:
+                    pass
+        finally:
+            for job in list(self._running):
+                job.cancel()
+
+    def _delay(self, now: float) -> float:
+        with self._lock:
+            if not self._heap:
+                return MAX_SLEEP
+            return min(max(self._heap[0].when - now, 0.0), MAX_SLEEP)
+
+    def _drop_bad_entries(self):
+        with self._lock:
+            self._heap = [e for e in self._heap if isinstance(e.when, float)]
+            heapq.heapify(self._heap)
+
+    def _pop_due(self, now: float) -> list:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0].when <= now:
+                entry = heapq.heappop(self._heap)
+                task = self._tasks.get(entry.task_id)
+                if task is None or entry.generation != self._generation[task.id]:
+                    continue  # задача удалена или перепланирована
+                if entry.countdown is None:
+                    try:
+                        self._after_run(task, entry.when, now)
+                    except ValueError as e:
+                        # cron больше не срабатывает: этот запуск последний
+                        logger.error("Задача %s без следующего запуска: %s", task.id, e)
+                        self._next_run.pop(task.id, None)
+                due.append((task, entry.countdown))
+        if any(countdown is None and task.at is not None for task, countdown in due):
+            self._persist()
+        return due
+
+    def _after_run(self, task: ScheduledTask, when: float, now: float):
+        if task.cron is not None:
+            self._plan(task, max(when, now))
+        else:
+            # Разовая задача выполнена и больше не хранится
+            del self._tasks[task.id]
+            self._next_run.pop(task.id, None)
+
+    @staticmethod
+    def _first_run(task: ScheduledTask, now: float) -> float:
+        if task.cron is None:
+            return task.at
+        moment = CronExpression(task.cron).next_after(datetime.fromtimestamp(now))
+        return moment.timestamp()
+
+    def _plan(self, task: ScheduledTask, now: float, when: float | None = None):
+        """Кладёт в кучу следующий запуск задачи и её объявления"""
+        if when is None:
+            when = self._first_run(task, now)
+        generation = self._generation.get(task.id, 0) + 1
+        self._generation[task.id] = generation
+        self._next_run[task.id] = when
+        heapq.heappush(self._heap, _Entry(when, next(self._seq), task.id, generation))
+        for seconds in task.countdown:
+            if when - seconds > now:
+                entry = _Entry(
+                    when - seconds, next(self._seq), task.id, generation, seconds
+                )
+                heapq.heappush(self._heap, entry)
+
+    def _notify(self):
+        if self._wake is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wake.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    # ---- Выполнение ----
+
+    def _spawn(self, task: ScheduledTask, countdown: int | None):
+        job = asyncio.create_task(self._execute(task, countdown))
+        self._running.add(job)
+        job.add_done_callback(self._running.discard)
+
+    async def _execute(self, task: ScheduledTask, countdown: int | None):
+        server = task.server or self.fleet.definitions[0].name
+        try:
+            if countdown is not None:
+                await self._send(server, f"say {task.announcement(countdown)}")
+                return
+            logger.info("Расписание: %s на %s (%s)", task.describe(), server, task.id)
+            manager = self.fleet.get(server)
+            match task.action:
+                case TaskAction.COMMAND:
+                    await self._send(server, task.command)
+                case TaskAction.RESTART:
+                    manager.restart_server()
+                case TaskAction.STOP:
+                    manager.stop_server()
+                case TaskAction.START:
+                    manager.start_server()
+                case TaskAction.BACKUP:
+                    if not self.backups[server].start():
+                        logger.warning("Резервная копия %s уже выполняется", server)
+        except Exception:
+            logger.exception("Ошибка задачи расписания %s", task.id)
+
+    async def _send(self, server: str, command: str):
+        # send_command сам сообщает об ошибке через alert_window
+        await asyncio.to_thread(self.commands[server].send_command, command)
+
+    # ---- Хранение ----
+
+    def _validate_server(self, task: ScheduledTask):
+        if task.server is not None and task.server not in self.commands:
+            raise ValueError(f"задача {task.id}: неизвестный сервер {task.server}")
+
+    def _load(self, entries: list):
+        tasks, first = {}, {}
+        now = self.clock()
+        for data in entries:
+            try:
+                task = ScheduledTask.from_dict(data)
+                self._validate_server(task)
+                when = self._first_run(task, now)
+                if task.at is not None and when < now - MISSED_GRACE:
+                    logger.warning(
+                        "Разовая задача %s пропущена: её время прошло", task.id
+                    )
+                    continue
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning("Задача расписания пропущена: %s", e)
+                continue
+            tasks[task.id], first[task.id] = task, when
+        with self._lock:
+            # Всё расписание строится заново, старые записи кучи не нужны
+            self._heap = []
+            self._tasks = tasks
+            self._next_run = {}
+            for task in tasks.values():
+                self._plan(task, now, first[task.id])
+        self._saved = [t.to_dict() for t in tasks.values()]
+
+    def _persist(self):
+        with self._lock:
+            data = [t.to_dict() for t in self._tasks.values()]
+        self._saved = data
+        self.settings.set(SettingsField.SCHEDULED_TASKS.value, data)
+
+    def _on_settings(self, value):
+        if (value or []) == self._saved:
+            return  # собственная запись
+        self._load(value or [])
+        self._notify()
+
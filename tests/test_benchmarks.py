@@ -0,0 +1,77 @@
+# tests/test_benchmarks.py
+
+import json
+
+import pytest
+from benchmarks import run
+from benchmarks.fake_servers import FakeRconServer, FakeServers
+from rcon_session import RconSession
+from server_manager import ServerManager
+from server_status import ServerStatus
+
+
+def test_fake_servers_look_online_to_the_manager():
+    """
+    The stand-in RCON and Server List Ping listeners satisfy every probe.
+    """
+    with FakeServers(FakeRconServer(run.PASSWORD)) as servers:
+        manager = ServerManager(
+            "127.0.0.1",
+            run.PASSWORD,
+            servers.rcon_port,
+            run.CountingAlerts(),
+            game_port=servers.game_port,
+        )
+        manager.update_server_status()
+        manager.get_rcon_session().close()
+
+    assert manager.get_status() == ServerStatus.ONLINE
+    assert manager.get_server_info().player_sample == ("Alex", "Steve")
+
+
+def test_dropped_commands_are_retried_by_the_session():
+    """
+    A command the fake drops is retried once on a fresh connection.
+    """
+    rcon = FakeRconServer(run.PASSWORD, failure_rate=1.0)
+    with FakeServers(rcon) as servers:
+        session = RconSession("127.0.0.1", run.PASSWORD, servers.rcon_port)
+        rcon.failure_rate = 0.0
+        session.command("list")
+        rcon.failure_rate = 1.0
+        with pytest.raises(Exception):
+            session.command("list")
+        session.close()
+
+    assert rcon.failures == 2
+
+
+def test_summarize_percentiles():
+    stats = run.summarize([i / 1000 for i in range(1, 101)])
+
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == pytest.approx(50)
+    assert stats["p99_ms"] == pytest.approx(99)
+    assert stats["max_ms"] == pytest.approx(100)
+
+
+def test_main_writes_json_and_compares(tmp_path, capsys):
+    """
+    A short run stores every scenario and prints the change vs a baseline.
+    """
+    first = tmp_path / "first.json"
+    run.main(["-n", "3", "--out", str(first)])
+    second = tmp_path / "second.json"
+    run.main(["-n", "3", "--out", str(second), "--compare", str(first)])
+
+    report = json.loads(second.read_text(encoding="utf-8"))
+    assert set(report["results"]) == {
+        "get_server_time",
+        "update_server_status",
+        "update_server_status_async",
+        "send_command",
+        "send_command_async",
+        "update_tick",
+    }
+    assert report["meta"]["iterations"] == 3
+    assert "p50" in capsys.readouterr().out
@@ -0,0 +1,51 @@
+# tests/test_cron_expression.py
+
+from datetime import datetime
+
+import pytest
+from cron_expression import CronExpression
+
+
+@pytest.mark.parametrize(
+    "text, after, expected",
+    [
+        ("*/15 * * * *", datetime(2025, 5, 1, 10, 7), datetime(2025, 5, 1, 10, 15)),
+        ("0 4 * * *", datetime(2025, 5, 1, 4, 0), datetime(2025, 5, 2, 4, 0)),
+        ("30 6 * * 1-5", datetime(2025, 5, 2, 7, 0), datetime(2025, 5, 5, 6, 30)),
+        ("0 0 1 * *", datetime(2025, 12, 15), datetime(2026, 1, 1)),
+        ("0 0 29 2 *", datetime(2025, 3, 1), datetime(2028, 2, 29)),
+        ("@hourly", datetime(2025, 5, 1, 10, 59, 30), datetime(2025, 5, 1, 11, 0)),
+        ("0 12 * * 7", datetime(2025, 5, 1), datetime(2025, 5, 4, 12, 0)),
+    ],
+)
+def test_next_after(text, after, expected):
+    assert CronExpression(text).next_after(after) == expected
+
+
+def test_day_of_month_and_weekday_are_combined_with_or():
+    """
+    Like classic cron: the 13th of the month or any Friday.
+    """
+    cron = CronExpression("0 0 13 * 5")
+
+    assert cron.next_after(datetime(2025, 5, 1)) == datetime(2025, 5, 2)
+    assert cron.next_after(datetime(2025, 5, 12)) == datetime(2025, 5, 13)
+
+
+def test_stepped_star_day_is_combined_with_and():
+    """
+    A day field starting with "*" (here */2) is not a restriction for the
+    OR rule: the job runs on Mondays that fall on an odd day of the month.
+    """
+    cron = CronExpression("0 4 */2 * 1")
+
+    assert cron.next_after(datetime(2025, 5, 1)) == datetime(2025, 5, 5, 4, 0)
+    assert cron.next_after(datetime(2025, 5, 5, 4, 0)) == datetime(2025, 5, 19, 4, 0)
+
+
+@pytest.mark.parametrize(
+    "text", ["* * * *", "60 * * * *", "* * * 13 *", "*/0 * * * *", "a * * * *"]
+)
+def test_invalid_expressions_are_rejected(text):
+    with pytest.raises(ValueError):
+        CronExpression(text)
@@ -0,0 +1,84 @@
+# tests/test_fleet.py
+
+import asyncio
+import time
+
+import pytest
+from fleet import Fleet, ServerDefinition
+from server_status import ServerStatus
+
+DEFAULT = ServerDefinition("main", "127.0.0.1", 25565, 25575, "777")
+
+
+def make_fleet(mocker, count, **kwargs):
+    definitions = [
+        ServerDefinition(f"srv{i}", game_port=25565 + i, rcon_port=26000 + i)
+        for i in range(count)
+    ]
+    return Fleet(definitions, mocker.MagicMock(), **kwargs)
+
+
+def test_from_settings_falls_back_to_single_server(mocker):
+    """
+    Without a "servers" list the fleet is the single default server.
+    """
+    settings = mocker.MagicMock()
+    settings.get.return_value = None
+
+    fleet = Fleet.from_settings(settings, DEFAULT, mocker.MagicMock())
+
+    assert len(fleet) == 1
+    assert fleet.primary().status_probe.rcon_port == 25575
+
+
+def test_from_settings_builds_every_server(mocker):
+    settings = mocker.MagicMock()
+    settings.get.return_value = [
+        {"name": "lobby", "game_port": 25565, "rcon_port": 25575},
+        {"name": "creative", "game_port": 25566, "rcon_port": 25576},
+    ]
+
+    fleet = Fleet.from_settings(settings, DEFAULT, mocker.MagicMock())
+
+    assert [name for name, _ in fleet.items()] == ["lobby", "creative"]
+    assert fleet.get("creative").status_probe.game_port == 25566
+
+
+def test_duplicate_names_are_rejected(mocker):
+    with pytest.raises(ValueError):
+        Fleet([DEFAULT, DEFAULT], mocker.MagicMock())
+
+
+def test_update_all_is_concurrent_and_limited(mocker):
+    """
+    Ten servers (thirty checks) finish in two waves of the shared limiter
+    instead of ten sequential probes.
+    """
+    in_flight = peak = 0
+
+    async def slow_check(*args, result=False):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.1)
+        in_flight -= 1
+        return result
+
+    async def slow_game_check():
+        return await slow_check(result=(False, None))
+
+    mocker.patch("status_probe.StatusProbe.check_port", side_effect=slow_check)
+    mocker.patch("status_probe.StatusProbe.check_rcon", side_effect=slow_check)
+    mocker.patch("status_probe.StatusProbe.check_game", side_effect=slow_game_check)
+
+    async def scenario():
+        fleet = make_fleet(mocker, 10, max_concurrent_probes=15)
+        started = time.monotonic()
+        await fleet.update_all()
+        return fleet, time.monotonic() - started
+
+    fleet, elapsed = asyncio.run(scenario())
+
+    assert elapsed < 0.5
+    assert peak == 15
+    assert all(m.get_status() == ServerStatus.OFFLINE for _, m in fleet.items())
@@ -0,0 +1,38 @@
+# tests/test_game_clock.py
+
+from game_clock import GameClock
+
+
+def test_clock_advances_while_cycle_is_on():
+    """
+    Between syncs the clock runs at 20 ticks per second and wraps at 24000.
+    """
+    clock = GameClock()
+    clock.sync(23900, True, at=100.0)
+
+    assert clock.ticks(now=103.0) == 23960
+    assert clock.ticks(now=110.0) == 100
+    assert clock.ticks(now=110.0, rate=10.0) == 0
+
+
+def test_clock_is_frozen_while_cycle_is_off():
+    clock = GameClock()
+    clock.sync(6000, False, at=0.0)
+
+    assert clock.ticks(now=50.0) == 6000
+
+
+def test_resync_after_interval_or_invalidate():
+    """
+    A fresh sync is requested periodically and right after invalidate().
+    """
+    clock = GameClock(resync_interval=60)
+    assert clock.needs_sync(now=0.0)
+
+    clock.sync(0, True, at=0.0)
+    assert not clock.needs_sync(now=59.0)
+    assert clock.needs_sync(now=60.0)
+
+    clock.sync(0, True, at=60.0)
+    clock.invalidate()
+    assert clock.needs_sync(now=61.0)
@@ -0,0 +1,229 @@
+# tests/test_headless.py
+
+import asyncio
+import json
+import subprocess
+import sys
+
+import pytest
+from console_alerts import ConsoleAlerts
+from fleet import Fleet, ServerDefinition
+from headless import ApiError, HeadlessDaemon
+from poll_scheduler import PollScheduler
+from server_status import ServerStatus
+from settings import Settings
+from world_files import build_region
+
+
+@pytest.fixture
+def daemon():
+    """
+    Creates a daemon over a two-server fleet; nothing is contacted.
+    """
+    alerts = ConsoleAlerts()
+    fleet = Fleet(
+        [ServerDefinition("lobby"), ServerDefinition("creative", game_port=25566)],
+        alerts,
+    )
+    return HeadlessDaemon(fleet, alerts, PollScheduler())
+
+
+def test_headless_entry_point_does_not_import_flet():
+    """
+    The daemon must run on boxes without a GUI stack.
+    """
+    code = "import sys, main, headless; sys.exit('flet' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_status_lists_every_server(daemon):
+    status, payload = asyncio.run(daemon.dispatch("GET", "/status", {}))
+
+    assert status == 200
+    assert [s["name"] for s in payload["servers"]] == ["lobby", "creative"]
+    assert payload["servers"][0]["status"] == "unknown"
+
+
+def test_unknown_routes_methods_and_servers_are_rejected(daemon):
+    for method, target, code in (
+        ("GET", "/nope", 404),
+        ("GET", "/stop", 405),
+        ("POST", "/stop?server=survival", 404),
+    ):
+        with pytest.raises(ApiError) as error:
+            asyncio.run(daemon.dispatch(method, target, {}))
+        assert error.value.status == code
+
+
+def test_command_is_sent_to_the_selected_server(daemon, mocker):
+    session = daemon.fleet.get("creative").get_rcon_session()
+    mocker.patch.object(session, "command", return_value="There are 0 of a max 20")
+
+    status, payload = asyncio.run(
+        daemon.dispatch("POST", "/command", {"server": "creative", "command": "list"})
+    )
+
+    assert status == 200
+    assert payload["response"] == "There are 0 of a max 20"
+    session.command.assert_called_once_with("list")
+
+
+def test_start_errors_are_returned_as_conflict(daemon, mocker):
+    """
+    The validation error returned by start_server becomes the API response.
+    """
+    mocker.patch("server_manager.st.get_settings").return_value.get.return_value = None
+
+    with pytest.raises(ApiError) as error:
+        asyncio.run(daemon.dispatch("POST", "/start", {}))
+
+    assert error.value.status == 409
+    assert "Скрипт" in error.value.message
+
+
+def test_start_reports_its_own_spawn_error_only(tmp_path, mocker):
+    """
+    /start answers with the outcome of this start: an unrelated alert from
+    another server is ignored, a failed spawn is reported.
+    """
+    script = tmp_path / "start.sh"
+    script.write_text("exit 0\n")
+    alerts = ConsoleAlerts()
+    fleet = Fleet([ServerDefinition("lobby", start_script=str(script))], alerts)
+    daemon = HeadlessDaemon(fleet, alerts, PollScheduler())
+    mocker.patch("platform.system", return_value="Linux")
+    mocker.patch("subprocess.Popen", side_effect=PermissionError("denied"))
+    alerts.set_error("creative: RCON недоступен")
+
+    with pytest.raises(ApiError) as error:
+        asyncio.run(daemon.dispatch("POST", "/start", {}))
+
+    assert error.value.status == 409
+    assert "denied" in error.value.message
+
+
+def test_trace_and_profile_routes(daemon, mocker):
+    """
+    /trace reports the per-stage breakdown; /profile toggles cProfile.
+    """
+    mocker.patch("headless.PROFILER.toggle", side_effect=[True, False])
+
+    status, payload = asyncio.run(daemon.dispatch("GET", "/trace", {}))
+    assert status == 200 and "slow_ticks" in payload
+
+    mocker.patch("headless.default_profile_path", return_value="/tmp/api.prof")
+    _, started = asyncio.run(daemon.dispatch("POST", "/profile", {}))
+    _, stopped = asyncio.run(daemon.dispatch("POST", "/profile", {}))
+
+    assert started == {"profiling": True, "path": None}
+    assert stopped == {"profiling": False, "path": "/tmp/api.prof"}
+
+
+def test_tasks_routes(tmp_path):
+    """
+    Tasks are added, listed with their next run and removed over the API.
+    """
+    alerts = ConsoleAlerts()
+    fleet = Fleet([ServerDefinition("lobby")], alerts)
+    settings = Settings(str(tmp_path / "settings.json"), write_delay=60)
+    daemon = HeadlessDaemon(fleet, alerts, PollScheduler(), settings=settings)
+
+    def call(path, body=None):
+        return asyncio.run(daemon.dispatch("POST", path, body or {}))
+
+    _, added = call("/tasks/add", {"id": "r", "action": "restart", "cron": "@daily"})
+    _, added = call("/tasks/add", {"id": "s", "command": "say hi", "delay": 60})
+    assert [t["id"] for t in added["tasks"]] == ["s", "r"]
+    assert all(t["next_run"] for t in added["tasks"])
+
+    for body, code in (({"id": "x", "cron": "* *"}, 400), ({"action": "stop"}, 400)):
+        with pytest.raises(ApiError) as error:
+            call("/tasks/add", body)
+        assert error.value.status == code
+
+    _, left = call("/tasks/remove", {"id": "s"})
+    assert [t["id"] for t in left["tasks"]] == ["r"]
+    with pytest.raises(ApiError) as error:
+        call("/tasks/remove", {"id": "s"})
+    assert error.value.status == 404
+
+
+def test_backup_routes(tmp_path):
+    """
+    A backup of an offline server is listed and restored by timestamp.
+    """
+    (tmp_path / "world").mkdir()
+    (tmp_path / "world" / "level.dat").write_bytes(b"level")
+    alerts = ConsoleAlerts()
+    script = str(tmp_path / "start.sh")
+    fleet = Fleet([ServerDefinition("lobby", start_script=script)], alerts)
+    fleet.get("lobby").set_status(ServerStatus.OFFLINE)
+    settings = Settings(str(tmp_path / "settings.json"), write_delay=60)
+    daemon = HeadlessDaemon(fleet, alerts, PollScheduler(), settings=settings)
+
+    def call(path, body=None):
+        return asyncio.run(daemon.dispatch("POST", path, body or {}))[1]
+
+    call("/backup")
+    daemon.backups["lobby"].join(30)
+    listed = asyncio.run(daemon.dispatch("GET", "/backups", {}))[1]
+    assert listed["progress"]["state"] == "done"
+    assert [s["files"] for s in listed["snapshots"]] == [1]
+
+    (tmp_path / "world" / "level.dat").write_bytes(b"broken")
+    call("/backup/restore", {"at": "2999-01-01T00:00"})
+    daemon.backups["lobby"].join(30)
+    assert (tmp_path / "world" / "level.dat").read_bytes() == b"level"
+
+    with pytest.raises(ApiError) as error:
+        call("/backup/restore", {"at": 0})
+    assert error.value.status == 400
+
+
+def test_world_routes(tmp_path):
+    region = tmp_path / "world" / "region"
+    region.mkdir(parents=True)
+    chunk = (5).to_bytes(4, "big") + b"\2abcd"
+    (region / "r.1.0.mca").write_bytes(build_region([(33, 1, chunk), (2, 2, chunk)]))
+    alerts = ConsoleAlerts()
+    script = str(tmp_path / "start.sh")
+    fleet = Fleet([ServerDefinition("lobby", start_script=script)], alerts)
+    settings = Settings(str(tmp_path / "settings.json"), write_delay=60)
+    daemon = HeadlessDaemon(fleet, alerts, PollScheduler(), settings=settings)
+
+    _, world = asyncio.run(daemon.dispatch("GET", "/world", {}))
+    _, stale = asyncio.run(daemon.dispatch("GET", "/world/stale?limit=1", {}))
+
+    assert [(d["dimension"], d["chunks"]) for d in world["dimensions"]] == [
+        ("overworld", 2)
+    ]
+    assert stale["total"] == 2
+    assert stale["chunks"] == [[33, 1, 1]]
+
+
+def test_http_round_trip_with_token(daemon, mocker):
+    """
+    A raw HTTP request over TCP is answered with JSON; the token is enforced.
+    """
+    daemon.token = "secret"
+    daemon.fleet.get("lobby").set_status(ServerStatus.ONLINE)
+
+    async def request(headers):
+        server = await daemon.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET /status?server=lobby HTTP/1.1\r\n{headers}\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        head, _, body = response.partition(b"\r\n\r\n")
+        return head.split(b"\r\n")[0], json.loads(body)
+
+    line, body = asyncio.run(request(""))
+    assert line == b"HTTP/1.1 401 Unauthorized"
+
+    line, body = asyncio.run(request("Authorization: Bearer secret\r\n"))
+    assert line == b"HTTP/1.1 200 OK"
+    assert body["status"] == "online"
@@ -0,0 +1,123 @@
+# tests/test_mcommands.py
+
+import pytest
+from mcommands import MCommands
+from rcon_dispatcher import Priority
+
+RESPONSES = {
+    "time query daytime": "The time is 6000",
+    "gamerule doDaylightCycle": "Gamerule doDaylightCycle is currently set to: false",
+    "list": "There are 2 of a max of 20 players online: Alex, Steve",
+    "difficulty": "The difficulty is Hard",
+}
+
+
+@pytest.fixture
+def mcommands(mocker):
+    """
+    Creates MCommands over a fake RCON session answering canned responses.
+    """
+    rcon = mocker.MagicMock()
+    rcon.command.side_effect = lambda command, priority: RESPONSES.get(command, "")
+    return MCommands(rcon, mocker.MagicMock(), snapshot_ttl=10.0)
+
+
+def test_collect_snapshot_parses_all_fields(mcommands):
+    """
+    One collection pass fills time, gamerule, players and difficulty.
+    """
+    snapshot = mcommands.collect_snapshot()
+
+    assert snapshot.daytime_ticks == 6000
+    assert snapshot.time == "12:00"
+    assert snapshot.daylight_cycle is False
+    assert (snapshot.players_online, snapshot.players_max) == (2, 20)
+    assert snapshot.players == ("Alex", "Steve")
+    assert snapshot.difficulty == "Hard"
+
+
+def test_snapshot_is_cached_for_ttl(mcommands):
+    """
+    Panels reading the snapshot within its TTL do not cause RCON traffic.
+    """
+    first = mcommands.get_snapshot()
+    calls = mcommands.rcon.command.call_count
+
+    for _ in range(5):
+        assert mcommands.get_snapshot() is first
+    assert mcommands.rcon.command.call_count == calls
+
+    assert mcommands.get_snapshot(max_age=0) is not first
+
+
+def test_setters_invalidate_snapshot(mcommands):
+    """
+    Changing time or the daylight cycle forces a fresh collection.
+    """
+    first = mcommands.get_snapshot()
+    mcommands.set_server_time(12, 0)
+
+    assert mcommands.get_snapshot() is not first
+    mcommands.rcon.command.assert_any_call(
+        "time set 6000", priority=Priority.USER
+    )
+
+
+def test_get_server_time_reports_parse_error(mcommands):
+    """
+    An unparseable response falls back to 00:00 and reports the error.
+    """
+    mcommands.rcon.command.side_effect = lambda command, priority: "Unknown command"
+
+    assert mcommands.get_server_time() == "00:00"
+    mcommands.alert_window.set_error.assert_called_once()
+
+
+def test_snapshot_feeds_tps_estimate(mocker):
+    """
+    Each collection pass queries gametime and updates the TPS estimate.
+    """
+    gametime = iter(["The time is 1000", "The time is 1100"])
+    rcon = mocker.MagicMock()
+    rcon.command.side_effect = lambda command, priority: (
+        next(gametime)
+        if command == "time query gametime"
+        else RESPONSES.get(command, "")
+    )
+    mcommands = MCommands(rcon, mocker.MagicMock())
+    mocker.patch("mcommands.time").monotonic.side_effect = [0.0, 5.0]
+
+    first = mcommands.collect_snapshot()
+    mcommands.collect_snapshot()
+
+    assert first.gametime_ticks == 1000
+    assert mcommands.tps.reading.tps == pytest.approx(20.0)
+
+
+def test_daytime_is_queried_only_on_resync(mcommands):
+    """
+    Repeated snapshots extrapolate the clock locally; set_server_time forces
+    the next snapshot to query the server again.
+    """
+    for _ in range(3):
+        mcommands.collect_snapshot()
+    sent = [c.args[0] for c in mcommands.rcon.command.call_args_list]
+    assert sent.count("time query daytime") == 1
+    assert sent.count("gamerule doDaylightCycle") == 1
+
+    mcommands.set_server_time(12, 0)
+    mcommands.collect_snapshot()
+    sent = [c.args[0] for c in mcommands.rcon.command.call_args_list]
+    assert sent.count("time query daytime") == 2
+
+
+def test_roster_changes_are_logged(mcommands, caplog):
+    """
+    Join and leave events of the roster end up in the operator log.
+    """
+    with caplog.at_level("INFO", logger="srvop"):
+        mcommands.roster.update(["Alex"], now=0)
+        mcommands.roster.update([], now=120)
+
+    assert "Игрок Alex вошёл на сервер" in caplog.text
+    assert "Игрок Alex вышел с сервера (сессия 2 мин)" in caplog.text
@@ -0,0 +1,184 @@
+# tests/test_metrics.py
+
+import asyncio
+import gc
+import math
+import threading
+from unittest.mock import MagicMock
+
+from metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    StatusTracker,
+    serve_metrics,
+    watch_server,
+)
+from server_status import ServerStatus
+
+
+def test_counter_sums_increments_from_all_threads():
+    """
+    Each thread writes its own cell; the rendered value is their sum.
+    """
+    registry = Registry()
+    counter = registry.register(Counter("jobs", "Jobs", ("server",)))
+    child = counter.labels("main")
+
+    def work():
+        for _ in range(1000):
+            child.inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert child.value() == 4000
+    assert 'jobs_total{server="main"} 4000' in registry.render()
+
+
+def test_labels_returns_cached_child():
+    counter = Counter("jobs", "Jobs", ("server", "kind"))
+    assert counter.labels("a", "b") is counter.labels(server="a", kind="b")
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("rtt", "RTT", buckets=(0.125, 1)))
+    child = histogram.labels()
+    for value in (0.0625, 0.125, 0.5, 3):
+        child.observe(value)
+
+    text = registry.render()
+
+    assert "# TYPE rtt histogram" in text
+    assert 'rtt_bucket{le="0.125"} 2' in text
+    assert 'rtt_bucket{le="1"} 3' in text
+    assert 'rtt_bucket{le="+Inf"} 4' in text
+    assert "rtt_sum 3.6875" in text
+    assert "rtt_count 4" in text
+
+
+def test_every_sample_belongs_to_a_typed_family():
+    """
+    HELP/TYPE lines name the family the samples are emitted under, so a
+    scraper keeps the type of counters (exported as <name>_total).
+    """
+    registry = Registry()
+    registry.register(Counter("jobs", "Jobs", ("server",))).labels("a").inc()
+    registry.register(Gauge("temp", "Temp")).labels().set(1)
+    registry.register(Histogram("rtt", "RTT", buckets=(1,))).labels().observe(2)
+
+    types, samples = {}, []
+    for line in registry.render().splitlines():
+        if line.startswith("# TYPE "):
+            _, _, family, kind = line.split()
+            types[family] = kind
+        elif not line.startswith("#"):
+            samples.append(line.split("{")[0].split()[0])
+
+    assert types == {"jobs_total": "counter", "temp": "gauge", "rtt": "histogram"}
+    for name in samples:
+        base = name.rsplit("_", 1)[0]
+        family = base if types.get(base) == "histogram" else name
+        assert family in types, name
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    gauge = registry.register(Gauge("g", "G", ("server",)))
+    gauge.labels('a"b\\c').set(math.nan)
+
+    assert 'g{server="a\\"b\\\\c"} NaN' in registry.render()
+
+
+def test_collectors_run_before_render_and_methods_are_weak():
+    registry = Registry()
+    gauge = registry.register(Gauge("g", "G"))
+    registry.add_collector(lambda: gauge.labels().set(7))
+
+    class Owner:
+        calls = 0
+
+        def collect(self):
+            Owner.calls += 1
+
+    owner = Owner()
+    registry.add_collector(owner.collect)
+    assert "g 7" in registry.render()
+    assert Owner.calls == 1
+
+    del owner
+    gc.collect()
+    registry.render()
+    assert Owner.calls == 1
+
+
+def test_status_tracker_records_time_transitions_and_start_duration():
+    """
+    Time in each status, the transitions between them and the STARTING ->
+    ONLINE duration are exported per server.
+    """
+    tracker = StatusTracker("tracker-test")
+    tracker.observe(ServerStatus.OFFLINE, now=100)
+    tracker.observe(ServerStatus.STARTING, now=110)
+    tracker.observe(ServerStatus.STARTING, now=115)
+    tracker.observe(ServerStatus.ONLINE, now=140)
+    tracker.flush(now=150)
+
+    assert tracker._seconds[ServerStatus.OFFLINE].value() == 10
+    assert tracker._seconds[ServerStatus.STARTING].value() == 30
+    assert tracker._seconds[ServerStatus.ONLINE].value() == 10
+    assert tracker._gauges[ServerStatus.ONLINE].value() == 1
+    assert tracker._gauges[ServerStatus.STARTING].value() == 0
+    _, total, count = tracker._start_duration.snapshot()
+    assert (total, count) == (30, 1)
+
+
+def test_watch_server_exports_players_and_tps():
+    registry = Registry()
+    manager = MagicMock()
+    manager.get_status.return_value = ServerStatus.ONLINE
+    manager.get_server_info.return_value.players_online = 3
+    mcommands = MagicMock()
+    mcommands.tps.reading.tps = 19.5
+
+    watch_server("watched", manager, mcommands, registry)
+    registry.render()
+
+    from metrics import PLAYERS_ONLINE, TPS
+
+    assert PLAYERS_ONLINE.labels("watched").value() == 3
+    assert TPS.labels("watched").value() == 19.5
+
+    manager.get_status.return_value = ServerStatus.OFFLINE
+    registry.render()
+    assert PLAYERS_ONLINE.labels("watched").value() == 0
+    assert math.isnan(TPS.labels("watched").value())
+
+
+def test_serve_metrics_answers_scrape():
+    registry = Registry()
+    registry.register(Counter("scrapes", "Scrapes")).labels().inc()
+
+    async def scenario():
+        server = await serve_metrics("127.0.0.1", 0, registry)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+        return response.decode()
+
+    response = asyncio.run(scenario())
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert "version=0.0.4" in response
+    assert "scrapes_total 1" in response
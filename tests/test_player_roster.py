@@ -0,0 +1,95 @@
+# tests/test_player_roster.py
+
+import pytest
+from player_roster import PlayerRoster, RosterChange
+
+
+def test_list_updates_emit_only_diffs(mocker):
+    """
+    Subscribers receive join/leave events, not the full player list.
+    """
+    roster = PlayerRoster()
+    subscriber = mocker.MagicMock()
+    roster.subscribe(subscriber)
+
+    roster.update_from_list(
+        "There are 2 of a max of 20 players online: Alex, Steve", 0
+    )
+    events = roster.update_from_list(
+        "There are 2 of a max of 20 players online: Steve, Notch", 10
+    )
+
+    assert [(e.kind, e.name) for e in events] == [
+        (RosterChange.JOINED, "Notch"),
+        (RosterChange.LEFT, "Alex"),
+    ]
+    assert events[1].session_seconds == pytest.approx(10)
+    assert roster.players() == ("Steve", "Notch")
+    assert roster.players_max == 20
+    assert subscriber.call_count == 2
+
+
+def test_unchanged_list_produces_no_events(mocker):
+    roster = PlayerRoster()
+    roster.update(["Alex"], now=0)
+    subscriber = mocker.MagicMock()
+    roster.subscribe(subscriber)
+
+    assert roster.update(["Alex"], now=1) == []
+    subscriber.assert_not_called()
+
+
+def test_partial_sample_only_adds_players():
+    """
+    A Server List Ping sample never implies that a player left.
+    """
+    roster = PlayerRoster()
+    roster.update(["Alex", "Steve"], now=0)
+
+    events = roster.update(["Notch", "Anonymous Player"], complete=False, now=1)
+
+    assert [e.name for e in events] == ["Notch"]
+    assert roster.players() == ("Alex", "Steve", "Notch")
+
+
+def test_session_durations_accumulate():
+    roster = PlayerRoster()
+    roster.update(["Alex"], now=0)
+    roster.update([], now=30)
+    roster.update(["Alex"], now=100)
+
+    assert roster.session_seconds("Alex", now=110) == pytest.approx(40)
+
+
+def test_refresh_interval_adapts_to_activity():
+    """
+    Quiet rosters are polled less often; a change or a count mismatch from
+    Server List Ping brings the next refresh forward.
+    """
+    roster = PlayerRoster(min_interval=2, max_interval=8)
+    roster.update(["Alex"], now=0)
+    assert roster.interval == 2
+
+    for now in (2, 6, 14, 22):
+        roster.update(["Alex"], now=now)
+    assert roster.interval == 8
+    assert not roster.due(now=25)
+
+    roster.observe_count(2)
+    assert roster.due(now=25)
+
+
+def test_list_without_names_still_schedules_next_refresh():
+    """
+    A truncated `list` reply keeps the roster but pushes the next refresh out
+    instead of leaving it due on every tick.
+    """
+    roster = PlayerRoster(min_interval=2.0)
+    roster.update(["Alex"], now=0)
+
+    events = roster.update_from_list("There are 1 of a max of 20 players online:", 10)
+
+    assert events == []
+    assert roster.players() == ("Alex",)
+    assert not roster.due(11)
+    assert roster.due(20)
@@ -0,0 +1,109 @@
+# tests/test_poll_scheduler.py
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+from poll_scheduler import PollScheduler, run_poll_loop
+from server_status import ServerStatus
+
+
+def test_backs_off_while_stable_up_to_ceiling():
+    """
+    A stable status doubles the interval each tick until max_interval.
+    """
+    scheduler = PollScheduler(base_interval=1.0, max_interval=8.0)
+
+    intervals = [scheduler.observe(ServerStatus.ONLINE) for _ in range(6)]
+
+    assert intervals == [1.0, 2.0, 4.0, 8.0, 8.0, 8.0]
+
+
+def test_transitions_poll_fast_and_changes_reset():
+    """
+    Transitional states use the fast interval; a new stable state restarts
+    the backoff from the base interval.
+    """
+    scheduler = PollScheduler(fast_interval=0.25, base_interval=1.0)
+    for _ in range(5):
+        scheduler.observe(ServerStatus.OFFLINE)
+
+    assert scheduler.observe(ServerStatus.STARTING) == 0.25
+    assert scheduler.observe(ServerStatus.STARTING) == 0.25
+    assert scheduler.observe(ServerStatus.ONLINE) == 1.0
+
+
+def test_sleep_applies_jitter():
+    scheduler = PollScheduler(base_interval=0.05, jitter=0.5)
+
+    asyncio.run(scheduler.sleep())
+
+    assert 0.025 <= scheduler.last_sleep <= 0.075
+
+
+def test_wake_from_another_thread_interrupts_sleep():
+    """
+    wake() from a worker thread ends a long sleep immediately.
+    """
+    scheduler = PollScheduler(base_interval=10.0, jitter=0)
+
+    async def scenario():
+        started = time.monotonic()
+        threading.Timer(0.05, scheduler.wake).start()
+        await scheduler.sleep()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 1.0
+    assert scheduler.interval == scheduler.fast_interval
+
+
+def test_unknown_status_is_polled_fast():
+    """
+    Until the first probe answers, the loop polls at the fast interval.
+    """
+    scheduler = PollScheduler(fast_interval=0.5)
+
+    assert scheduler.observe(ServerStatus.UNKNOWN) == 0.5
+
+
+def test_probe_is_due_first_then_after_interval_or_wake():
+    """
+    The first tick probes; afterwards a short render sleep does not make a
+    probe due until the interval elapses or wake() is called.
+    """
+    scheduler = PollScheduler(base_interval=10.0, jitter=0)
+    assert scheduler.probe_due()
+
+    scheduler.observe(ServerStatus.ONLINE)
+
+    async def scenario():
+        await scheduler.sleep(0.01)
+        due_after_render = scheduler.probe_due()
+        scheduler.wake()
+        return due_after_render, scheduler.probe_due()
+
+    assert asyncio.run(scenario()) == (False, True)
+    assert scheduler.last_sleep == 0.01
+
+
+def test_poll_loop_renders_at_a_fixed_cadence_and_probes_on_backoff():
+    """
+    Ticks keep coming every render interval while the probe interval is
+    long; only the first tick and the one after wake() probe the fleet.
+    """
+    scheduler = PollScheduler(base_interval=10.0, jitter=0)
+    manager = MagicMock()
+    manager.get_status.return_value = ServerStatus.ONLINE
+    fleet = MagicMock()
+    fleet.items.return_value = [("main", manager)]
+    probes = []
+
+    async def tick(probe):
+        probes.append(probe)
+        if len(probes) == 3:
+            scheduler.wake()
+
+    asyncio.run(run_poll_loop(scheduler, fleet, tick, 0.01, lambda: len(probes) < 6))
+
+    assert probes == [True, False, False, True, False, False]
@@ -0,0 +1,103 @@
+# tests/test_rcon_async.py
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from benchmarks.fake_servers import FakeRconServer
+from mcommands import MCommands
+from rcon_async import AsyncRconClient
+from rcon_session import RconUnavailable
+
+PASSWORD = "test"
+
+
+def run_with_server(scenario, **server_kwargs):
+    """
+    Runs scenario(server, client) against a fake RCON server in one loop.
+    """
+
+    async def main():
+        server = FakeRconServer(PASSWORD, **server_kwargs)
+        port = await server.start()
+        client = AsyncRconClient("127.0.0.1", PASSWORD, port, min_backoff=0)
+        try:
+            return await scenario(server, client)
+        finally:
+            client.close()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_pipelined_commands_are_matched_by_id():
+    """
+    Concurrent commands share one connection and each gets its own answer.
+    """
+
+    async def scenario(server, client):
+        commands = ["list", "difficulty", "gamerule doDaylightCycle"] * 10
+        replies = await asyncio.gather(*(client.command(c) for c in commands))
+        return server, commands, replies
+
+    server, commands, replies = run_with_server(scenario)
+
+    assert replies == [server.respond(c) for c in commands]
+    assert server.commands == 30
+
+
+def test_multi_packet_response_is_reassembled():
+    async def scenario(server, client):
+        return server.respond("help"), await client.command("help")
+
+    expected, reply = run_with_server(scenario)
+
+    assert len(expected) > 4096
+    assert reply == expected
+
+
+def test_deadline_applies_to_one_request_only():
+    """
+    A timed-out request is dropped; its late answer does not leak into
+    the next one.
+    """
+
+    async def scenario(server, client):
+        with pytest.raises(RconUnavailable):
+            await client.command("list", timeout=0.05)
+        return await client.command("difficulty", timeout=2)
+
+    assert run_with_server(scenario, latency=0.2) == "The difficulty is Normal"
+
+
+def test_wrong_password_is_reported():
+    async def scenario(server, client):
+        client.password = "wrong"
+        return await client.ping()
+
+    assert run_with_server(scenario) is False
+
+
+def test_dropped_connection_fails_pending_and_reconnects():
+    async def scenario(server, client):
+        with pytest.raises(RconUnavailable):
+            await client.command("list")
+        server.failure_rate = 0.0
+        await asyncio.sleep(0)
+        return await client.command("list")
+
+    reply = run_with_server(scenario, failure_rate=1.0)
+    assert reply.startswith("There are 2")
+
+
+def test_async_snapshot_collects_all_fields_concurrently():
+    async def scenario(server, client):
+        mcommands = MCommands(MagicMock(), MagicMock(), async_rcon=client)
+        return await mcommands.get_snapshot_async()
+
+    snapshot = run_with_server(scenario)
+
+    assert snapshot.players == ("Alex", "Steve")
+    assert snapshot.difficulty is not None
+    assert snapshot.daylight_cycle is True
+    assert snapshot.gametime_ticks is not None
@@ -0,0 +1,196 @@
+# tests/test_rcon_dispatcher.py
+
+import threading
+
+import pytest
+from rcon_dispatcher import Priority, RconBusy, RconDispatcher, coalesce_key
+from rcon_session import RconUnavailable
+
+
+class GatedSession:
+    """
+    Fake RconSession: the first command blocks until released, so the
+    tests can fill the queue behind it.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.closed = False
+
+    def command(self, command):
+        self.sent.append(command)
+        if len(self.sent) == 1:
+            self.started.set()
+            self.release.wait(5)
+        return f"ok: {command}"
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def gated():
+    session = GatedSession()
+    dispatcher = RconDispatcher(session, maxsize=4)
+    blocker = dispatcher.submit("say hold")
+    assert session.started.wait(5)
+    yield session, dispatcher, blocker
+    session.release.set()
+    dispatcher.close()
+
+
+@pytest.mark.parametrize(
+    "command, key",
+    [
+        ("time set 6000", ("set", "time")),
+        ("weather rain 600", ("set", "weather")),
+        ("gamerule doDaylightCycle false", ("set", "gamerule", "doDaylightCycle")),
+        ("gamerule doDaylightCycle", ("get", "gamerule doDaylightCycle")),
+        ("difficulty", ("get", "difficulty")),
+        ("difficulty hard", ("set", "difficulty")),
+        ("list", ("get", "list")),
+        ("time add 100", None),
+        ("say hi", None),
+        ("stop", None),
+    ],
+)
+def test_coalesce_key(command, key):
+    assert coalesce_key(command) == key
+
+
+def test_rapid_time_set_calls_collapse_into_the_last(gated):
+    session, dispatcher, _ = gated
+    futures = [dispatcher.submit(f"time set {t}") for t in range(10)]
+
+    session.release.set()
+
+    assert {f.result(5) for f in futures} == {"ok: time set 9"}
+    assert session.sent == ["say hold", "time set 9"]
+    assert dispatcher.coalesced == 9
+
+
+def test_set_is_not_merged_across_an_uncoalesced_command(gated):
+    """
+    set 100, add 50, set 200 must end at 200: the last set may not jump
+    ahead of the `time add` queued before it.
+    """
+    session, dispatcher, _ = gated
+    futures = [
+        dispatcher.submit(command)
+        for command in ("time set 100", "time add 50", "time set 200")
+    ]
+
+    session.release.set()
+    for future in futures:
+        future.result(5)
+
+    assert session.sent == ["say hold", "time set 100", "time add 50", "time set 200"]
+
+
+def test_query_after_set_is_not_merged_into_an_earlier_query(gated):
+    """
+    A query submitted after a set sees the new value instead of sharing the
+    answer of a query queued before that set.
+    """
+    session, dispatcher, _ = gated
+    before = dispatcher.submit("time query daytime")
+    dispatcher.submit("time set 6000")
+    after = dispatcher.submit("time query daytime")
+
+    session.release.set()
+    before.result(5)
+    after.result(5)
+
+    assert session.sent == [
+        "say hold",
+        "time query daytime",
+        "time set 6000",
+        "time query daytime",
+    ]
+    assert dispatcher.coalesced == 0
+
+
+def test_user_commands_overtake_periodic_reads(gated):
+    session, dispatcher, _ = gated
+    read = dispatcher.submit("time query gametime", Priority.PERIODIC)
+    action = dispatcher.submit("weather clear")
+
+    session.release.set()
+    read.result(5)
+    action.result(5)
+
+    assert session.sent == ["say hold", "weather clear", "time query gametime"]
+
+
+def test_session_ping_is_queued_behind_user_commands(gated):
+    """
+    The keepalive ping of the status probe goes through the same queue:
+    user commands overtake it and pending pings share one session call.
+    """
+    session, dispatcher, _ = gated
+    session.ping = lambda: session.sent.append("<ping>") or True
+    pings = [dispatcher.ping(), dispatcher.ping()]
+    action = dispatcher.submit("say hi")
+
+    session.release.set()
+
+    assert [p.result(5) for p in pings] == [True, True]
+    action.result(5)
+    assert session.sent == ["say hold", "say hi", "<ping>"]
+
+
+def test_full_queue_rejects_new_commands(gated):
+    _, dispatcher, _ = gated
+    for i in range(3):
+        dispatcher.submit(f"say {i}")
+    dispatcher.submit("list", Priority.PERIODIC)
+
+    with pytest.raises(RconBusy):
+        dispatcher.submit("say overflow")
+    # A coalesced command takes no extra slot
+    dispatcher.submit("list", Priority.PERIODIC)
+    assert len(dispatcher) == 4
+
+
+def test_timed_out_command_is_dropped_from_the_queue(gated):
+    session, dispatcher, _ = gated
+
+    with pytest.raises(RconUnavailable):
+        dispatcher.command("say late", timeout=0.01)
+    session.release.set()
+    dispatcher.command("say next")
+
+    assert "say late" not in session.sent
+
+
+def test_close_fails_pending_commands_and_closes_session(gated):
+    session, dispatcher, blocker = gated
+    pending = dispatcher.submit("say pending")
+
+    closer = threading.Thread(target=dispatcher.close)
+    closer.start()
+    session.release.set()
+    closer.join(5)
+
+    assert blocker.result(5) == "ok: say hold"
+    with pytest.raises(RconUnavailable):
+        pending.result(5)
+    assert session.closed
+    # The worker starts again on the next command
+    assert dispatcher.command("list") == "ok: list"
+
+
+def test_session_errors_reach_the_caller():
+    class FailingSession:
+        def command(self, command):
+            raise RconUnavailable("offline")
+
+        def close(self):
+            pass
+
+    dispatcher = RconDispatcher(FailingSession())
+    with pytest.raises(RconUnavailable, match="offline"):
+        dispatcher.command("list")
+    dispatcher.close()
@@ -0,0 +1,102 @@
+# tests/test_rcon_session.py
+
+import pytest
+from mcrcon import MCRconException
+from rcon_session import RconSession, RconUnavailable
+
+
+@pytest.fixture
+def session(mocker):
+    """
+    Creates an RconSession whose underlying MCRcon never touches the network.
+    """
+    rcon_session = RconSession("localhost", "password", 25575)
+    mocker.patch.object(rcon_session._rcon, "connect")
+    mocker.patch.object(rcon_session._rcon, "disconnect")
+    mocker.patch.object(rcon_session._rcon, "command", return_value="ok")
+    mocker.patch.object(rcon_session, "_socket_alive", return_value=True)
+    return rcon_session
+
+
+def test_commands_reuse_single_login(session):
+    """
+    Several commands must share one connect/login.
+    """
+    for _ in range(3):
+        assert session.command("list") == "ok"
+
+    session._rcon.connect.assert_called_once()
+    assert session._rcon.command.call_count == 3
+
+
+def test_stale_socket_reconnects_and_retries(session):
+    """
+    A command that fails on a reused socket reconnects once and is retried.
+    """
+    session.command("list")
+    session._rcon.command.side_effect = [ConnectionResetError(), "done"]
+
+    assert session.command("list") == "done"
+    assert session._rcon.connect.call_count == 2
+
+
+def test_failed_connect_backs_off(mocker, session):
+    """
+    After a failed login the session does not retry until the backoff expires.
+    """
+    clock = mocker.patch("rcon_session.time.monotonic", return_value=100.0)
+    session._rcon.connect.side_effect = ConnectionRefusedError()
+
+    assert session.ping() is False
+    assert session.ping() is False
+    session._rcon.connect.assert_called_once()
+
+    clock.return_value = 100.0 + session.min_backoff
+    session._rcon.connect.side_effect = None
+    assert session.ping() is True
+    assert session._rcon.connect.call_count == 2
+
+
+def test_backoff_grows_up_to_ceiling(mocker, session):
+    """
+    Consecutive failures double the delay but never exceed max_backoff.
+    """
+    clock = mocker.patch("rcon_session.time.monotonic", return_value=0.0)
+    session._rcon.connect.side_effect = MCRconException("Login failed")
+
+    delays = []
+    for _ in range(8):
+        with pytest.raises(RconUnavailable):
+            session.command("list")
+        delays.append(session._backoff)
+        clock.return_value = session._next_attempt
+
+    assert delays[:3] == [0.5, 1.0, 2.0]
+    assert max(delays) == session.max_backoff
+
+
+def test_ping_sends_keepalive_when_idle(mocker, session):
+    """
+    ping() is free while the session is fresh and sends a keepalive once idle.
+    """
+    clock = mocker.patch("rcon_session.time.monotonic", return_value=0.0)
+    assert session.ping() is True
+    session._rcon.command.assert_not_called()
+
+    clock.return_value = session.keepalive_interval
+    assert session.ping() is True
+    session._rcon.command.assert_called_once_with(session.keepalive_command)
+
+
+def test_read_timeout_applies_to_one_command_only(mocker, session):
+    """
+    A long command gets its own socket timeout, restored afterwards.
+    """
+    session._rcon.socket = mocker.MagicMock()
+
+    session.command("save-all flush", read_timeout=600)
+
+    assert [c.args for c in session._rcon.socket.settimeout.call_args_list] == [
+        (600,),
+        (session._rcon.timeout,),
+    ]
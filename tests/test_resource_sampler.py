@@ -0,0 +1,122 @@
+# tests/test_resource_sampler.py
+
+import os
+
+import psutil
+from resource_sampler import ResourceSampler, RingBuffer
+
+
+def test_ring_buffer_keeps_latest_values_in_order():
+    buffer = RingBuffer(4)
+    for value in range(1, 7):
+        buffer.append(value)
+
+    assert len(buffer) == 4
+    assert buffer.values() == [3.0, 4.0, 5.0, 6.0]
+    assert buffer.last() == 6.0
+
+
+def test_downsample_preserves_spikes():
+    """
+    Min/max buckets keep a single-sample spike visible on the chart.
+    """
+    buffer = RingBuffer(100)
+    for i in range(100):
+        buffer.append(100.0 if i == 37 else 1.0)
+
+    buckets = buffer.downsample(10)
+
+    assert len(buckets) == 10
+    assert buckets[3] == (1.0, 100.0)
+    assert all(high == 1.0 for i, (_, high) in enumerate(buckets) if i != 3)
+
+
+def test_sampler_records_current_process():
+    """
+    Sampling a real process fills every series with one point.
+    """
+    sampler = ResourceSampler(lambda: [psutil.Process(os.getpid())], capacity=8)
+
+    sample = sampler.sample()
+
+    assert sample.rss > 0
+    assert sample.threads >= 1
+    assert sampler.latest() == sample
+    assert all(len(series) == 1 for series in sampler.series.values())
+
+
+def test_sampler_reuses_discovered_processes(mocker):
+    """
+    Process discovery is not repeated on every sample.
+    """
+    find = mocker.MagicMock(return_value=[psutil.Process(os.getpid())])
+    sampler = ResourceSampler(find, rediscover_every=5)
+
+    for _ in range(4):
+        sampler.sample()
+
+    find.assert_called_once()
+
+
+def test_sampler_without_process_records_nothing():
+    sampler = ResourceSampler(lambda: [])
+
+    assert sampler.sample() is None
+    assert len(sampler.timestamps) == 0
+
+
+def test_sampler_records_nothing_when_tracked_processes_are_gone(mocker):
+    """
+    Processes that exit between discovery and the sample produce no zero
+    readings in the history.
+    """
+    gone = mocker.MagicMock(pid=1)
+    gone.oneshot.side_effect = psutil.NoSuchProcess(1)
+    sampler = ResourceSampler(lambda: [gone])
+
+    assert sampler.sample() is None
+    assert sampler.latest() is None
+    assert len(sampler.timestamps) == 0
+    assert all(len(series) == 0 for series in sampler.series.values())
+
+
+def test_sampler_drops_sample_when_one_process_exits(mocker):
+    """
+    A process exiting mid-sample drops the whole reading instead of recording
+    the partial total of the survivors.
+    """
+    alive = psutil.Process(os.getpid())
+    gone = mocker.MagicMock(pid=-1)
+    gone.oneshot.side_effect = psutil.NoSuchProcess(-1)
+    find = mocker.MagicMock(return_value=[alive, gone])
+    sampler = ResourceSampler(find)
+
+    assert sampler.sample() is None
+    assert sampler.latest() is None
+    assert len(sampler.timestamps) == 0
+
+    find.return_value = [alive]
+    assert sampler.sample() is not None
+    assert find.call_count == 2
+
+
+def test_sampler_thread_survives_a_failing_sample(mocker):
+    """
+    An unexpected error in one iteration is logged and sampling goes on.
+    """
+    sampler = ResourceSampler(lambda: [], interval=0.01)
+    calls = []
+
+    def sample():
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        sampler.stop()
+
+    mocker.patch.object(sampler, "sample", side_effect=sample)
+    log = mocker.patch("resource_sampler.logger")
+
+    sampler._run()
+
+    assert len(calls) == 2
+    log.exception.assert_called_once()
@@ -0,0 +1,104 @@
+# tests/test_server_jobs.py
+
+import subprocess
+import sys
+
+import psutil
+import pytest
+from server_jobs import JobState, StopJob, StopStage
+
+SLEEPER = "import time; time.sleep(30)"
+STUBBORN = (
+    "import signal, sys, time; signal.signal(signal.SIGTERM, signal.SIG_IGN);"
+    " print('ready', flush=True); time.sleep(30)"
+)
+
+
+@pytest.fixture
+def spawn():
+    """
+    Starts throwaway Python processes and makes sure they are gone afterwards.
+    """
+    started = []
+
+    def _spawn(code):
+        process = subprocess.Popen(
+            [sys.executable, "-c", code], stdout=subprocess.PIPE, text=True
+        )
+        started.append(process)
+        return process
+
+    yield _spawn
+    for process in started:
+        process.kill()
+        process.wait()
+
+
+def run_job(process, **kwargs):
+    stages = []
+    job = StopJob(
+        "Остановка",
+        send_stop=kwargs.pop("send_stop", lambda: None),
+        find_processes=lambda: [psutil.Process(process.pid)],
+        on_progress=lambda progress: stages.append(progress.stage),
+        poll_interval=0.05,
+        **kwargs,
+    )
+    job.start()
+    return job, stages
+
+
+def test_escalates_to_sigterm(spawn):
+    """
+    A server that ignores `stop` is terminated after stop_timeout.
+    """
+    process = spawn(SLEEPER)
+    job, stages = run_job(process, stop_timeout=0.2)
+    job.join(5)
+
+    assert job.progress.state == JobState.DONE
+    assert StopStage.SIGTERM in stages
+    assert StopStage.SIGKILL not in stages
+    assert process.poll() is not None
+
+
+def test_escalates_to_sigkill(spawn):
+    """
+    A process that ignores SIGTERM is killed.
+    """
+    process = spawn(STUBBORN)
+    process.stdout.readline()
+    job, stages = run_job(process, stop_timeout=0.1, term_timeout=0.2)
+    job.join(5)
+
+    assert job.progress.state == JobState.DONE
+    assert stages[-2] == StopStage.SIGKILL
+
+
+def test_clean_exit_runs_restart(spawn, mocker):
+    """
+    When the process exits on `stop`, no signals are sent and `then` runs.
+    """
+    process = spawn(SLEEPER)
+    then = mocker.MagicMock()
+    job, stages = run_job(process, send_stop=process.terminate, then=then)
+    job.join(5)
+
+    assert job.progress.state == JobState.DONE
+    assert StopStage.SIGTERM not in stages
+    then.assert_called_once()
+
+
+def test_cancel_leaves_process_running(spawn, mocker):
+    """
+    Cancelling during the wait stops the job without signalling the server.
+    """
+    process = spawn(SLEEPER)
+    then = mocker.MagicMock()
+    job, _ = run_job(process, stop_timeout=30, then=then)
+    job.cancel()
+    job.join(5)
+
+    assert job.progress.state == JobState.CANCELLED
+    assert process.poll() is None
+    then.assert_not_called()
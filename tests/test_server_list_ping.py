@@ -0,0 +1,108 @@
+# tests/test_server_list_ping.py
+
+import asyncio
+import json
+
+import pytest
+from server_list_ping import (
+    ServerListPingError,
+    _pack_string,
+    _pack_varint,
+    _packet,
+    _read_packet,
+    _unpack_varint,
+    server_list_ping,
+)
+
+STATUS = {
+    "version": {"name": "1.21.1", "protocol": 767},
+    "players": {"max": 20, "online": 2, "sample": [{"name": "Alex", "id": "1"}]},
+    "description": {"text": "Hello ", "extra": [{"text": "world"}]},
+}
+
+
+async def _fake_server(answer_status=True, answer_ping=True):
+    """
+    Starts a localhost listener speaking the status half of the protocol.
+    """
+
+    async def handle(reader, writer):
+        try:
+            await _read_packet(reader)  # handshake
+            await _read_packet(reader)  # status request
+            if not answer_status:
+                await reader.read()  # stay silent until the client gives up
+                return
+            writer.write(_packet(0x00, _pack_string(json.dumps(STATUS))))
+            await writer.drain()
+            packet_id, payload = await _read_packet(reader)
+            if answer_ping and packet_id == 0x01:
+                writer.write(_packet(0x01, payload))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 25565, 2**31 - 1, -1])
+def test_varint_roundtrip(value):
+    """
+    VarInts survive an encode/decode cycle, including negative values.
+    """
+    assert _unpack_varint(_pack_varint(value)) == (value, len(_pack_varint(value)))
+
+
+@pytest.mark.parametrize("answer_ping", [True, False])
+def test_server_list_ping_parses_status(answer_ping):
+    """
+    A full handshake + status exchange returns the parsed server info.
+    """
+
+    async def scenario():
+        server, port = await _fake_server(answer_ping=answer_ping)
+        async with server:
+            return await server_list_ping("127.0.0.1", port, timeout=1.0)
+
+    info = asyncio.run(scenario())
+
+    assert info.version_name == "1.21.1"
+    assert info.protocol == 767
+    assert info.motd == "Hello world"
+    assert (info.players_online, info.players_max) == (2, 20)
+    assert info.player_sample == ("Alex",)
+    assert info.latency_ms >= 0
+
+
+def test_server_list_ping_without_status_is_not_ready():
+    """
+    A listener that accepts but never answers raises ServerListPingError,
+    which the probe treats as "port bound, world still loading".
+    """
+
+    async def scenario():
+        server, port = await _fake_server(answer_status=False)
+        async with server:
+            await server_list_ping("127.0.0.1", port, timeout=0.2)
+
+    with pytest.raises(ServerListPingError):
+        asyncio.run(scenario())
+
+
+def test_server_list_ping_closed_port_raises_oserror():
+    """
+    A closed port surfaces as a connection error, not a protocol error.
+    """
+
+    async def scenario():
+        server, port = await _fake_server()
+        server.close()
+        await server.wait_closed()
+        await server_list_ping("127.0.0.1", port, timeout=0.5)
+
+    with pytest.raises(OSError):
+        asyncio.run(scenario())
+
@@ -0,0 +1,106 @@
+# tests/test_server_log_watcher.py
+
+import io
+
+import pytest
+from server_log_watcher import LifecycleEvent, ServerOutputWatcher, parse_line
+from server_manager import ServerManager
+from server_status import ServerStatus
+
+STARTUP_LOG = """\
+[12:00:00] [Server thread/INFO]: Starting minecraft server version 1.21.1
+[12:00:01] [Server thread/INFO]: Preparing level "world"
+[12:00:02] [Worker-Main-1/INFO]: Preparing spawn area: 42%
+[12:00:05] [Server thread/INFO]: Done (12.3s)! For help, type "help"
+[12:10:00] [Server thread/INFO]: Stopping server
+"""
+
+
+@pytest.mark.parametrize(
+    "line, kind",
+    [
+        ("[Server thread/INFO]: Starting minecraft server version 1.21.1", LifecycleEvent.STARTING),
+        ("[Worker-Main-1/INFO]: Preparing spawn area: 42%", LifecycleEvent.PROGRESS),
+        ('[Server thread/INFO]: Done (12.3s)! For help, type "help"', LifecycleEvent.READY),
+        ("[Server thread/INFO]: Stopping the server", LifecycleEvent.STOPPING),
+        ("[Server thread/ERROR]: Encountered an unexpected exception", LifecycleEvent.CRASHED),
+        ("[Server thread/INFO]: Alex joined the game", None),
+    ],
+)
+def test_parse_line(line, kind):
+    """
+    Lifecycle lines are recognised, everything else is ignored.
+    """
+    event = parse_line(line)
+    assert (event.kind if event else None) == kind
+
+
+def test_parse_line_extracts_numbers():
+    assert parse_line("Preparing spawn area: 42%").progress == 42
+    assert parse_line("Done (12,3s)! For help").startup_seconds == 12.3
+
+
+def run_watcher(mocker, manager, log, exit_code=0):
+    """
+    Feeds a log through ServerOutputWatcher synchronously.
+    """
+    process = mocker.MagicMock()
+    process.stdout = io.StringIO(log)
+    process.wait.return_value = exit_code
+    seen = []
+
+    def on_event(event):
+        manager._on_lifecycle_event(event)
+        seen.append((event.kind, manager.get_status(), manager.get_start_progress()))
+
+    ServerOutputWatcher(process, on_event)._run()
+    return seen
+
+
+@pytest.fixture
+def manager(mocker):
+    return ServerManager(
+        rcon_host="localhost",
+        rcon_password="password",
+        rcon_port=25575,
+        alert_window=mocker.MagicMock(),
+    )
+
+
+def test_lifecycle_drives_status(mocker, manager):
+    """
+    Startup lines move the status through STARTING -> ONLINE -> STOPING,
+    and process exit returns it to OFFLINE.
+    """
+    seen = run_watcher(mocker, manager, STARTUP_LOG)
+
+    assert seen == [
+        (LifecycleEvent.STARTING, ServerStatus.STARTING, 0),
+        (LifecycleEvent.PROGRESS, ServerStatus.STARTING, 42),
+        (LifecycleEvent.READY, ServerStatus.ONLINE, None),
+        (LifecycleEvent.STOPPING, ServerStatus.STOPING, None),
+        (LifecycleEvent.EXITED, ServerStatus.OFFLINE, None),
+    ]
+
+
+def test_crash_reports_error(mocker, manager):
+    """
+    A crash trace switches to ERROR and shows the offending line.
+    """
+    log = "Starting minecraft server\nException in server tick loop\n"
+    seen = run_watcher(mocker, manager, log, exit_code=1)
+
+    assert seen[-1][:2] == (LifecycleEvent.EXITED, ServerStatus.ERROR)
+    manager.alert_window.set_error.assert_called_once()
+
+
+def test_events_take_precedence_over_probes(mocker, manager):
+    """
+    While the process reports its own state, port probes are only a fallback.
+    """
+    from status_probe import ProbeResult
+
+    manager._on_lifecycle_event(parse_line("Preparing spawn area: 10%"))
+    manager._apply_probe(ProbeResult(False, False, False))
+
+    assert manager.get_status() == ServerStatus.STARTING
@@ -1,10 +1,22 @@
 # tests/test_server_manager.py
 
+import asyncio
 import pytest
 import os
+import socket
+import subprocess
 from server_manager import ServerManager
 from server_status import ServerStatus
 
+# Server output is piped to ServerOutputWatcher for lifecycle events
+PIPE_KWARGS = dict(
+    stdout=subprocess.PIPE,
+    stderr=subprocess.STDOUT,
+    text=True,
+    errors="replace",
+    bufsize=1,
+)
+
 @pytest.fixture
 def server_manager_instance(mocker):
     """
@@ -38,14 +50,17 @@ def test_start_server_linux_success(mocker, server_manager_instance):
     mocker.patch('os.path.isfile', return_value=True)
     mocker.patch('platform.system', return_value='Linux')
     mock_popen = mocker.patch('subprocess.Popen')
+    mock_watcher = mocker.patch('server_manager.ServerOutputWatcher')
     mocker.patch('threading.Thread', side_effect=run_thread_target_synchronously)
 
     server_manager_instance.start_server()
 
     mock_popen.assert_called_once_with(
         ['bash', '/path/to/start.sh'],
-        cwd='/path/to'
+        cwd='/path/to',
+        **PIPE_KWARGS
     )
+    mock_watcher.return_value.start.assert_called_once()
     server_manager_instance.update_status_callback.assert_called_once()
 
 def test_start_server_windows_success(mocker, server_manager_instance):
@@ -65,6 +80,7 @@ def test_start_server_windows_success(mocker, server_manager_instance):
     mocker.patch('os.path.isfile', return_value=True)
     mocker.patch('platform.system', return_value='Windows')
     mock_popen = mocker.patch('subprocess.Popen')
+    mocker.patch('server_manager.ServerOutputWatcher')
     mocker.patch('threading.Thread', side_effect=run_thread_target_synchronously)
 
     server_manager_instance.start_server()
@@ -72,7 +88,8 @@ def test_start_server_windows_success(mocker, server_manager_instance):
     # The important part is that ["cmd.exe", "/c", ...] is called.
     mock_popen.assert_called_once_with(
         ['cmd.exe', '/c', script_path],
-        cwd=os.path.dirname(script_path)
+        cwd=os.path.dirname(script_path),
+        **PIPE_KWARGS
     )
     server_manager_instance.update_status_callback.assert_called_once()
 
@@ -104,15 +121,30 @@ def test_start_server_script_not_set(mocker, server_manager_instance):
     mock_popen.assert_not_called()
 
 
+def mock_interfaces(mocker, *addresses):
+    """
+    Replaces the psutil interface snapshot with the given IPv4 addresses.
+    """
+    addrs = {
+        f"if{i}": [mocker.MagicMock(family=socket.AF_INET, address=address)]
+        for i, address in enumerate(addresses)
+    }
+    stats = {name: mocker.MagicMock(isup=True) for name in addrs}
+    mocker.patch('network_info.psutil.net_if_addrs', return_value=addrs)
+    mocker.patch('network_info.psutil.net_if_stats', return_value=stats)
+    return addrs
+
+
 def test_get_local_ip_success(mocker, server_manager_instance):
     """
     Tests that get_local_ip returns the correct IP on success.
     """
+    fake_ip = '192.168.1.100'
+    mock_interfaces(mocker, '127.0.0.1', fake_ip)
     # Mock socket.socket to avoid real network calls
-    mock_socket = mocker.patch('server_manager.socket.socket').return_value
+    mock_socket = mocker.patch('network_info.socket.socket').return_value
     
     # Configure the mock to return a fake IP
-    fake_ip = '192.168.1.100'
     mock_socket.getsockname.return_value = [fake_ip]
     
     # Call the method
@@ -124,17 +156,53 @@ def test_get_local_ip_success(mocker, server_manager_instance):
     mock_socket.connect.assert_called_once_with(('8.8.8.8', 80))
     mock_socket.close.assert_called_once()
 
+def test_get_local_ip_is_cached_until_interfaces_change(mocker, server_manager_instance):
+    """
+    Tests that repeated calls reuse the cached IP and only a change in the
+    interface snapshot triggers a new lookup.
+    """
+    clock = mocker.patch('network_info.time.monotonic', return_value=0.0)
+    addrs = mock_interfaces(mocker, '192.168.1.100')
+    mock_socket = mocker.patch('network_info.socket.socket').return_value
+    mock_socket.getsockname.return_value = ['192.168.1.100']
+
+    for _ in range(5):
+        server_manager_instance.get_local_ip()
+    clock.return_value = 60.0
+    server_manager_instance.get_local_ip()
+    assert mock_socket.connect.call_count == 1
+
+    addrs['if0'][0].address = '10.0.0.5'
+    mock_socket.getsockname.return_value = ['10.0.0.5']
+    clock.return_value = 120.0
+    assert server_manager_instance.get_local_ip() == '10.0.0.5'
+    assert mock_socket.connect.call_count == 2
+    assert server_manager_instance.get_local_addresses() == ['10.0.0.5']
+
+def test_get_local_ip_offline_lan(mocker, server_manager_instance):
+    """
+    Tests that without a default route the LAN address is used silently.
+    """
+    mock_interfaces(mocker, '127.0.0.1', '192.168.0.10')
+    mock_socket = mocker.patch('network_info.socket.socket').return_value
+    mock_socket.connect.side_effect = OSError("Network is unreachable")
+
+    assert server_manager_instance.get_local_ip() == '192.168.0.10'
+    server_manager_instance.alert_window.set_error.assert_not_called()
+
 def test_get_local_ip_failure(mocker, server_manager_instance):
     """
     Tests that get_local_ip returns '127.0.0.1' on failure
-    and calls the alert window.
+    and calls the alert window only once.
     """
+    mock_interfaces(mocker, '127.0.0.1')
     # Mock socket.socket to raise an exception
-    mock_socket = mocker.patch('server_manager.socket.socket').return_value
+    mock_socket = mocker.patch('network_info.socket.socket').return_value
     mock_socket.connect.side_effect = OSError("Test error")
     
     # Call the method
     ip = server_manager_instance.get_local_ip()
+    server_manager_instance.get_local_ip()
     
     # Assert that the fallback IP is returned
     assert ip == '127.0.0.1'
@@ -143,25 +211,28 @@ def test_get_local_ip_failure(mocker, server_manager_instance):
     server_manager_instance.alert_window.set_error.assert_called_once()
 
 @pytest.mark.parametrize(
-    "port_65_open, port_75_open, rcon_ok, initial_status, expected_status",
+    "port_65_open, game_ready, port_75_open, rcon_ok, initial_status, expected_status",
     [
         # Server is fully online
-        (True, True, True, ServerStatus.OFFLINE, ServerStatus.ONLINE),
+        (True, True, True, True, ServerStatus.OFFLINE, ServerStatus.ONLINE),
         # Server is starting (main port open, but RCON not yet available)
-        (True, True, False, ServerStatus.OFFLINE, ServerStatus.STARTING),
+        (True, True, True, False, ServerStatus.OFFLINE, ServerStatus.STARTING),
+        # JVM bound the game port but the world is still loading (no SLP status)
+        (True, False, True, True, ServerStatus.OFFLINE, ServerStatus.STARTING),
         # An unusual state where the RCON port is closed but the main one is open
-        (True, False, True, ServerStatus.OFFLINE, ServerStatus.RCON_CLOSED),
+        (True, True, False, True, ServerStatus.OFFLINE, ServerStatus.RCON_CLOSED),
         # Server is stopping (main port closed, RCON port still open)
-        (False, True, False, ServerStatus.ONLINE, ServerStatus.STOPING),
+        (False, False, True, False, ServerStatus.ONLINE, ServerStatus.STOPING),
         # Server is restarting (status should persist during this state)
-        (False, True, False, ServerStatus.RESTATING, ServerStatus.RESTATING),
+        (False, False, True, False, ServerStatus.RESTATING, ServerStatus.RESTATING),
         # Server is fully offline
-        (False, False, False, ServerStatus.ONLINE, ServerStatus.OFFLINE),
+        (False, False, False, False, ServerStatus.ONLINE, ServerStatus.OFFLINE),
     ],
 )
 def test_update_server_status(
     mocker,
     port_65_open,
+    game_ready,
     port_75_open,
     rcon_ok,
     initial_status,
@@ -169,23 +240,27 @@ def test_update_server_status(
 ):
     """
     Tests the update_server_status method across various scenarios
-    by mocking the internal helper methods.
+    by mocking the individual probes.
     """
     # --- Setup Mocks ---
-    # Patch the internal helper methods directly
+    # Patch the individual probes of StatusProbe directly
+    server_info = mocker.MagicMock() if game_ready else None
+
     def mock_check_port(port):
-        if port == 25565:
-            return port_65_open
         if port == 25575:
             return port_75_open
         return False
 
     mocker.patch(
-        "server_manager.ServerManager._check_port",
+        "status_probe.StatusProbe.check_game",
+        return_value=(port_65_open, server_info)
+    )
+    mocker.patch(
+        "status_probe.StatusProbe.check_port",
         side_effect=mock_check_port
     )
     mocker.patch(
-        "server_manager.ServerManager._rcon_is_ok",
+        "status_probe.StatusProbe.check_rcon",
         return_value=rcon_ok
     )
 
@@ -206,4 +281,36 @@ def test_update_server_status(
 
     # --- Assert ---
     assert manager.get_status() == expected_status
-    mock_update_callback.assert_called_once()
+    assert manager.get_server_info() is server_info
+    # The callback wakes the poll loop, so it only fires on a status change
+    expected_calls = 1 if expected_status != initial_status else 0
+    assert mock_update_callback.call_count == expected_calls
+
+def test_sync_status_update_inside_event_loop_fails_clearly(server_manager_instance):
+    """
+    The sync wrapper cannot nest asyncio.run; callers already in a loop get
+    a message pointing them to the async variant.
+    """
+    async def scenario():
+        server_manager_instance.update_server_status()
+
+    with pytest.raises(RuntimeError, match="update_server_status_async"):
+        asyncio.run(scenario())
+
+
+def test_stop_server_runs_in_background(mocker, server_manager_instance):
+    """
+    Tests that stop_server returns immediately with a background job, even
+    when the server was not started from this app.
+    """
+    mocker.patch('server_manager.find_server_processes', return_value=[])
+    mocker.patch('server_manager.port_open', return_value=False)
+    send = mocker.patch.object(server_manager_instance.rcon_session, 'command')
+
+    job = server_manager_instance.stop_server()
+
+    assert server_manager_instance.get_status() == ServerStatus.STOPING
+    job.join(5)
+    send.assert_called_once_with("stop")
+    assert not server_manager_instance.get_job_progress().running
+    assert server_manager_instance.job_status is None
@@ -0,0 +1,148 @@
+# tests/test_settings.py
+
+import json
+import os
+import threading
+
+import pytest
+import settings as st
+
+
+@pytest.fixture
+def settings_file(tmp_path):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"server_start_script": "/srv/run.sh"}), "utf-8")
+    return path
+
+
+def test_get_settings_returns_shared_instance(settings_file):
+    """
+    All components share one store per settings file.
+    """
+    assert st.get_settings(str(settings_file)) is st.get_settings(str(settings_file))
+
+
+def test_get_does_not_reparse_unchanged_file(mocker, settings_file):
+    """
+    Reads are served from memory while the file signature is unchanged.
+    """
+    settings = st.Settings(str(settings_file))
+    load = mocker.spy(settings, "load")
+
+    for _ in range(5):
+        assert settings.get("server_start_script") == "/srv/run.sh"
+    load.assert_not_called()
+
+
+def test_external_change_is_reloaded_and_notified(settings_file):
+    """
+    A file replaced on disk is picked up and subscribers are notified.
+    """
+    settings = st.Settings(str(settings_file))
+    seen = []
+    settings.subscribe("server_start_script", seen.append)
+
+    tmp = settings_file.with_suffix(".new")
+    tmp.write_text(json.dumps({"server_start_script": "/srv/other.sh"}), "utf-8")
+    os.replace(tmp, settings_file)
+
+    assert settings.get("server_start_script") == "/srv/other.sh"
+    assert seen == ["/srv/other.sh"]
+
+
+def test_set_is_debounced_and_written_atomically(mocker, settings_file):
+    """
+    A burst of set() calls results in a single atomic write on flush.
+    """
+    settings = st.Settings(str(settings_file), write_delay=60)
+    replace = mocker.spy(st.os, "replace")
+
+    for i in range(10):
+        settings.set("counter", i)
+    replace.assert_not_called()
+
+    settings.flush()
+
+    replace.assert_called_once()
+    assert json.loads(settings_file.read_text("utf-8"))["counter"] == 9
+    assert [p.name for p in settings_file.parent.iterdir()] == ["settings.json"]
+
+
+def test_subscribers_only_see_real_changes(settings_file):
+    """
+    Setting the same value again does not notify subscribers.
+    """
+    settings = st.Settings(str(settings_file), write_delay=60)
+    seen = []
+    unsubscribe = settings.subscribe("server_start_script", seen.append)
+
+    settings.set("server_start_script", "/srv/run.sh")
+    settings.set("server_start_script", "/srv/new.sh")
+    unsubscribe()
+    settings.set("server_start_script", "/srv/last.sh")
+
+    assert seen == ["/srv/new.sh"]
+    settings.flush()
+
+
+def test_command_line_override_wins_over_file_and_default(settings_file):
+    """
+    A value given on the command line beats settings.json, which beats the
+    built-in default.
+    """
+    store = st.Settings(str(settings_file))
+    store.set("metrics_port", 9100)
+
+    assert store.get_with_override("metrics_port", 9200, None) == 9200
+    assert store.get_with_override("metrics_port", None, 9300) == 9100
+    assert store.get_with_override("tick_budget", None, 0.25) == 0.25
+
+
+def test_subscribers_run_without_the_lock_held(settings_file):
+    """
+    Callbacks fired by an external reload run after the lock is released, so
+    another thread can use the store from inside them.
+    """
+    settings = st.Settings(str(settings_file))
+    acquired = []
+
+    def try_lock():
+        acquired.append(settings._lock.acquire(timeout=1))
+        if acquired[-1]:
+            settings._lock.release()
+
+    def callback(value):
+        probe = threading.Thread(target=try_lock)
+        probe.start()
+        probe.join()
+
+    settings.subscribe("server_start_script", callback)
+    tmp = settings_file.with_suffix(".new")
+    tmp.write_text(json.dumps({"server_start_script": "/srv/other.sh"}), "utf-8")
+    os.replace(tmp, settings_file)
+
+    settings.get("server_start_script")
+    assert acquired == [True]
+
+
+def test_set_keeps_an_external_edit_of_other_keys(settings_file):
+    """
+    set() picks up a file changed on disk first instead of overwriting it
+    with the stale in-memory copy.
+    """
+    settings = st.Settings(str(settings_file), write_delay=60)
+    tmp = settings_file.with_suffix(".new")
+    tmp.write_text(
+        json.dumps({"server_start_script": "/srv/other.sh", "ram_mb": 4096}),
+        "utf-8",
+    )
+    os.replace(tmp, settings_file)
+
+    settings.set("metrics_port", 9100)
+    settings.flush()
+
+    assert json.loads(settings_file.read_text("utf-8")) == {
+        "server_start_script": "/srv/other.sh",
+        "ram_mb": 4096,
+        "metrics_port": 9100,
+    }
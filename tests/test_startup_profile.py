@@ -0,0 +1,43 @@
+# tests/test_startup_profile.py
+
+import io
+import subprocess
+import sys
+
+from startup_profile import StartupProfile
+
+
+def test_report_lists_stages_and_marks_once():
+    profile = StartupProfile()
+    profile.enabled = True
+    with profile.stage("import ui panels"):
+        pass
+    profile.mark("first frame")
+    out = io.StringIO()
+
+    profile.report(out)
+    profile.report(out)
+
+    text = out.getvalue()
+    assert text.count("Профиль запуска") == 1
+    assert "import ui panels" in text and "first frame" in text
+
+
+def test_nothing_is_recorded_after_report():
+    """
+    The poll loop marks every tick; only the first startup pass is kept.
+    """
+    profile = StartupProfile()
+    profile.report()
+    profile.mark("first probe done")
+
+    assert profile.marks == []
+
+
+def test_view_model_does_not_load_flet():
+    """
+    The ui package loads panels lazily, so view models stay importable
+    without the GUI stack.
+    """
+    code = "import sys, ui.view_model; sys.exit('flet' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
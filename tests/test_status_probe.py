@@ -0,0 +1,119 @@
+# tests/test_status_probe.py
+
+import asyncio
+import time
+
+from rcon_dispatcher import RconDispatcher
+from status_probe import StatusProbe
+
+
+def _free_port():
+    """
+    Returns a localhost port that nothing is listening on.
+    """
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_probe_reports_open_and_closed_ports(mocker):
+    """
+    An open listener that does not speak Server List Ping is reported as an
+    open but not yet ready game port; an unused port as closed.
+    """
+    rcon_session = mocker.MagicMock()
+    rcon_session.ping.return_value = True
+
+    async def scenario():
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        open_port = server.sockets[0].getsockname()[1]
+        probe = StatusProbe(
+            "127.0.0.1",
+            RconDispatcher(rcon_session),
+            game_port=open_port,
+            rcon_port=_free_port(),
+        )
+        async with server:
+            return await probe.probe()
+
+    result = asyncio.run(scenario())
+
+    assert result.game_port_ok is True
+    assert result.game_ready is False
+    assert result.rcon_port_ok is False
+    assert result.rcon_ok is True
+
+
+def test_probe_runs_checks_concurrently_with_deadlines(mocker):
+    """
+    A slow RCON check is cut off by its deadline, and the tick lasts as long
+    as the slowest probe rather than the sum of all of them.
+    """
+    rcon_session = mocker.MagicMock()
+    rcon_session.ping.side_effect = lambda: time.sleep(0.5) or True
+    probe = StatusProbe(
+        "127.0.0.1",
+        RconDispatcher(rcon_session),
+        game_port=_free_port(),
+        rcon_port=_free_port(),
+        rcon_timeout=0.2,
+    )
+
+    async def timed_probe():
+        started = time.monotonic()
+        result = await probe.probe()
+        return result, time.monotonic() - started
+
+    result, elapsed = asyncio.run(timed_probe())
+
+    assert result.rcon_ok is False
+    assert elapsed < 0.5
+
+
+def test_slow_rcon_ping_is_not_started_again_while_running(mocker):
+    """
+    A ping that outlives its deadline keeps running on the dispatcher; the
+    next checks wait for it instead of queueing more pings behind it.
+    """
+    rcon_session = mocker.MagicMock()
+    rcon_session.ping.side_effect = lambda: time.sleep(0.3) or True
+    probe = StatusProbe("127.0.0.1", RconDispatcher(rcon_session), rcon_timeout=0.05)
+
+    async def scenario():
+        missed = [await probe.check_rcon() for _ in range(3)]
+        probe.rcon_timeout = 1.0
+        return missed, await probe.check_rcon()
+
+    missed, answered = asyncio.run(scenario())
+
+    assert missed == [False, False, False]
+    assert answered is True
+    assert rcon_session.ping.call_count == 1
+
+
+def test_update_server_status_async_applies_probe(mocker):
+    """
+    The async status update maps the probe result onto ServerStatus.
+    """
+    from server_manager import ServerManager
+    from server_status import ServerStatus
+    from status_probe import ProbeResult
+
+    mocker.patch(
+        "status_probe.StatusProbe.probe",
+        return_value=ProbeResult(True, True, False, mocker.MagicMock()),
+    )
+    manager = ServerManager(
+        rcon_host="localhost",
+        rcon_password="password",
+        rcon_port=25575,
+        alert_window=mocker.MagicMock(),
+        update_status_callback=mocker.MagicMock(),
+    )
+
+    asyncio.run(manager.update_server_status_async())
+
+    assert manager.get_status() == ServerStatus.STARTING
+    manager.update_status_callback.assert_called_once()
@@ -0,0 +1,202 @@
+# tests/test_task_scheduler.py
+
+import asyncio
+import time
+from dataclasses import replace
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from settings import Settings
+from settings_field import SettingsField
+from task_scheduler import ScheduledTask, TaskAction, TaskScheduler
+
+KEY = SettingsField.SCHEDULED_TASKS.value
+NOW = datetime(2025, 5, 1, 10, 0).timestamp()
+
+
+class Clock:
+    def __init__(self, now=NOW):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return Settings(str(tmp_path / "settings.json"), write_delay=60)
+
+
+def make_scheduler(settings, clock=None, backups=None):
+    fleet = MagicMock()
+    fleet.definitions = [MagicMock()]
+    fleet.definitions[0].name = "lobby"
+    commands = {"lobby": MagicMock(), "creative": MagicMock()}
+    return TaskScheduler(fleet, commands, settings, backups, clock=clock or Clock())
+
+
+def test_tasks_are_ordered_by_next_run(settings):
+    scheduler = make_scheduler(settings)
+    scheduler.add(
+        ScheduledTask(
+            "backup", TaskAction.COMMAND, command="save-all", cron="30 * * * *"
+        )
+    )
+    scheduler.add(ScheduledTask("restart", TaskAction.RESTART, cron="0 4 * * *"))
+    scheduler.add_once("hello", 60, TaskAction.COMMAND, command="say hi")
+
+    assert [(t.id, when - NOW) for t, when in scheduler.tasks()] == [
+        ("hello", 60),
+        ("backup", 1800),
+        ("restart", 18 * 3600),
+    ]
+
+
+def test_due_entries_include_countdown_announcements(settings):
+    clock = Clock()
+    scheduler = make_scheduler(settings, clock)
+    scheduler.add_once("restart", 600, TaskAction.RESTART, countdown=(60, 300))
+
+    clock.now += 300
+    assert [(t.id, c) for t, c in scheduler._pop_due(clock())] == [("restart", 300)]
+    clock.now += 200
+    assert scheduler._pop_due(clock()) == []
+    clock.now += 100
+    due = scheduler._pop_due(clock())
+
+    assert [c for _, c in due] == [60, None]
+    assert due[0][0].announcement(60) == "Перезапуск сервера через 1 мин"
+    # The one-shot task is gone once it has run
+    assert scheduler.tasks() == []
+    assert settings.get(KEY) == []
+
+
+def test_cron_task_is_rescheduled_after_running(settings):
+    clock = Clock()
+    scheduler = make_scheduler(settings, clock)
+    scheduler.add(
+        ScheduledTask(
+            "save", TaskAction.COMMAND, command="save-all", cron="*/10 * * * *"
+        )
+    )
+
+    clock.now += 600
+    assert len(scheduler._pop_due(clock())) == 1
+    assert scheduler.tasks()[0][1] == NOW + 1200
+
+
+def test_removed_and_replaced_tasks_leave_no_stale_runs(settings):
+    clock = Clock()
+    scheduler = make_scheduler(settings, clock)
+    scheduler.add_once("a", 10, TaskAction.STOP)
+    scheduler.add_once("b", 10, TaskAction.STOP)
+    scheduler.add_once("b", 20, TaskAction.START)
+    assert scheduler.remove("a")
+    assert not scheduler.remove("a")
+
+    clock.now += 30
+    due = scheduler._pop_due(clock())
+
+    assert [(t.id, t.action) for t, _ in due] == [("b", TaskAction.START)]
+
+
+def test_tasks_persist_and_reload_from_settings(settings):
+    scheduler = make_scheduler(settings)
+    scheduler.add(
+        ScheduledTask("restart", TaskAction.RESTART, server="creative", cron="@daily")
+    )
+
+    assert settings.get(KEY) == [
+        {"id": "restart", "action": "restart", "server": "creative", "cron": "@daily"}
+    ]
+    restored = make_scheduler(settings)
+    assert [t.id for t, _ in restored.tasks()] == ["restart"]
+
+    # An external edit of settings.json is picked up by the running scheduler
+    settings.set(KEY, [{"id": "say", "command": "say hi", "cron": "0 * * * *"}])
+    assert [t.id for t, _ in scheduler.tasks()] == ["say"]
+
+
+def test_invalid_and_long_missed_tasks_are_skipped_on_load(settings):
+    settings.set(
+        KEY,
+        [
+            {"id": "bad", "command": "say hi", "cron": "61 * * * *"},
+            {"id": "nowhere", "action": "stop", "server": "survival", "cron": "@daily"},
+            {"id": "old", "action": "stop", "at": NOW - 3600},
+            {"id": "late", "action": "stop", "at": NOW - 60},
+            {"id": "text", "action": "stop", "at": "soon"},
+            {"id": "never", "action": "stop", "cron": "0 0 30 2 *"},
+            "restart",
+        ],
+    )
+
+    scheduler = make_scheduler(settings)
+
+    assert [t.id for t, _ in scheduler.tasks()] == ["late"]
+
+
+def test_run_executes_due_tasks(settings):
+    scheduler = make_scheduler(settings, clock=time.monotonic)
+
+    async def scenario():
+        timer = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0)
+        scheduler.add_once(
+            "say", 0.05, TaskAction.COMMAND, server="creative", command="say hi"
+        )
+        scheduler.add_once("restart", 0.05, TaskAction.RESTART)
+        await asyncio.sleep(0.3)
+        timer.cancel()
+
+    asyncio.run(scenario())
+
+    scheduler.commands["creative"].send_command.assert_called_once_with("say hi")
+    scheduler.fleet.get.assert_called_with("lobby")
+    scheduler.fleet.get.return_value.restart_server.assert_called_once()
+    assert scheduler.tasks() == []
+
+
+def test_backup_task_starts_the_server_backup(settings):
+    backups = {"lobby": MagicMock()}
+    scheduler = make_scheduler(settings, backups=backups)
+    task = ScheduledTask("nightly", TaskAction.BACKUP, cron="0 4 * * *")
+
+    asyncio.run(scheduler._execute(task, None))
+
+    backups["lobby"].start.assert_called_once()
+
+
+def test_one_off_time_accepts_iso_strings_and_rejects_garbage(settings):
+    scheduler = make_scheduler(settings)
+    scheduler.add(
+        ScheduledTask.from_dict(
+            {"id": "iso", "action": "stop", "at": "2025-05-01T10:05"}
+        )
+    )
+
+    assert [(t.id, when - NOW) for t, when in scheduler.tasks()] == [("iso", 300)]
+    for at in ("tomorrow", [NOW], True):
+        with pytest.raises(ValueError):
+            ScheduledTask("bad", TaskAction.STOP, at=at)
+    with pytest.raises(ValueError):
+        scheduler.add(ScheduledTask("never", TaskAction.STOP, cron="0 0 30 2 *"))
+    assert [t.id for t, _ in scheduler.tasks()] == ["iso"]
+
+
+def test_run_survives_a_bad_heap_entry(settings):
+    scheduler = make_scheduler(settings, clock=time.monotonic)
+    scheduler.add_once("broken", 60, TaskAction.STOP)
+    scheduler._heap[0] = replace(scheduler._heap[0], when="later")
+
+    async def scenario():
+        timer = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0)
+        scheduler.add_once("restart", 0.05, TaskAction.RESTART)
+        await asyncio.sleep(0.3)
+        timer.cancel()
+
+    asyncio.run(scenario())
+
+    scheduler.fleet.get.return_value.restart_server.assert_called_once()
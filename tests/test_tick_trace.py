@@ -0,0 +1,95 @@
+# tests/test_tick_trace.py
+
+import asyncio
+import logging
+import os
+import time
+
+from tick_trace import ProfileCapture, TickTracer
+
+
+def test_spans_outside_a_tick_are_not_recorded():
+    tracer = TickTracer()
+    with tracer.span("probe"):
+        pass
+
+    assert tracer.last is None
+
+
+def test_nested_spans_from_tasks_and_threads_join_the_tick():
+    """
+    Probes run in gathered tasks and RCON queries in to_thread; both are
+    attributed to the tick (and the parent span) that started them.
+    """
+    tracer = TickTracer()
+
+    def rcon():
+        with tracer.span("rcon list"):
+            time.sleep(0.001)
+
+    async def probe(name):
+        with tracer.span(f"probe {name}"):
+            await asyncio.to_thread(rcon)
+
+    async def tick():
+        with tracer.tick():
+            with tracer.span("fleet.update_all"):
+                await asyncio.gather(probe("a"), probe("b"))
+
+    asyncio.run(tick())
+
+    names = {name for name, _, _ in tracer.last.spans}
+    assert names == {
+        "fleet.update_all",
+        "fleet.update_all/probe a",
+        "fleet.update_all/probe b",
+        "fleet.update_all/probe a/rcon list",
+        "fleet.update_all/probe b/rcon list",
+    }
+
+
+def test_slow_tick_logs_breakdown(caplog):
+    tracer = TickTracer(budget=0.0)
+    with caplog.at_level(logging.WARNING, logger="srvop"):
+        with tracer.tick():
+            with tracer.span("page.update"):
+                pass
+
+    assert tracer.slow_ticks == 1
+    assert tracer.last_slow is tracer.last
+    assert "Медленный тик" in caplog.text
+    assert "page.update" in caplog.text
+
+
+def test_fast_tick_is_not_logged(caplog):
+    tracer = TickTracer(budget=60)
+    with caplog.at_level(logging.WARNING, logger="srvop"):
+        with tracer.tick():
+            pass
+
+    assert tracer.slow_ticks == 0
+    assert caplog.text == ""
+
+
+def test_trace_as_dict_reports_offsets():
+    tracer = TickTracer()
+    with tracer.tick():
+        with tracer.span("render"):
+            pass
+
+    data = tracer.last.as_dict()
+    assert data["spans"][0]["name"] == "render"
+    assert data["spans"][0]["offset_ms"] >= 0
+
+
+def test_profile_capture_toggles_and_saves_stats(tmp_path):
+    capture = ProfileCapture(top=5)
+    path = str(tmp_path / "tick.prof")
+
+    assert capture.toggle(path) is True
+    sum(i * i for i in range(1000))
+    assert capture.toggle(path) is False
+
+    assert not capture.running
+    assert os.path.getsize(path) > 0
+    assert capture.stop() is None
@@ -0,0 +1,65 @@
+# tests/test_tps_estimator.py
+
+import pytest
+from tps_estimator import TpsEstimator
+
+
+def test_full_speed_server_reports_20_tps():
+    """
+    20 ticks per wall second is 20 TPS and 50 ms per tick.
+    """
+    estimator = TpsEstimator()
+
+    assert estimator.add_sample(1000, 0.0) is None
+    reading = estimator.add_sample(1100, 5.0)
+
+    assert reading.tps == pytest.approx(20.0)
+    assert reading.mspt == pytest.approx(50.0)
+
+
+def test_lagging_server_is_smoothed_with_ewma():
+    """
+    A single slow interval moves the estimate by alpha, not all the way.
+    """
+    estimator = TpsEstimator(alpha=0.5)
+    estimator.add_sample(0, 0.0)
+    estimator.add_sample(100, 5.0)
+
+    reading = estimator.add_sample(150, 10.0)
+
+    assert reading.raw_tps == pytest.approx(10.0)
+    assert reading.tps == pytest.approx(15.0)
+    assert estimator.tps_history.values() == pytest.approx([20.0, 15.0])
+
+
+def test_low_tps_alert_fires_once_until_recovery(mocker):
+    """
+    The alert is raised on crossing the threshold and re-armed only after
+    recovering above threshold + hysteresis.
+    """
+    on_alert = mocker.MagicMock()
+    estimator = TpsEstimator(
+        alpha=1.0, alert_below=15, hysteresis=2, on_alert=on_alert
+    )
+    ticks = 0
+    for second, tps in enumerate([20, 10, 10, 16, 10, 18, 10], start=1):
+        estimator.add_sample(ticks, second - 1)
+        ticks += tps
+
+    estimator.add_sample(ticks, 7)
+
+    assert on_alert.call_count == 2
+
+
+def test_gaps_and_rollbacks_restart_the_baseline():
+    """
+    Downtime longer than max_gap and a rolled back world do not produce a
+    false lag reading.
+    """
+    estimator = TpsEstimator(max_gap=60)
+    estimator.add_sample(0, 0.0)
+    estimator.add_sample(100, 5.0)
+
+    assert estimator.add_sample(200, 600.0).tps == pytest.approx(20.0)
+    assert estimator.add_sample(50, 605.0) is None
+    assert estimator.add_sample(150, 610.0).tps == pytest.approx(20.0)
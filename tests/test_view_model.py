@@ -0,0 +1,149 @@
+# tests/test_view_model.py
+
+import pytest
+from player_roster import PlayerRoster
+from server_list_ping import ServerInfo
+from server_snapshot import ServerSnapshot
+from server_status import ServerStatus
+from ui.view_model import (
+    BackupPanelView,
+    PlayersPanelView,
+    ScheduleRowView,
+    UIRenderer,
+    UIState,
+    WorldRowView,
+)
+
+
+def make_info(latency_ms=12.0, online=1):
+    return ServerInfo("1.21", 767, "motd", online, 20, latency_ms)
+
+
+def make_snapshot(ticks=6000):
+    return ServerSnapshot(ticks, True, None, 1, 20)
+
+
+@pytest.fixture
+def renderer(mocker):
+    return UIRenderer(
+        mocker.MagicMock(), mocker.MagicMock(), mocker.MagicMock(), mocker.MagicMock()
+    )
+
+
+def test_unchanged_state_sends_nothing(renderer):
+    """
+    Rendering the same state twice only pushes to the page once.
+    """
+    state = UIState.build(ServerStatus.ONLINE, "10.0.0.1", make_info(), make_snapshot())
+
+    assert renderer.render(state) is True
+    assert renderer.render(state) is False
+    renderer.page.update.assert_called_once()
+
+
+def test_latency_jitter_is_not_a_change(renderer):
+    """
+    A few milliseconds of latency jitter do not cause a re-render.
+    """
+    renderer.render(UIState.build(ServerStatus.ONLINE, "ip", make_info(12.0)))
+
+    assert renderer.render(UIState.build(ServerStatus.ONLINE, "ip", make_info(13.4))) is False
+
+
+def test_only_changed_panels_are_touched(renderer):
+    """
+    A clock change re-applies the time panel but not the others.
+    """
+    info = make_info()
+    renderer.render(UIState.build(ServerStatus.ONLINE, "ip", info, make_snapshot(6000)))
+    for panel in (renderer.control_panel, renderer.state_panel, renderer.time_panel):
+        panel.reset_mock()
+
+    renderer.render(UIState.build(ServerStatus.ONLINE, "ip", info, make_snapshot(7000)))
+
+    renderer.control_panel.update_state.assert_not_called()
+    renderer.state_panel.update_state.assert_not_called()
+    renderer.time_panel.update_state.assert_called_once()
+    assert renderer.page.update.call_count == 2
+
+
+def test_players_panel_is_rendered_only_on_roster_change(mocker):
+    """
+    An unchanged roster does not touch the players panel.
+    """
+    roster = PlayerRoster()
+    roster.update(["Alex", "Steve"], now=0)
+    panels = [mocker.MagicMock() for _ in range(4)]
+    renderer = UIRenderer(mocker.MagicMock(), *panels[:3], players_panel=panels[3])
+
+    def state():
+        return UIState.build(
+            ServerStatus.ONLINE,
+            "1.2.3.4",
+            snapshot=make_snapshot(),
+            roster=PlayersPanelView.build(roster),
+        )
+
+    renderer.render(state())
+    renderer.render(state())
+    roster.update(["Alex"], now=1)
+    renderer.render(state())
+
+    assert panels[3].update_state.call_count == 2
+    assert panels[3].update_state.call_args.args[0].players == ("Alex",)
+
+
+def test_schedule_rows_use_the_default_server(mocker):
+    from task_scheduler import ScheduledTask, TaskAction
+
+    scheduler = mocker.MagicMock()
+    scheduler.tasks.return_value = [
+        (ScheduledTask("r", TaskAction.RESTART, cron="@daily"), 1746057600.0),
+        (ScheduledTask("s", TaskAction.COMMAND, "creative", "say hi", at=1.0), None),
+    ]
+
+    rows = ScheduleRowView.build_all(scheduler, "lobby")
+
+    assert [(r.task_id, r.server, r.action) for r in rows] == [
+        ("r", "lobby", "restart"),
+        ("s", "creative", "/say hi"),
+    ]
+    assert rows[0].next_run is not None and rows[1].next_run is None
+    assert ScheduleRowView.build_all(None) == ()
+
+
+def test_backup_view_reports_progress():
+    from server_jobs import JobState
+    from world_backup import BackupProgress, BackupStage
+
+    def view(done):
+        return BackupPanelView.build(
+            BackupProgress(BackupStage.COPY, JobState.RUNNING, done, 1000)
+        )
+
+    assert view(500).fraction == view(501).fraction
+    assert view(500).fraction == 0.5 and view(500).running
+    finished = BackupProgress(
+        BackupStage.FINISHED, JobState.DONE, 10, 10, 3, 7, 2 * 1024 * 1024, 4.2
+    )
+    assert BackupPanelView.build(finished).text == (
+        "Готово: новых объектов 3, 2.0 МБ за 4 с"
+    )
+
+
+def test_world_rows_name_dimensions_and_sizes():
+    from world_index import DimensionSummary
+
+    summary = [
+        DimensionSummary("the_nether", 4, 900, 3 * 1024**3, 0, 1, 1746057600, 12),
+        DimensionSummary("mod:mining", 1, 0, 8192, 0, None, None, 0),
+    ]
+
+    rows = WorldRowView.build_all(summary)
+
+    assert [(r.dimension, r.size, r.stale_chunks) for r in rows] == [
+        ("Незер", "3.0 ГБ", 12),
+        ("mod:mining", "0 МБ", 0),
+    ]
+    assert rows[0].last_saved and rows[1].last_saved is None
+    assert WorldRowView.build_all(None) == ()
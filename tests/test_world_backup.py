@@ -0,0 +1,162 @@
+# tests/test_world_backup.py
+
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import MagicMock
+
+import pytest
+from server_jobs import JobState
+from server_status import ServerStatus
+from world_backup import (
+    FLUSH_TIMEOUT,
+    BackupStore,
+    WorldBackup,
+    create_backup,
+    restore_backup,
+)
+from world_files import build_region, split_region
+
+
+def chunk(index, version=0):
+    """A chunk payload: big-endian length, compression byte, compressed data."""
+    data = zlib.compress(os.urandom(64) + bytes(3000 + index) + bytes([version]))
+    return (len(data) + 1).to_bytes(4, "big") + b"\2" + data
+
+
+def region(*chunks):
+    return build_region((i, 1000 + i, payload) for i, payload in chunks)
+
+
+@pytest.fixture
+def server(tmp_path):
+    """
+    A server directory with a world of two regions and a Bukkit nether.
+    """
+    (tmp_path / "server.properties").write_text("level-name=survival\n")
+    regions = tmp_path / "survival" / "region"
+    regions.mkdir(parents=True)
+    (regions / "r.0.0.mca").write_bytes(region(*((i, chunk(i)) for i in range(40))))
+    (regions / "r.0.1.mca").write_bytes(region((5, chunk(5))))
+    (tmp_path / "survival" / "level.dat").write_bytes(b"level")
+    (tmp_path / "survival" / "session.lock").write_bytes(b"lock")
+    (tmp_path / "survival" / "datapacks").mkdir()
+    nether = tmp_path / "survival_nether" / "DIM-1" / "region"
+    nether.mkdir(parents=True)
+    (nether / "r.-1.0.mca").write_bytes(b"")
+    return tmp_path
+
+
+def test_region_round_trip():
+    chunks = [(0, 7, chunk(0)), (1023, 9, chunk(1023))]
+
+    assert split_region(build_region(chunks)) == chunks
+    assert split_region(b"\1" * 9000) is None
+
+
+def test_backup_stores_only_changed_chunks(server, tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    first = create_backup(store, str(server))
+    objects = sum(len(files) for _, _, files in os.walk(store.objects))
+    assert first.files == 4
+    # 41 chunks, level.dat and the empty nether region
+    assert objects == 43
+
+    path = server / "survival" / "region" / "r.0.0.mca"
+    chunks = split_region(path.read_bytes())
+    chunks[3] = (3, 2000, chunk(3, version=1))
+    path.write_bytes(build_region(chunks))
+    progress = []
+    create_backup(store, str(server), on_progress=progress.append)
+
+    assert progress[-1].new_objects == 1
+    assert progress[-1].reused_objects == 39
+    assert sum(len(files) for _, _, files in os.walk(store.objects)) == 44
+
+
+def test_restore_by_timestamp_puts_the_world_aside(server, tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    clock = iter([100.0, 200.0])
+    level = server / "survival" / "level.dat"
+    original = (server / "survival" / "region" / "r.0.0.mca").read_bytes()
+    create_backup(store, str(server), clock=lambda: next(clock))
+    level.write_bytes(b"changed")
+    os.utime(level, ns=(1, 1))
+    create_backup(store, str(server), clock=lambda: next(clock))
+
+    with pytest.raises(LookupError):
+        store.find(50.0)
+    info = store.find(150.0)
+    kept = restore_backup(store, info.id, str(server))
+
+    assert level.read_bytes() == b"level"
+    restored = server / "survival" / "region" / "r.0.0.mca"
+    assert split_region(restored.read_bytes()) == split_region(original)
+    assert (server / "survival" / "datapacks").is_dir()
+    assert not (server / "survival" / "session.lock").exists()
+    assert (server / f"survival.before-{info.id}" / "session.lock").exists()
+    assert len(kept) == 2
+
+
+def test_prune_keeps_objects_of_remaining_snapshots(server, tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    create_backup(store, str(server))
+    (server / "survival" / "level.dat").write_bytes(b"v2")
+    create_backup(store, str(server))
+
+    assert store.prune(1) == 1
+    assert [s.files for s in store.snapshots()] == [4]
+    restore_backup(store, store.snapshots()[0].id, str(server))
+    assert (server / "survival" / "level.dat").read_bytes() == b"v2"
+
+
+def test_process_pool_compression(server, tmp_path):
+    store = BackupStore(str(tmp_path / "backups"))
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(2, mp_context=spawn) as pool:
+        create_backup(store, str(server), executor=pool)
+
+    assert store.read_object(store.latest()["files"]["survival/level.dat"]["blob"])
+
+
+def test_online_backup_wraps_copy_in_save_off_and_save_on(server, tmp_path):
+    manager = MagicMock()
+    manager.server_directory.return_value = str(server)
+    manager.get_status.return_value = ServerStatus.ONLINE
+    mcommands = MagicMock()
+    mcommands.send_command.return_value = "ok"
+    settings = {"backup_dir": str(tmp_path / "backups")}
+    on_change = MagicMock()
+    backup = WorldBackup(manager, mcommands, settings, workers=1, on_change=on_change)
+
+    assert backup.start()
+    backup.join(30)
+
+    sent = [c.args[0] for c in mcommands.send_command.call_args_list]
+    assert sent == ["save-off", "save-all flush", "save-on"]
+    flush = mcommands.send_command.call_args_list[1]
+    assert flush.kwargs["read_timeout"] == FLUSH_TIMEOUT
+    assert backup.progress.state == JobState.DONE
+    assert on_change.called
+    manager.update_status_callback.assert_not_called()
+    assert len(backup.snapshots()) == 1
+    with pytest.raises(RuntimeError):
+        backup.restore(1e12)
+
+
+def test_failed_save_off_aborts_the_backup_and_reenables_saving(server, tmp_path):
+    manager = MagicMock()
+    manager.server_directory.return_value = str(server)
+    manager.get_status.return_value = ServerStatus.ONLINE
+    mcommands = MagicMock()
+    mcommands.send_command.return_value = ""
+    backup = WorldBackup(manager, mcommands, {"backup_dir": str(tmp_path / "b")})
+
+    backup.start()
+    backup.join(30)
+
+    assert backup.progress.state == JobState.FAILED
+    sent = [c.args[0] for c in mcommands.send_command.call_args_list]
+    assert sent == ["save-off", "save-on"]
+    mcommands.alert_window.set_error.assert_called_once()
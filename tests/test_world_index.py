@@ -0,0 +1,153 @@
+# tests/test_world_index.py
+
+import asyncio
+import threading
+import time
+
+import pytest
+import world_index
+from world_files import build_region, dimension_region_dirs
+from world_index import WorldIndex, WorldWatcher, scan_region
+
+DAY = 86400
+NOW = 1_750_000_000
+PAYLOAD = (5).to_bytes(4, "big") + b"\2abcd"
+
+
+def write_region(path, ages):
+    """Writes a region whose chunk i was last saved ages[i] days ago."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunks = ((i, NOW - age * DAY, PAYLOAD) for i, age in enumerate(ages))
+    path.write_bytes(build_region(chunks))
+
+
+@pytest.fixture
+def server(tmp_path):
+    """
+    A Bukkit-style server: overworld, a separate nether folder and a
+    datapack dimension.
+    """
+    (tmp_path / "server.properties").write_text("level-name=survival\n")
+    write_region(tmp_path / "survival/region/r.0.0.mca", [1, 200, 5])
+    write_region(tmp_path / "survival/region/r.-1.2.mca", [400])
+    (tmp_path / "survival/region/notes.txt").write_text("not a region")
+    write_region(tmp_path / "survival_nether/DIM-1/region/r.0.0.mca", [2])
+    write_region(tmp_path / "survival/dimensions/mod/mining/region/r.0.0.mca", [])
+    return tmp_path
+
+
+def test_world_is_located_from_server_properties(server):
+    dimensions = dimension_region_dirs(server)
+
+    assert list(dimensions) == ["overworld", "the_nether", "mod:mining"]
+
+
+def test_scan_region_reads_the_header_only(server):
+    stats = scan_region(str(server / "survival/region/r.0.0.mca"))
+
+    assert stats.chunks == 3
+    assert stats.sectors == 3
+    assert list(stats.timestamps) == sorted(stats.timestamps)
+    assert stats.count_older(NOW - 100 * DAY) == 1
+
+
+def test_summary_per_dimension(server):
+    summary = {s.dimension: s for s in WorldIndex(str(server)).scan(now=NOW)}
+
+    overworld = summary["overworld"]
+    assert (overworld.regions, overworld.chunks, overworld.stale_chunks) == (2, 4, 2)
+    assert overworld.oldest == NOW - 400 * DAY
+    assert overworld.newest == NOW - DAY
+    assert summary["the_nether"].chunks == 1
+    assert summary["mod:mining"].chunks == 0
+    assert summary["mod:mining"].newest is None
+
+
+def test_stale_chunks_have_world_coordinates(server):
+    index = WorldIndex(str(server))
+    index.scan(now=NOW)
+
+    assert index.stale_chunks("overworld", 90, now=NOW) == [
+        (-32, 64, NOW - 400 * DAY),
+        (1, 0, NOW - 200 * DAY),
+    ]
+
+
+def test_rescan_reads_only_changed_files(server, mocker):
+    WorldIndex(str(server)).scan(now=NOW)
+    write_region(server / "survival/region/r.0.0.mca", [1, 1, 1, 1])
+    spy = mocker.spy(world_index, "scan_region")
+
+    summary = WorldIndex(str(server)).scan(now=NOW)
+
+    assert spy.call_count == 1
+    assert summary[0].chunks == 5 and summary[0].stale_chunks == 1
+
+
+def test_cache_that_is_not_an_object_is_ignored(server):
+    (server / world_index.CACHE_NAME).write_text("[1, 2, 3]")
+
+    summary = WorldIndex(str(server)).scan(now=NOW)
+
+    assert [s.regions for s in summary] == [2, 1, 1]
+
+
+def test_watcher_keeps_running_after_an_unexpected_error(mocker):
+    """
+    A failing rescan is logged and retried on the next interval; each pass
+    triggers a render, not a status probe.
+    """
+    manager = mocker.MagicMock()
+    on_change = mocker.MagicMock()
+    watcher = WorldWatcher(manager, {}, on_change=on_change)
+    refresh = mocker.patch.object(watcher, "refresh", side_effect=RuntimeError)
+
+    async def scenario():
+        task = asyncio.create_task(watcher.run(0.01))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(scenario())
+
+    assert refresh.call_count >= 2
+    assert on_change.call_count >= 2
+    manager.update_status_callback.assert_not_called()
+
+
+def test_concurrent_refreshes_scan_one_at_a_time(server, mocker):
+    """
+    The periodic rescan and an API request never scan the same index (and
+    write the same cache file) at once.
+    """
+    manager = mocker.MagicMock()
+    manager.server_directory.return_value = str(server)
+    watcher = WorldWatcher(manager, {})
+    active, overlaps = [], []
+    original = WorldIndex.scan
+
+    def scan(index, *args, **kwargs):
+        overlaps.append(bool(active))
+        active.append(1)
+        time.sleep(0.05)
+        try:
+            return original(index, *args, **kwargs)
+        finally:
+            active.pop()
+
+    mocker.patch.object(WorldIndex, "scan", scan)
+    threads = [threading.Thread(target=watcher.refresh) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [False, False, False]
+    assert [s.regions for s in watcher.summary] == [2, 1, 1]
+
+
+def test_first_scan_fans_out_to_a_process_pool(server, monkeypatch):
+    monkeypatch.setattr(world_index, "POOL_THRESHOLD", 1)
+
+    summary = WorldIndex(str(server), workers=2).scan(now=NOW)
+
+    assert [s.chunks for s in summary] == [4, 1, 0]
@@ -0,0 +1,214 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+
+logger = logging.getLogger("srvop")
+
+# Бюджет одного тика по умолчанию: дольше - заметная задержка интерфейса
+TICK_BUDGET = 0.25
+
+# Список спанов текущего тика и имя родительского спана. ContextVar
+# наследуется задачами asyncio.gather и потоками asyncio.to_thread, поэтому
+# проверки и RCON-запросы попадают в тот тик, который их запустил.
+_spans: ContextVar[list | None] = ContextVar("tick_spans", default=None)
+_parent: ContextVar[str] = ContextVar("tick_parent", default="")
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_spans", "_name", "_started", "_token")
+
+    def __init__(self, spans: list, name: str):
+        self._spans = spans
+        self._name = name
+
+    def __enter__(self):
+        parent = _parent.get()
+        self._name = f"{parent}/{self._name}" if parent else self._name
+        self._token = _parent.set(self._name)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        finished = time.perf_counter()
+        _parent.reset(self._token)
+        # list.append атомарен: спаны из потоков to_thread пишутся без Lock
+        self._spans.append((self._name, self._started, finished - self._started))
+        return False
+
+
+class TickTrace:
+    """Спаны одного завершённого тика"""
+
+    def __init__(self, started: float, duration: float, spans: list):
+        self.started = started
+        self.duration = duration
+        self.spans = sorted(spans, key=lambda s: s[1])
+
+    def format(self) -> str:
+        lines = [f"Тик {self.duration * 1000:.1f} мс:"]
+        for name, started, duration in self.spans:
+            depth = name.count("/")
+            offset = (started - self.started) * 1000
+            lines.append(
+                f"  {'  ' * depth}{name.rsplit('/', 1)[-1]:<{32 - 2 * depth}}"
+                f" {duration * 1000:8.1f} мс  (+{offset:.1f})"
+            )
+        return "\n".join(lines)
+
+    def as_dict(self) -> dict:
+        return {
+            "duration_ms": round(self.duration * 1000, 1),
+            "spans": [
+                {
+                    "name": name,
+                    "offset_ms": round((started - self.started) * 1000, 1),
+                    "duration_ms": round(duration * 1000, 1),
+                }
+                for name, started, duration in self.spans
+            ],
+        }
+
+
+class TickTracer:
+    """
+    Разбивка тика periodic_update по этапам.
+
+    tick() открывает тик, span(name) внутри него замеряет этап; вложенные
+    спаны получают имя "родитель/этап". Вне тика span() ничего не
+    записывает и стоит одного ContextVar.get(). Тик дольше budget
+    логируется с разбивкой по этапам; последний медленный тик доступен
+    как last_slow.
+    """
+
+    def __init__(self, budget: float = TICK_BUDGET):
+        self.budget = budget
+        self.last = None
+        self.last_slow = None
+        self.slow_ticks = 0
+
+    def span(self, name: str):
+        spans = _spans.get()
+        if spans is None:
+            return _NULL_SPAN
+        return _Span(spans, name)
+
+    def tick(self):
+        return _Tick(self)
+
+    def _finish(self, trace: TickTrace):
+        self.last = trace
+        if trace.duration > self.budget:
+            self.slow_ticks += 1
+            self.last_slow = trace
+            logger.warning(
+                "Медленный тик (бюджет %.0f мс)\n%s",
+                self.budget * 1000,
+                trace.format(),
+            )
+
+
+class _Tick:
+    __slots__ = ("_tracer", "_spans", "_token", "_started")
+
+    def __init__(self, tracer: TickTracer):
+        self._tracer = tracer
+
+    def __enter__(self):
+        self._spans = []
+        self._token = _spans.set(self._spans)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duration = time.perf_counter() - self._started
+        _spans.reset(self._token)
+        self._tracer._finish(TickTrace(self._started, duration, self._spans))
+        return False
+
+
+class ProfileCapture:
+    """
+    cProfile, включаемый и выключаемый во время работы (сигнал SIGUSR1,
+    Ctrl+Shift+P в GUI, POST /profile в --headless). С Python 3.12 cProfile
+    работает через sys.monitoring и видит все потоки, включая to_thread.
+    stop() логирует самые дорогие функции и, если задан path, сохраняет
+    статистику для pstats / snakeviz.
+    """
+
+    def __init__(self, top: int = 25):
+        self.top = top
+        self._profiler = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._profiler is not None
+
+    def start(self) -> bool:
+        with self._lock:
+            if self._profiler is not None:
+                return False
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Уже работает другой профилировщик (например, под отладчиком)
+                return False
+            self._profiler = profiler
+            logger.info("Профилирование включено")
+            return True
+
+    def stop(self, path: str | None = None) -> str | None:
+        """Возвращает отчёт pstats (топ по cumulative) или None"""
+        with self._lock:
+            profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return None
+        profiler.disable()
+        out = io.StringIO()
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        if path:
+            stats.dump_stats(path)
+        report = out.getvalue()
+        where = f": {path}" if path else ""
+        logger.info("Профилирование выключено%s\n%s", where, report)
+        return report
+
+    def toggle(self, path: str | None = None) -> bool:
+        """
+        Включает или выключает профиль; True - профиль теперь работает.
+        При выключении статистика сохраняется в path или во временный файл.
+        """
+        if self.running:
+            self.stop(path or default_profile_path())
+            return False
+        return self.start()
+
+
+def default_profile_path() -> str:
+    name = time.strftime("srvop-%Y%m%d-%H%M%S.prof")
+    return os.path.join(tempfile.gettempdir(), name)
+
+
+TRACER = TickTracer()
+PROFILER = ProfileCapture()
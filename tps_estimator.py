@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+
+from resource_sampler import RingBuffer
+
+TARGET_TPS = 20.0
+
+
+@dataclass(frozen=True)
+class TpsReading:
+    tps: float
+    mspt: float
+    raw_tps: float
+
+
+class TpsEstimator:
+    """
+    Оценка TPS по игровому времени, без плагинов.
+
+    Сравнивает прирост `time query gametime` (тики) с приростом реального
+    времени между двумя замерами: tps = Δтиков / Δсекунд. Эффективный MSPT -
+    реальные миллисекунды на один прошедший тик (не меньше 50). Значения
+    сглаживаются EWMA и хранятся в кольцевых буферах. Когда сглаженный TPS
+    опускается ниже alert_below, один раз вызывается on_alert; повторно -
+    только после восстановления выше alert_below + hysteresis.
+
+    Интервалы длиннее max_gap (сервер был выключен, опрос прерывался) не
+    считаются: они начинают отсчёт заново, а не дают ложную просадку.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        alert_below: float = 15.0,
+        hysteresis: float = 2.0,
+        on_alert=None,
+        capacity: int = 720,
+        min_interval: float = 0.5,
+        max_gap: float = 120.0,
+    ):
+        self.alpha = alpha
+        self.alert_below = alert_below
+        self.hysteresis = hysteresis
+        self.on_alert = on_alert
+        self.min_interval = min_interval
+        self.max_gap = max_gap
+        self.tps_history = RingBuffer(capacity)
+        self.mspt_history = RingBuffer(capacity)
+        self._last = None
+        self._reading = None
+        self._alerting = False
+
+    def reset(self):
+        self._last = None
+        self._reading = None
+        self._alerting = False
+
+    @property
+    def reading(self) -> TpsReading | None:
+        return self._reading
+
+    def add_sample(self, gametime: int | None, wall_time: float) -> TpsReading | None:
+        """
+        Новый замер: gametime в тиках, wall_time - time.monotonic() момента
+        получения ответа.
+        """
+        if gametime is None:
+            return self._reading
+        last, self._last = self._last, (gametime, wall_time)
+        if last is None:
+            return self._reading
+        delta_ticks = gametime - last[0]
+        delta_wall = wall_time - last[1]
+        if delta_ticks < 0:
+            # Мир заменён или откатан из резервной копии.
+            self.reset()
+            self._last = (gametime, wall_time)
+            return None
+        if delta_wall > self.max_gap:
+            return self._reading
+        if delta_wall < self.min_interval:
+            # Слишком короткий интервал: джиттер RCON важнее прироста.
+            self._last = last
+            return self._reading
+
+        raw_tps = min(delta_ticks / delta_wall, TARGET_TPS)
+        if self._reading is None:
+            tps = raw_tps
+        else:
+            tps = self.alpha * raw_tps + (1 - self.alpha) * self._reading.tps
+        mspt = 1000 / tps if tps > 0 else float("inf")
+        self._reading = TpsReading(tps=tps, mspt=max(mspt, 50.0), raw_tps=raw_tps)
+        self.tps_history.append(tps)
+        self.mspt_history.append(self._reading.mspt)
+        self._check_alert()
+        return self._reading
+
+    def _check_alert(self):
+        tps = self._reading.tps
+        if not self._alerting and tps < self.alert_below:
+            self._alerting = True
+            if self.on_alert:
+                self.on_alert(self._reading)
+        elif self._alerting and tps >= self.alert_below + self.hysteresis:
+            self._alerting = False
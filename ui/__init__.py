@@ -1,5 +1,27 @@
-from ui.server_control_panel import ServerControlPanel
-from ui.server_state_panel import ServerStatePanel
-from ui.server_time_panel import ServerTimePanel
-from ui.alert_window import AlertWindow
-from ui.file_dialog import FileDialog
+import importlib
+
+# Панели загружаются при первом обращении: `from ui.view_model import ...`
+# не тянет flet, а GUI импортирует только то, что рисует.
+_EXPORTS = {
+    "ServerControlPanel": "ui.server_control_panel",
+    "ServerStatePanel": "ui.server_state_panel",
+    "ServerTimePanel": "ui.server_time_panel",
+    "AlertWindow": "ui.alert_window",
+    "FileDialog": "ui.file_dialog",
+    "FleetPanel": "ui.fleet_panel",
+    "ResourcePanel": "ui.resource_panel",
+    "PlayersPanel": "ui.players_panel",
+    "SchedulePanel": "ui.schedule_panel",
+    "BackupPanel": "ui.backup_panel",
+    "WorldPanel": "ui.world_panel",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'ui' has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
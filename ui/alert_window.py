@@ -27,5 +27,5 @@ class AlertWindow:
         self.error = error
 
     def update_state(self):
-        if self.error:
+        if self.error and not self.dlg_modal.open:
             self.open()
@@ -0,0 +1,35 @@
+import flet as ft
+
+
+class BackupPanel(ft.Card):
+    """
+    Резервные копии мира: кнопка запуска и прогресс текущей копии.
+    """
+
+    def __init__(self, on_backup):
+        self.button = ft.ElevatedButton(
+            "Резервная копия", icon=ft.Icons.BACKUP, on_click=on_backup
+        )
+        self.progress = ft.ProgressBar(width=300, visible=False)
+        self.text = ft.Text(value="", size=14)
+        super().__init__(
+            content=ft.Container(
+                content=ft.Row(
+                    [self.button, ft.Column([self.text, self.progress], spacing=4)],
+                    spacing=20,
+                ),
+                padding=ft.Padding(top=8, bottom=8, left=20, right=20),
+            ),
+        )
+
+    def update_state(self, view):
+        """
+        Применяет BackupPanelView. Отправку в UI выполняет UIRenderer.
+        """
+        if view is None:
+            return
+        self.button.disabled = view.running
+        self.progress.visible = view.running
+        # None - неопределённая полоса (файлы ещё не посчитаны)
+        self.progress.value = view.fraction
+        self.text.value = view.text
@@ -8,7 +8,7 @@ class FileDialog(ft.FilePicker):
         super().__init__(on_result=self.on_file_selected)
         self.page = page
         self.selected_file = "Файл не выбран"
-        self.settings = st.Settings()
+        self.settings = st.get_settings()
 
         page.overlay.append(self)
 
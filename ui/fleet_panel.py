@@ -0,0 +1,50 @@
+import flet as ft
+from server_status import ServerStatus
+
+STATUS_COLORS = {
+    ServerStatus.ONLINE: ft.Colors.GREEN_300,
+    ServerStatus.OFFLINE: ft.Colors.GREY_400,
+    ServerStatus.ERROR: ft.Colors.RED_300,
+    ServerStatus.RCON_CLOSED: ft.Colors.RED_300,
+}
+
+
+class FleetPanel(ft.Card):
+    """
+    Сводка по всем серверам флота: одна строка на сервер.
+    """
+
+    def __init__(self):
+        self.rows = ft.Column(spacing=4)
+        super().__init__(
+            content=ft.Container(
+                content=self.rows,
+                padding=ft.Padding(top=8, bottom=8, left=20, right=20),
+            ),
+            visible=False,
+        )
+
+    def _row(self, view):
+        players = f"{view.players[0]}/{view.players[1]}" if view.players else "—"
+        latency = f"{view.latency_ms} мс" if view.latency_ms is not None else "—"
+        return ft.Row(
+            [
+                ft.Icon(
+                    ft.Icons.CIRCLE,
+                    size=10,
+                    color=STATUS_COLORS.get(view.status, ft.Colors.ORANGE_300),
+                ),
+                ft.Text(view.name, weight=ft.FontWeight.BOLD, width=120),
+                ft.Text(view.status.value, width=260),
+                ft.Text(players, width=60),
+                ft.Text(latency, width=60),
+            ],
+            spacing=10,
+        )
+
+    def update_state(self, rows):
+        """
+        Применяет кортеж FleetRowView. Отправку в UI выполняет UIRenderer.
+        """
+        self.visible = len(rows) > 1
+        self.rows.controls = [self._row(view) for view in rows]
@@ -0,0 +1,37 @@
+import flet as ft
+
+
+class PlayersPanel(ft.Card):
+    """
+    Игроки онлайн. Список меняется поэлементно: при входе или выходе
+    добавляется или удаляется один элемент, остальные не пересоздаются.
+    """
+
+    def __init__(self):
+        self.title = ft.Text(value="", size=14, weight=ft.FontWeight.BOLD)
+        self.names = ft.Row(wrap=True, spacing=6, run_spacing=6)
+        self._chips = {}
+        super().__init__(
+            content=ft.Container(
+                content=ft.Column([self.title, self.names], spacing=6),
+                padding=ft.Padding(top=8, bottom=8, left=20, right=20),
+            ),
+            visible=False,
+        )
+
+    def update_state(self, view):
+        """
+        Применяет PlayersPanelView. Отправку в UI выполняет UIRenderer.
+        """
+        if view is None:
+            self.visible = False
+            return
+        self.visible = True
+        self.title.value = f"Игроки {len(view.players)}/{view.players_max}"
+        current = set(view.players)
+        for name in [n for n in self._chips if n not in current]:
+            self.names.controls.remove(self._chips.pop(name))
+        for name in view.players:
+            if name not in self._chips:
+                self._chips[name] = ft.Chip(label=ft.Text(name))
+                self.names.controls.append(self._chips[name])
@@ -0,0 +1,45 @@
+import flet as ft
+
+
+class ResourcePanel(ft.Card):
+    """
+    Потребление ресурсов процессом сервера: текущие значения и график CPU.
+    """
+
+    def __init__(self):
+        self.summary = ft.Text(value="", size=14)
+        self.cpu_line = ft.LineChartData(
+            data_points=[], stroke_width=2, color=ft.Colors.ORANGE_300, curved=False
+        )
+        self.chart = ft.LineChart(
+            data_series=[self.cpu_line],
+            min_y=0,
+            height=80,
+            width=300,
+            left_axis=ft.ChartAxis(labels_size=0),
+            bottom_axis=ft.ChartAxis(labels_size=0),
+        )
+        super().__init__(
+            content=ft.Container(
+                content=ft.Column([self.summary, self.chart], spacing=4),
+                padding=ft.Padding(top=8, bottom=8, left=20, right=20),
+            ),
+            visible=False,
+        )
+
+    def update_state(self, view):
+        """
+        Применяет ResourcePanelView. Отправку в UI выполняет UIRenderer.
+        """
+        if view is None:
+            self.visible = False
+            return
+        self.visible = True
+        self.summary.value = (
+            f"CPU {view.cpu_percent}%  ·  RAM {view.rss_mb} МБ"
+            f"  ·  потоков {view.threads}  ·  дескрипторов {view.open_fds}"
+        )
+        self.cpu_line.data_points = [
+            ft.LineChartDataPoint(x, y) for x, y in enumerate(view.cpu_history)
+        ]
+        self.chart.max_y = max(100, *view.cpu_history) if view.cpu_history else 100
@@ -0,0 +1,37 @@
+import flet as ft
+
+
+class SchedulePanel(ft.Card):
+    """
+    Задачи расписания и время их следующего запуска.
+    """
+
+    def __init__(self):
+        self.title = ft.Text(value="Расписание", size=14, weight=ft.FontWeight.BOLD)
+        self.rows = ft.Column(spacing=4)
+        super().__init__(
+            content=ft.Container(
+                content=ft.Column([self.title, self.rows], spacing=6),
+                padding=ft.Padding(top=8, bottom=8, left=20, right=20),
+            ),
+            visible=False,
+        )
+
+    def _row(self, view):
+        return ft.Row(
+            [
+                ft.Icon(ft.Icons.SCHEDULE, size=14),
+                ft.Text(view.next_run or "—", width=100),
+                ft.Text(view.server, weight=ft.FontWeight.BOLD, width=120),
+                ft.Text(view.action, width=260, no_wrap=True),
+                ft.Text(view.task_id, color=ft.Colors.GREY_500),
+            ],
+            spacing=10,
+        )
+
+    def update_state(self, rows):
+        """
+        Применяет кортеж ScheduleRowView. Отправку в UI выполняет UIRenderer.
+        """
+        self.visible = bool(rows)
+        self.rows.controls = [self._row(view) for view in rows]
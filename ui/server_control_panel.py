@@ -22,7 +22,7 @@ class ServerControlPanel(ft.Card):
             Updates the enabled/disabled state of buttons depending on whether the server is running.
     """
 
-    def __init__(self, on_file_dialog, on_start, on_stop, on_restart):
+    def __init__(self, on_file_dialog, on_start, on_stop, on_restart, on_cancel=None):
         """
         Initializes the server control panel with Start, Stop, and Restart buttons.
 
@@ -30,6 +30,7 @@ class ServerControlPanel(ft.Card):
             on_start (Callable): Callback function triggered when the Start button is clicked.
             on_stop (Callable): Callback function triggered when the Stop button is clicked.
             on_restart (Callable): Callback function triggered when the Restart button is clicked.
+            on_cancel (Callable): Callback function that cancels a running stop/restart job.
         """
         self.open_dialog_btn = ft.IconButton(
             icon=ft.Icons.FOLDER,
@@ -62,25 +63,53 @@ class ServerControlPanel(ft.Card):
             on_click=on_restart,  # Attach restart callback
         )
 
+        # Create the "Cancel" button, shown only while a stop/restart job runs
+        self.cancel_btn = ft.IconButton(
+            icon=ft.Icons.CANCEL,
+            icon_color=ft.Colors.RED_300,
+            tooltip="Отменить остановку/перезапуск",
+            on_click=on_cancel,
+            visible=False,
+        )
+
         # Call the parent `Card` constructor to wrap the buttons inside a row layout
         super().__init__(
             content=ft.Row(
-                [self.open_dialog_btn, self.start_btn, self.stop_btn, self.restart_btn],
+                [
+                    self.open_dialog_btn,
+                    self.start_btn,
+                    self.stop_btn,
+                    self.restart_btn,
+                    self.cancel_btn,
+                ],
                 alignment=ft.MainAxisAlignment.CENTER,  # Center alignment
                 spacing=10,  # Space between buttons
             )
         )
 
-        settings = st.Settings()
-        find_field = settings.get(SettingsField.SERVER_START_SCRIPT.value)
-        if find_field:
+        self.check_click = False  # Проверка нажатия кнопки старт
+
+        # Доступность "Старт" зависит от скрипта запуска: подписываемся на
+        # изменения настройки вместо того, чтобы перечитывать её.
+        settings = st.get_settings()
+        self._set_start_script(settings.get(SettingsField.SERVER_START_SCRIPT.value))
+        settings.subscribe(
+            SettingsField.SERVER_START_SCRIPT.value, self._on_start_script_changed
+        )
+
+    def _set_start_script(self, script):
+        self.has_start_script = bool(script)
+        if self.has_start_script and not self.check_click:
             self.start_btn.icon_color = ft.Colors.GREEN_300
             self.start_btn.disabled = False
         else:
             self.start_btn.icon_color = ft.Colors.GREY_400
             self.start_btn.disabled = True
 
-        self.check_click = False  # Проверка нажатия кнопки старт
+    def _on_start_script_changed(self, script):
+        self._set_start_script(script)
+        if self.page:
+            self.update()
 
     def _on_start_click(self, on_start):
         def handler(e):
@@ -92,19 +121,25 @@ class ServerControlPanel(ft.Card):
 
         return handler
 
-    def update_state(self, status):
+    def update_state(self, status, job_running=False):
         """
         Updates the button states based on the server's running status.
 
+        The new state is only applied to the widgets; UIRenderer pushes it to
+        the page in one batched update together with the other panels.
+
         Args:
-            is_running (bool): True if the server is currently running, False otherwise.
+            status (ServerStatus): Current server status.
+            job_running (bool): True while a background stop/restart job runs.
         """
+        self.cancel_btn.visible = job_running
 
         if status == ServerStatus.OFFLINE:
             self.open_dialog_btn.icon_color = ft.Colors.BLUE_300
             self.open_dialog_btn.disabled = False
 
-            if not self.check_click:  # Если не нажимали старт
+            if not self.check_click and self.has_start_script:
+                # Если не нажимали старт и скрипт запуска выбран
                 self.start_btn.icon_color = ft.Colors.GREEN_300
                 self.start_btn.disabled = False
 
@@ -128,7 +163,7 @@ class ServerControlPanel(ft.Card):
             self.restart_btn.icon_color = ft.Colors.ORANGE_300
             self.restart_btn.disabled = False
 
-        elif status == ServerStatus.STARTING:
+        elif status in (ServerStatus.STARTING, ServerStatus.UNKNOWN):
             self.open_dialog_btn.icon_color = ft.Colors.GREY_400
             self.open_dialog_btn.disabled = True
 
@@ -192,4 +227,3 @@ class ServerControlPanel(ft.Card):
 
             self.restart_btn.icon_color = ft.Colors.GREY_400
             self.restart_btn.disabled = True
-        self.update()
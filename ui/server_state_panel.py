@@ -29,8 +29,16 @@ class ServerStatePanel(ft.Card):
             )
         )
 
-    def update_state(self, status, ip: str | None):
-        match status:
+    def update_state(self, view):
+        """
+        Применяет StatePanelView к виджетам. Отправку в UI выполняет
+        UIRenderer одним page.update().
+        """
+        match view.status:
+            case ServerStatus.UNKNOWN:
+                self.progress_ring.value = None
+                self.progress_ring.visible = True
+                self.state_server.value = ServerStatus.UNKNOWN.value
             case ServerStatus.OFFLINE:
                 self.progress_ring.value = 0
                 self.progress_ring.visible = False
@@ -38,11 +46,21 @@ class ServerStatePanel(ft.Card):
             case ServerStatus.ONLINE:
                 self.progress_ring.value = 100
                 self.progress_ring.visible = True
-                self.state_server.value = ip
+                self.state_server.value = view.ip
+                if view.players:
+                    online, max_players = view.players
+                    self.state_server.value = (
+                        f"{view.ip}  ·  {online}/{max_players}  ·  {view.latency_ms} мс"
+                    )
+                if view.tps is not None:
+                    self.state_server.value += f"  ·  {view.tps:.1f} TPS"
             case ServerStatus.STARTING:
                 self.progress_ring.value = None
                 self.progress_ring.visible = True
                 self.state_server.value = ServerStatus.STARTING.value
+                if view.start_progress is not None:
+                    self.progress_ring.value = view.start_progress / 100
+                    self.state_server.value += f" {view.start_progress}%"
             case ServerStatus.STOPING:
                 self.progress_ring.value = None
                 self.progress_ring.visible = True
@@ -63,4 +81,5 @@ class ServerStatePanel(ft.Card):
             #     self.progress_ring.color = ft.Colors.RED
             #     self.state_server.value = ""
             #
-        self.update()
+        if view.job_message:
+            self.state_server.value = view.job_message
@@ -1,12 +1,13 @@
 import flet as ft
-from server_status import ServerStatus
 
 
 class ServerTimePanel(ft.Card):
-    def __init__(self, page: ft.Page, mcommands, server_manager):
+    def __init__(self, page: ft.Page, mcommands, server_manager, scheduler=None):
         self.page = page
         self.mcommands = mcommands
         self.server_manager = server_manager
+        # PollScheduler: после команды панели перерисовываются сразу
+        self.scheduler = scheduler
 
         self.time_picker = ft.TimePicker(
             on_change=self.handle_change,
@@ -54,6 +55,7 @@ class ServerTimePanel(ft.Card):
             self.page.snack_bar.open = True
             self.page.update()
             self.mcommands.set_server_time(selected_time.hour, selected_time.minute)
+            self._wake()
 
     def handle_dismissal(self, e):
         pass
@@ -61,13 +63,21 @@ class ServerTimePanel(ft.Card):
     def toggle_daylight_cycle(self, e):
         value = "False" if e.control.value == True else "True"
         self.mcommands.do_day_light_cycle(value)
+        self._wake()
+
+    def _wake(self):
+        if self.scheduler is not None:
+            self.scheduler.wake()
 
     ## FIXME: Не отображается время и невалидный статус switch, если сервер запустился после приложения.
-    def update_state(self, status):
-        if status == ServerStatus.ONLINE:
-            self.switch.value = not self.mcommands.get_do_day_light_cycle()
-            self.elevated_time.text = self.mcommands.get_server_time()
+    def update_state(self, view):
+        """
+        Применяет TimePanelView к виджетам. Отправку в UI выполняет
+        UIRenderer одним page.update().
+        """
+        if view.visible:
+            self.switch.value = not view.daylight_cycle
+            self.elevated_time.text = view.clock
             self.content.visible = True
         else:
             self.content.visible = False
-        self.update()
@@ -0,0 +1,334 @@
+import time
+from dataclasses import dataclass
+
+from server_status import ServerStatus
+from tick_trace import TRACER
+
+# Задержка округляется, чтобы джиттер в пару миллисекунд не вызывал
+# перерисовку каждый тик.
+LATENCY_STEP_MS = 10
+
+
+def _round_latency(latency_ms: float) -> int:
+    return int(round(latency_ms / LATENCY_STEP_MS) * LATENCY_STEP_MS)
+
+
+@dataclass(frozen=True)
+class StatePanelView:
+    status: ServerStatus
+    ip: str | None
+    players: tuple[int, int] | None
+    latency_ms: int | None
+    start_progress: int | None = None
+    job_message: str | None = None
+    tps: float | None = None
+
+
+@dataclass(frozen=True)
+class TimePanelView:
+    visible: bool
+    clock: str | None
+    daylight_cycle: bool | None
+
+
+@dataclass(frozen=True)
+class FleetRowView:
+    name: str
+    status: ServerStatus
+    players: tuple[int, int] | None
+    latency_ms: int | None
+
+    @classmethod
+    def build(cls, name, status, server_info=None) -> "FleetRowView":
+        if not server_info:
+            return cls(name, status, None, None)
+        return cls(
+            name,
+            status,
+            (server_info.players_online, server_info.players_max),
+            _round_latency(server_info.latency_ms),
+        )
+
+
+@dataclass(frozen=True)
+class ResourcePanelView:
+    cpu_percent: int
+    rss_mb: int
+    threads: int
+    open_fds: int
+    cpu_history: tuple[int, ...]
+
+    # Точек на графике CPU; каждая - максимум своего отрезка истории
+    CHART_POINTS = 60
+
+    @classmethod
+    def build(cls, sampler) -> "ResourcePanelView | None":
+        sample = sampler.latest() if sampler else None
+        if sample is None:
+            return None
+        history = sampler.downsample("cpu_percent", cls.CHART_POINTS)
+        return cls(
+            cpu_percent=round(sample.cpu_percent),
+            rss_mb=sample.rss // (1024 * 1024),
+            threads=sample.threads,
+            open_fds=sample.open_fds,
+            cpu_history=tuple(round(high) for _, high in history),
+        )
+
+
+@dataclass(frozen=True)
+class PlayersPanelView:
+    players: tuple[str, ...]
+    players_max: int
+
+    @classmethod
+    def build(cls, roster) -> "PlayersPanelView":
+        return cls(roster.players(), roster.players_max)
+
+
+@dataclass(frozen=True)
+class ScheduleRowView:
+    task_id: str
+    server: str
+    action: str
+    next_run: str | None
+
+    @classmethod
+    def build_all(cls, scheduler, default_server="") -> tuple["ScheduleRowView", ...]:
+        if scheduler is None:
+            return ()
+        return tuple(
+            cls(
+                task.id,
+                task.server or default_server,
+                task.describe(),
+                time.strftime("%d.%m %H:%M", time.localtime(when)) if when else None,
+            )
+            for task, when in scheduler.tasks()
+        )
+
+
+@dataclass(frozen=True)
+class BackupPanelView:
+    running: bool
+    fraction: float | None
+    text: str
+
+    @classmethod
+    def build(cls, progress) -> "BackupPanelView":
+        if progress is None:
+            return cls(False, None, "Резервных копий за сеанс не было")
+        if progress.running:
+            # Сотых долей хватает для полосы, чаще перерисовывать незачем
+            fraction = progress.fraction
+            return cls(
+                True,
+                round(fraction, 2) if fraction is not None else None,
+                f"{progress.stage.value}: {progress.files_done}/"
+                f"{progress.files_total} файлов · новых объектов "
+                f"{progress.new_objects}",
+            )
+        if progress.message:
+            return cls(False, None, f"Ошибка: {progress.message}")
+        written_mb = progress.bytes_written / (1024 * 1024)
+        done = f"Копия {progress.snapshot} готова" if progress.snapshot else "Готово"
+        return cls(
+            False,
+            None,
+            f"{done}: новых объектов {progress.new_objects}, "
+            f"{written_mb:.1f} МБ за {int(progress.elapsed)} с",
+        )
+
+
+_DIMENSION_NAMES = {
+    "overworld": "Обычный мир",
+    "the_nether": "Незер",
+    "the_end": "Энд",
+}
+
+
+def _format_size(size: int) -> str:
+    if size >= 1024**3:
+        return f"{size / 1024**3:.1f} ГБ"
+    return f"{size / 1024**2:.0f} МБ"
+
+
+@dataclass(frozen=True)
+class WorldRowView:
+    dimension: str
+    regions: int
+    chunks: int
+    size: str
+    stale_chunks: int
+    last_saved: str | None
+
+    @classmethod
+    def build_all(cls, summary) -> tuple["WorldRowView", ...]:
+        return tuple(
+            cls(
+                _DIMENSION_NAMES.get(s.dimension, s.dimension),
+                s.regions,
+                s.chunks,
+                _format_size(s.size),
+                s.stale_chunks,
+                time.strftime("%d.%m.%Y", time.localtime(s.newest))
+                if s.newest
+                else None,
+            )
+            for s in summary or ()
+        )
+
+
+@dataclass(frozen=True)
+class UIState:
+    """
+    То, что реально отображается на экране, в виде сравнимого значения.
+
+    Строится из статуса сервера, ответа Server List Ping и снимка мира.
+    Два одинаковых UIState означают, что отправлять в Flet нечего.
+    """
+
+    status: ServerStatus
+    state_panel: StatePanelView
+    time_panel: TimePanelView
+    job_running: bool = False
+    fleet: tuple[FleetRowView, ...] = ()
+    resources: ResourcePanelView | None = None
+    roster: PlayersPanelView | None = None
+    schedule: tuple[ScheduleRowView, ...] = ()
+    backup: BackupPanelView | None = None
+    world: tuple[WorldRowView, ...] = ()
+
+    @classmethod
+    def build(
+        cls,
+        status,
+        ip,
+        server_info=None,
+        snapshot=None,
+        start_progress=None,
+        job=None,
+        fleet=(),
+        resources=None,
+        tps=None,
+        roster=None,
+        schedule=(),
+        backup=None,
+        world=(),
+    ) -> "UIState":
+        players = latency = job_message = None
+        if server_info:
+            players = (server_info.players_online, server_info.players_max)
+            latency = _round_latency(server_info.latency_ms)
+        job_running = bool(job and job.running)
+        if job_running:
+            job_message = f"{job.name}: {job.stage.value} · {int(job.elapsed)} с"
+        online = status == ServerStatus.ONLINE and snapshot is not None
+        # Десятые доли достаточно, иначе EWMA перерисовывала бы панель каждый тик
+        tps_value = round(tps.tps, 1) if online and tps else None
+        return cls(
+            status=status,
+            job_running=job_running,
+            fleet=tuple(fleet),
+            resources=resources,
+            roster=roster if online else None,
+            schedule=tuple(schedule),
+            backup=backup,
+            world=tuple(world),
+            state_panel=StatePanelView(
+                status,
+                ip,
+                players,
+                latency,
+                start_progress,
+                job_message,
+                tps_value,
+            ),
+            time_panel=TimePanelView(
+                visible=online,
+                clock=snapshot.time if online else None,
+                daylight_cycle=snapshot.daylight_cycle if online else None,
+            ),
+        )
+
+
+class UIRenderer:
+    """
+    Дифференциальная отрисовка панелей.
+
+    Сравнивает новый UIState с последним отрисованным, применяет к панелям
+    только изменившиеся части и отправляет одно пакетное page.update().
+    Если ничего не изменилось, трафика по websocket нет вовсе.
+    """
+
+    def __init__(
+        self,
+        page,
+        control_panel,
+        state_panel,
+        time_panel,
+        fleet_panel=None,
+        resource_panel=None,
+        players_panel=None,
+        schedule_panel=None,
+        backup_panel=None,
+        world_panel=None,
+    ):
+        self.page = page
+        self.control_panel = control_panel
+        self.state_panel = state_panel
+        self.time_panel = time_panel
+        self.fleet_panel = fleet_panel
+        self.resource_panel = resource_panel
+        self.players_panel = players_panel
+        self.schedule_panel = schedule_panel
+        self.backup_panel = backup_panel
+        self.world_panel = world_panel
+        self._last = None
+
+    def invalidate(self):
+        """Следующий render() перерисует всё"""
+        self._last = None
+
+    def render(self, state: UIState) -> bool:
+        """
+        Возвращает True, если в UI что-то было отправлено.
+        """
+        last = self._last
+        if state == last:
+            return False
+
+        with TRACER.span("update panels"):
+            self._apply(state, last)
+        self._last = state
+        with TRACER.span("page.update"):
+            self.page.update()
+        return True
+
+    def _apply(self, state: UIState, last: UIState | None):
+        if (
+            last is None
+            or state.status != last.status
+            or state.job_running != last.job_running
+        ):
+            self.control_panel.update_state(state.status, state.job_running)
+        if last is None or state.state_panel != last.state_panel:
+            self.state_panel.update_state(state.state_panel)
+        if last is None or state.time_panel != last.time_panel:
+            self.time_panel.update_state(state.time_panel)
+        if self.fleet_panel and (last is None or state.fleet != last.fleet):
+            self.fleet_panel.update_state(state.fleet)
+        if self.resource_panel and (
+            last is None or state.resources != last.resources
+        ):
+            self.resource_panel.update_state(state.resources)
+        if self.players_panel and (last is None or state.roster != last.roster):
+            self.players_panel.update_state(state.roster)
+        if self.schedule_panel and (
+            last is None or state.schedule != last.schedule
+        ):
+            self.schedule_panel.update_state(state.schedule)
+        if self.backup_panel and (last is None or state.backup != last.backup):
+            self.backup_panel.update_state(state.backup)
+        if self.world_panel and (last is None or state.world != last.world):
+            self.world_panel.update_state(state.world)
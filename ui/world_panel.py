@@ -0,0 +1,42 @@
+import flet as ft
+
+
+class WorldPanel(ft.Card):
+    """
+    Сводка мира по измерениям: регионы, чанки, размер на диске и чанки,
+    которые давно не сохранялись (кандидаты на удаление перед копией).
+    """
+
+    def __init__(self):
+        self.title = ft.Text(value="Мир", size=14, weight=ft.FontWeight.BOLD)
+        self.rows = ft.Column(spacing=4)
+        super().__init__(
+            content=ft.Container(
+                content=ft.Column([self.title, self.rows], spacing=6),
+                padding=ft.Padding(top=8, bottom=8, left=20, right=20),
+            ),
+            visible=False,
+        )
+
+    def _row(self, view):
+        return ft.Row(
+            [
+                ft.Text(view.dimension, weight=ft.FontWeight.BOLD, width=140),
+                ft.Text(f"регионов {view.regions}", width=120),
+                ft.Text(f"чанков {view.chunks}", width=130),
+                ft.Text(view.size, width=80),
+                ft.Text(f"давно не сохранялись {view.stale_chunks}", width=220),
+                ft.Text(
+                    f"последнее сохранение {view.last_saved or '—'}",
+                    color=ft.Colors.GREY_500,
+                ),
+            ],
+            spacing=10,
+        )
+
+    def update_state(self, rows):
+        """
+        Применяет кортеж WorldRowView. Отправку в UI выполняет UIRenderer.
+        """
+        self.visible = bool(rows)
+        self.rows.controls = [self._row(view) for view in rows]
@@ -0,0 +1,536 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import stat
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import datetime
+from enum import Enum
+
+from rcon_dispatcher import Priority
+from server_jobs import JobState
+from server_status import ServerStatus
+from settings_field import SettingsField
+from world_files import build_region, is_region_file, split_region, world_directories
+
+logger = logging.getLogger("srvop")
+
+# Пакет новых объектов, отправляемый одному процессу сжатия
+BATCH_BYTES = 8 * 1024 * 1024
+# Прогресс передаётся в UI не чаще, чем раз в столько секунд
+PROGRESS_INTERVAL = 1.0
+# Таймаут ответа на `save-all flush`: большой мир сохраняется минутами,
+# а обычный таймаут сокета RCON - секунды
+FLUSH_TIMEOUT = 600.0
+# Объекты сжимаются, только если это экономит хотя бы столько (данные
+# чанков уже сжаты игрой, повторное сжатие их почти не уменьшает)
+MIN_SAVING = 0.05
+
+_RAW = b"\0"
+_ZLIB = b"\1"
+
+
+def object_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _store_objects(root: str, items: list[tuple[str, bytes]]) -> int:
+    """
+    Сжатие и запись объектов в процессе пула; возвращает записанные байты.
+    """
+    written = 0
+    for digest, data in items:
+        path = os.path.join(root, digest[:2], digest[2:])
+        if os.path.exists(path):
+            continue
+        packed = zlib.compress(data, 6)
+        if len(packed) <= len(data) * (1 - MIN_SAVING):
+            blob = _ZLIB + packed
+        else:
+            blob = _RAW + data
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+        written += len(blob)
+    return written
+
+
+class BackupStage(Enum):
+    SAVE_OFF = "Отключение автосохранения"
+    COPY = "Копирование мира"
+    SAVE_ON = "Включение автосохранения"
+    RESTORE = "Восстановление"
+    FINISHED = "Готово"
+
+
+@dataclass(frozen=True)
+class BackupProgress:
+    stage: BackupStage
+    state: JobState
+    files_done: int = 0
+    files_total: int = 0
+    new_objects: int = 0
+    reused_objects: int = 0
+    bytes_written: int = 0
+    elapsed: float = 0.0
+    message: str = ""
+    snapshot: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.state == JobState.RUNNING
+
+    @property
+    def fraction(self) -> float | None:
+        if not self.files_total:
+            return None
+        return self.files_done / self.files_total
+
+
+@dataclass(frozen=True)
+class SnapshotInfo:
+    id: str
+    created: float
+    files: int
+    size: int
+
+
+class BackupStore:
+    """
+    Хранилище резервных копий с дедупликацией.
+
+    objects/ - содержимое, адресуемое хешем: отдельные чанки регионов и
+    остальные файлы мира целиком. snapshots/<id>.json - манифест копии:
+    для каждого файла его mtime, размер и хеш содержимого, для региона -
+    список (индекс, отметка времени, хеш) его чанков. Одинаковые чанки и
+    файлы разных копий хранятся один раз.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.snapshot_dir = os.path.join(root, "snapshots")
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    def has(self, digest: str) -> bool:
+        return os.path.exists(self.object_path(digest))
+
+    def read_object(self, digest: str) -> bytes:
+        with open(self.object_path(digest), "rb") as f:
+            blob = f.read()
+        if blob[:1] == _ZLIB:
+            return zlib.decompress(blob[1:])
+        return blob[1:]
+
+    def snapshots(self) -> list[SnapshotInfo]:
+        """Копии от старых к новым"""
+        try:
+            names = os.listdir(self.snapshot_dir)
+        except FileNotFoundError:
+            return []
+        infos = []
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            manifest = self.load(name[:-5])
+            infos.append(
+                SnapshotInfo(
+                    manifest["id"],
+                    manifest["created"],
+                    len(manifest["files"]),
+                    sum(f["size"] for f in manifest["files"].values()),
+                )
+            )
+        return sorted(infos, key=lambda info: info.created)
+
+    def load(self, snapshot_id: str) -> dict:
+        path = os.path.join(self.snapshot_dir, f"{snapshot_id}.json")
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def latest(self) -> dict | None:
+        snapshots = self.snapshots()
+        return self.load(snapshots[-1].id) if snapshots else None
+
+    def find(self, at: float) -> SnapshotInfo:
+        """Последняя копия, сделанная не позже момента at"""
+        candidates = [s for s in self.snapshots() if s.created <= at]
+        if not candidates:
+            raise LookupError(
+                f"нет резервной копии на {datetime.fromtimestamp(at):%d.%m.%Y %H:%M}"
+            )
+        return candidates[-1]
+
+    def save(self, manifest: dict):
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        path = os.path.join(self.snapshot_dir, f"{manifest['id']}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def new_id(self, now: float) -> str:
+        base = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        snapshot_id, n = base, 1
+        while os.path.exists(os.path.join(self.snapshot_dir, f"{snapshot_id}.json")):
+            snapshot_id, n = f"{base}-{n}", n + 1
+        return snapshot_id
+
+    def prune(self, keep: int) -> int:
+        """
+        Оставляет keep последних копий и удаляет объекты, на которые больше
+        никто не ссылается. Возвращает число удалённых объектов.
+        """
+        snapshots = self.snapshots()
+        for info in snapshots[: max(len(snapshots) - keep, 0)]:
+            os.remove(os.path.join(self.snapshot_dir, f"{info.id}.json"))
+        referenced = set()
+        for info in snapshots[-keep:] if keep else ():
+            for entry in self.load(info.id)["files"].values():
+                referenced.update(_entry_objects(entry))
+        removed = 0
+        for prefix in os.listdir(self.objects) if os.path.isdir(self.objects) else ():
+            directory = os.path.join(self.objects, prefix)
+            for name in os.listdir(directory):
+                if prefix + name not in referenced:
+                    os.remove(os.path.join(directory, name))
+                    removed += 1
+        return removed
+
+
+def _entry_objects(entry: dict):
+    if "blob" in entry:
+        yield entry["blob"]
+    for _, _, digest in entry.get("chunks", ()):
+        yield digest
+
+
+def _walk(server_dir: str, top_dirs) -> tuple[list[str], list[str]]:
+    """Файлы и папки миров относительно server_dir (разделитель - /)"""
+    files, dirs = [], []
+    for top in top_dirs:
+        for root, subdirs, names in os.walk(os.path.join(server_dir, top)):
+            rel = os.path.relpath(root, server_dir).replace(os.sep, "/")
+            dirs.append(rel)
+            subdirs.sort()
+            # session.lock держит запущенный сервер; в копии он не нужен
+            files.extend(f"{rel}/{n}" for n in sorted(names) if n != "session.lock")
+    return files, dirs
+
+
+def create_backup(
+    store: BackupStore,
+    server_dir: str,
+    top_dirs=None,
+    executor=None,
+    on_progress=None,
+    clock=time.time,
+) -> SnapshotInfo:
+    """
+    Инкрементальная копия папок мира server_dir.
+
+    Файлы, у которых mtime и размер совпадают с прошлой копией, не
+    читаются вовсе. Изменившиеся регионы разбираются на чанки, и в
+    хранилище попадают только чанки с новым хешем; их сжатие и запись
+    выполняются в executor (пул процессов) пакетами, пока основной поток
+    читает и хеширует следующие файлы. Манифест записывается последним,
+    когда все объекты уже на диске.
+    """
+    started = time.monotonic()
+    top_dirs = world_directories(server_dir) if top_dirs is None else top_dirs
+    previous = store.latest()
+    previous_files = previous["files"] if previous else {}
+    known = set()
+    for entry in previous_files.values():
+        known.update(_entry_objects(entry))
+
+    files, dirs = _walk(server_dir, top_dirs)
+    progress = BackupProgress(BackupStage.COPY, JobState.RUNNING, 0, len(files))
+    pending, batch, batch_size = [], [], 0
+    reported_at = 0.0
+
+    def report(force=False, **changes):
+        nonlocal progress, reported_at
+        now = time.monotonic()
+        progress = replace(progress, elapsed=now - started, **changes)
+        if on_progress and (force or now - reported_at >= PROGRESS_INTERVAL):
+            reported_at = now
+            on_progress(progress)
+
+    def flush():
+        nonlocal batch, batch_size
+        if not batch:
+            return
+        if executor is None:
+            written = _store_objects(store.objects, batch)
+            report(bytes_written=progress.bytes_written + written)
+        else:
+            pending.append(executor.submit(_store_objects, store.objects, batch))
+        batch, batch_size = [], 0
+
+    def add_object(data: bytes) -> str:
+        nonlocal batch_size
+        digest = object_hash(data)
+        if digest in known or store.has(digest):
+            report(reused_objects=progress.reused_objects + 1)
+        else:
+            batch.append((digest, data))
+            batch_size += len(data)
+            report(new_objects=progress.new_objects + 1)
+            if batch_size >= BATCH_BYTES:
+                flush()
+        known.add(digest)
+        return digest
+
+    manifest_files = {}
+    for n, rel in enumerate(files, 1):
+        path = os.path.join(server_dir, *rel.split("/"))
+        try:
+            meta = os.stat(path)
+            old = previous_files.get(rel)
+            if old and (old["mtime"], old["size"]) == (meta.st_mtime_ns, meta.st_size):
+                manifest_files[rel] = old
+                report(files_done=n)
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            continue  # Файл удалён игрой во время обхода
+        entry = {"mtime": meta.st_mtime_ns, "size": len(data), "mode": meta.st_mode}
+        chunks = split_region(data) if is_region_file(rel) else None
+        if chunks is not None:
+            entry["chunks"] = [
+                (index, timestamp, add_object(payload))
+                for index, timestamp, payload in chunks
+            ]
+        else:
+            entry["blob"] = add_object(data)
+        manifest_files[rel] = entry
+        report(files_done=n)
+
+    flush()
+    for future in pending:
+        report(bytes_written=progress.bytes_written + future.result())
+
+    created = clock()
+    manifest = {
+        "id": store.new_id(created),
+        "created": created,
+        "server_dir": os.path.abspath(server_dir),
+        "dirs": dirs,
+        "files": manifest_files,
+    }
+    store.save(manifest)
+    report(force=True, snapshot=manifest["id"])
+    return SnapshotInfo(
+        manifest["id"],
+        created,
+        len(manifest_files),
+        sum(f["size"] for f in manifest_files.values()),
+    )
+
+
+def restore_backup(
+    store: BackupStore, snapshot_id: str, server_dir: str, on_progress=None
+) -> list[str]:
+    """
+    Восстановление копии в server_dir. Каждая папка мира собирается
+    рядом во временной папке и только потом подменяет текущую; текущая
+    сохраняется как <папка>.before-<id>. Возвращает пути сохранённых папок.
+    """
+    started = time.monotonic()
+    manifest = store.load(snapshot_id)
+    files = manifest["files"]
+    tops = sorted({rel.split("/")[0] for rel in manifest["dirs"]})
+    staging = {top: os.path.join(server_dir, f".{top}.restore") for top in tops}
+    for path in staging.values():
+        shutil.rmtree(path, ignore_errors=True)
+
+    def target(rel: str) -> str:
+        top, _, rest = rel.partition("/")
+        return os.path.join(staging[top], *rest.split("/")) if rest else staging[top]
+
+    for rel in manifest["dirs"]:
+        os.makedirs(target(rel), exist_ok=True)
+    for n, (rel, entry) in enumerate(files.items(), 1):
+        if "chunks" in entry:
+            data = build_region(
+                (index, timestamp, store.read_object(digest))
+                for index, timestamp, digest in entry["chunks"]
+            )
+        else:
+            data = store.read_object(entry["blob"])
+        path = target(rel)
+        with open(path, "wb") as f:
+            f.write(data)
+        os.chmod(path, stat.S_IMODE(entry.get("mode", 0o644)))
+        os.utime(path, ns=(entry["mtime"], entry["mtime"]))
+        if on_progress:
+            on_progress(
+                BackupProgress(
+                    BackupStage.RESTORE,
+                    JobState.RUNNING,
+                    n,
+                    len(files),
+                    elapsed=time.monotonic() - started,
+                    snapshot=snapshot_id,
+                )
+            )
+
+    kept = []
+    for top, path in staging.items():
+        current = os.path.join(server_dir, top)
+        if os.path.exists(current):
+            aside = f"{current}.before-{snapshot_id}"
+            shutil.rmtree(aside, ignore_errors=True)
+            os.rename(current, aside)
+            kept.append(aside)
+        os.rename(path, current)
+    return kept
+
+
+class WorldBackup:
+    """
+    Резервные копии мира одного сервера в фоне.
+
+    Пока сервер работает, копия делается между `save-off` и `save-on`
+    после `save-all flush`, чтобы игра не писала регионы во время чтения;
+    `save-on` отправляется в любом случае. Восстановление возможно только
+    на остановленном сервере. Прогресс доступен через progress; on_change()
+    вызывается при каждом его обновлении (перерисовка без опроса серверов).
+    """
+
+    def __init__(self, manager, mcommands, settings, workers=None, on_change=None):
+        self.manager = manager
+        self.mcommands = mcommands
+        self.settings = settings
+        self.workers = workers
+        self.on_change = on_change
+        self._progress = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def progress(self) -> BackupProgress | None:
+        return self._progress
+
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def server_dir(self) -> str:
+        server_dir = self.manager.server_directory()
+        if not server_dir:
+            raise ValueError("не указан скрипт запуска сервера")
+        return server_dir
+
+    def store(self) -> BackupStore:
+        root = self.settings.get(SettingsField.BACKUP_DIR.value)
+        return BackupStore(root or os.path.join(self.server_dir(), "backups"))
+
+    def snapshots(self) -> list[SnapshotInfo]:
+        return self.store().snapshots()
+
+    def start(self) -> bool:
+        """Запуск копии в фоне; False, если копия уже идёт"""
+        return self._launch(self._backup)
+
+    def restore(self, at: float) -> SnapshotInfo:
+        """
+        Восстановление последней копии не позже момента at (в фоне).
+        """
+        if self.manager.get_status() != ServerStatus.OFFLINE:
+            raise RuntimeError("остановите сервер перед восстановлением")
+        info = self.store().find(at)
+        if not self._launch(lambda: self._restore(info.id)):
+            raise RuntimeError("резервное копирование уже выполняется")
+        return info
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _launch(self, target) -> bool:
+        with self._lock:
+            if self.running():
+                return False
+            self._progress = BackupProgress(BackupStage.SAVE_OFF, JobState.RUNNING)
+            self._thread = threading.Thread(target=self._guarded(target), daemon=True)
+            self._thread.start()
+            return True
+
+    def _guarded(self, target):
+        def run():
+            try:
+                target()
+            except Exception as e:
+                logger.exception("Ошибка резервного копирования")
+                failed = replace(self._progress, state=JobState.FAILED, message=str(e))
+                self._report(failed)
+                self.mcommands.alert_window.set_error(f"резервная копия: {e}")
+
+        return run
+
+    def _report(self, progress: BackupProgress):
+        self._progress = progress
+        if self.on_change:
+            self.on_change()
+
+    def _command(self, command: str, read_timeout: float | None = None):
+        reply = self.mcommands.send_command(
+            command, priority=Priority.USER, read_timeout=read_timeout
+        )
+        if not reply:
+            raise RuntimeError(f"сервер не ответил на {command}")
+
+    def _backup(self):
+        store, server_dir = self.store(), self.server_dir()
+        online = self.manager.get_status() == ServerStatus.ONLINE
+        try:
+            if online:
+                # save-on ниже отправляется, даже если ответ на save-off потерян
+                self._command("save-off")
+                self._command("save-all flush", read_timeout=FLUSH_TIMEOUT)
+            # spawn: fork из многопоточного процесса (flet, RCON) небезопасен
+            with ProcessPoolExecutor(
+                max_workers=self.workers or os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                info = create_backup(
+                    store, server_dir, executor=pool, on_progress=self._report
+                )
+        finally:
+            if online:
+                self._report(replace(self._progress, stage=BackupStage.SAVE_ON))
+                self.mcommands.send_command("save-on")
+        keep = self.settings.get(SettingsField.BACKUP_KEEP.value)
+        if keep:
+            store.prune(keep)
+        self._report(
+            replace(self._progress, stage=BackupStage.FINISHED, state=JobState.DONE)
+        )
+        logger.info(
+            "Резервная копия %s: %d файлов, новых объектов %d (%d байт)",
+            info.id,
+            info.files,
+            self._progress.new_objects,
+            self._progress.bytes_written,
+        )
+
+    def _restore(self, snapshot_id: str):
+        self._report(BackupProgress(BackupStage.RESTORE, JobState.RUNNING))
+        restore_backup(self.store(), snapshot_id, self.server_dir(), self._report)
+        self._report(
+            replace(self._progress, stage=BackupStage.FINISHED, state=JobState.DONE)
+        )
@@ -0,0 +1,146 @@
+import os
+import struct
+
+# Формат региона Anvil (.mca): заголовок из 1024 записей о положении чанков
+# (3 байта - смещение в секторах, 1 байт - число секторов) и 1024 отметок
+# времени; данные чанка - 4 байта длины, байт сжатия и сжатые NBT.
+SECTOR = 4096
+CHUNKS_PER_REGION = 1024
+HEADER_SIZE = 2 * SECTOR
+
+# Папки измерений внутри папки мира (ванильный сервер) и рядом с ней
+# (Bukkit/Paper: world_nether, world_the_end)
+DIMENSIONS = {
+    "overworld": ("", ""),
+    "the_nether": ("DIM-1", "_nether"),
+    "the_end": ("DIM1", "_the_end"),
+}
+
+
+def read_properties(path) -> dict[str, str]:
+    """server.properties как словарь; пустой, если файла нет"""
+    properties = {}
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith(("#", "!")):
+                    continue
+                key, _, value = line.partition("=")
+                properties[key.strip()] = value.strip()
+    except FileNotFoundError:
+        pass
+    return properties
+
+
+def level_name(server_dir) -> str:
+    name = read_properties(os.path.join(server_dir, "server.properties")).get(
+        "level-name"
+    )
+    return name or "world"
+
+
+def world_directories(server_dir) -> list[str]:
+    """
+    Папки мира сервера относительно server_dir: основная (level-name из
+    server.properties) и, если есть, папки измерений Bukkit рядом с ней.
+    """
+    name = level_name(server_dir)
+    dirs = [name]
+    for _, suffix in list(DIMENSIONS.values())[1:]:
+        if os.path.isdir(os.path.join(server_dir, name + suffix)):
+            dirs.append(name + suffix)
+    return [d for d in dirs if os.path.isdir(os.path.join(server_dir, d))]
+
+
+def dimension_region_dirs(server_dir) -> dict[str, str]:
+    """
+    Папка region каждого найденного измерения: {измерение: путь}.
+    Измерения датапаков (dimensions/<пространство>/<имя>) называются
+    "<пространство>:<имя>".
+    """
+    name = level_name(server_dir)
+    found = {}
+    for dimension, (inner, suffix) in DIMENSIONS.items():
+        candidates = [os.path.join(server_dir, name, inner, "region")]
+        if suffix:
+            candidates.append(os.path.join(server_dir, name + suffix, inner, "region"))
+        for path in candidates:
+            if os.path.isdir(path):
+                found[dimension] = os.path.normpath(path)
+                break
+    custom = os.path.join(server_dir, name, "dimensions")
+    for namespace in sorted(os.listdir(custom)) if os.path.isdir(custom) else ():
+        for dim in sorted(os.listdir(os.path.join(custom, namespace))):
+            path = os.path.join(custom, namespace, dim, "region")
+            if os.path.isdir(path):
+                found.setdefault(f"{namespace}:{dim}", os.path.normpath(path))
+    return found
+
+
+def region_coords(filename) -> tuple[int, int] | None:
+    """Координаты региона из имени r.<x>.<z>.mca"""
+    parts = os.path.basename(filename).split(".")
+    if len(parts) != 4 or parts[0] != "r" or parts[3] != "mca":
+        return None
+    try:
+        return int(parts[1]), int(parts[2])
+    except ValueError:
+        return None
+
+
+def is_region_file(path) -> bool:
+    return path.endswith(".mca")
+
+
+def parse_region_header(header: bytes) -> list[tuple[int, int, int, int]]:
+    """
+    Записи заголовка о существующих чанках: (индекс, смещение в секторах,
+    число секторов, отметка времени).
+    """
+    locations = struct.unpack_from(">1024I", header)
+    timestamps = struct.unpack_from(">1024I", header, SECTOR)
+    return [
+        (index, location >> 8, location & 0xFF, timestamps[index])
+        for index, location in enumerate(locations)
+        if location
+    ]
+
+
+def split_region(data: bytes) -> list[tuple[int, int, bytes]] | None:
+    """
+    Чанки файла региона: (индекс, отметка времени, данные с заголовком
+    длины). None, если файл повреждён или не похож на регион - такой файл
+    сохраняется целиком.
+    """
+    if len(data) < HEADER_SIZE:
+        return None
+    chunks = []
+    for index, offset, sectors, timestamp in parse_region_header(data):
+        start = offset * SECTOR
+        if offset < 2 or start + 5 > len(data):
+            return None
+        (length,) = struct.unpack_from(">I", data, start)
+        if not 1 <= length <= sectors * SECTOR - 4 or start + 4 + length > len(data):
+            return None
+        chunks.append((index, timestamp, data[start : start + 4 + length]))
+    return chunks
+
+
+def build_region(chunks) -> bytes:
+    """
+    Файл региона из чанков (индекс, отметка времени, данные). Чанки
+    укладываются подряд без пропусков, поэтому результат может быть короче
+    исходного файла, но читается игрой так же.
+    """
+    locations = [0] * CHUNKS_PER_REGION
+    timestamps = [0] * CHUNKS_PER_REGION
+    body = bytearray()
+    for index, timestamp, payload in chunks:
+        sectors = -(-len(payload) // SECTOR)
+        locations[index] = ((HEADER_SIZE + len(body)) // SECTOR) << 8 | sectors
+        timestamps[index] = timestamp
+        body += payload
+        body += bytes(sectors * SECTOR - len(payload))
+    header = struct.pack(">1024I", *locations) + struct.pack(">1024I", *timestamps)
+    return header + bytes(body)
@@ -0,0 +1,336 @@
+import asyncio
+import base64
+import bisect
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from array import array
+from itertools import compress
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from settings_field import SettingsField
+from world_files import (
+    HEADER_SIZE,
+    SECTOR,
+    dimension_region_dirs,
+    region_coords,
+)
+
+logger = logging.getLogger("srvop")
+
+CACHE_NAME = ".srvop-world-index.json"
+CACHE_FORMAT = 1
+# Меньше изменившихся файлов читаются в текущем процессе: запуск пула
+# дороже, чем несколько сотен заголовков
+POOL_THRESHOLD = 256
+# Заголовков на одно задание пула
+POOL_CHUNKSIZE = 64
+STALE_DAYS = 90
+
+
+@dataclass(frozen=True)
+class RegionStats:
+    """
+    Сводка одного файла региона по его заголовку. timestamps - времена
+    последнего сохранения существующих чанков по возрастанию (array("I")).
+    """
+
+    mtime_ns: int
+    size: int
+    sectors: int
+    timestamps: array
+
+    @property
+    def chunks(self) -> int:
+        return len(self.timestamps)
+
+    def count_older(self, moment: float) -> int:
+        """Чанков, не сохранявшихся с момента moment"""
+        return bisect.bisect_left(self.timestamps, moment)
+
+    def to_json(self) -> list:
+        encoded = base64.b64encode(self.timestamps.tobytes()).decode()
+        return [self.mtime_ns, self.size, self.sectors, encoded]
+
+    @classmethod
+    def from_json(cls, data: list) -> "RegionStats":
+        mtime_ns, size, sectors, timestamps = data
+        return cls(mtime_ns, size, sectors, array("I", base64.b64decode(timestamps)))
+
+
+def _big_endian(data) -> array:
+    values = array("I", data)
+    if sys.byteorder == "little":
+        values.byteswap()
+    return values
+
+
+def read_header(path: str):
+    """
+    Заголовок региона через mmap: читаются только первые 8 КиБ файла,
+    данные чанков не затрагиваются. (stat, положения, отметки времени,
+    байты заголовка); положения и отметки пусты у файла короче заголовка.
+    """
+    with open(path, "rb") as f:
+        meta = os.fstat(f.fileno())
+        if meta.st_size < HEADER_SIZE:
+            return meta, array("I"), array("I"), b""
+        with mmap.mmap(f.fileno(), HEADER_SIZE, access=mmap.ACCESS_READ) as header:
+            data = header[:]
+    return meta, _big_endian(data[:SECTOR]), _big_endian(data[SECTOR:]), data
+
+
+def scan_region(path: str) -> RegionStats | None:
+    """Сводка региона по заголовку; None, если файла уже нет"""
+    try:
+        meta, locations, timestamps, header = read_header(path)
+    except FileNotFoundError:
+        return None
+    # Всё считается встроенными функциями над массивами, без цикла Python
+    # по 1024 записям: заголовков в большом мире десятки тысяч. Младший
+    # байт каждой записи о положении - число секторов чанка.
+    return RegionStats(
+        meta.st_mtime_ns,
+        meta.st_size,
+        sum(header[3:SECTOR:4]),
+        array("I", sorted(compress(timestamps, locations))),
+    )
+
+
+@dataclass(frozen=True)
+class DimensionSummary:
+    dimension: str
+    regions: int
+    chunks: int
+    size: int
+    used: int
+    oldest: int | None
+    newest: int | None
+    stale_chunks: int
+
+
+class WorldIndex:
+    """
+    Статистика мира по заголовкам файлов регионов.
+
+    Мир находится по папке сервера (level-name из server.properties).
+    scan() читает заголовки только изменившихся файлов: сводки остальных
+    берутся из кэша, который проверяется по mtime и размеру файла и
+    хранится рядом с миром. Изменившихся файлов много (первый обход) -
+    заголовки читаются в пуле процессов.
+    """
+
+    def __init__(self, server_dir: str, cache_path=None, workers=None):
+        self.server_dir = server_dir
+        self.cache_path = cache_path or os.path.join(server_dir, CACHE_NAME)
+        self.workers = workers
+        self.dimensions = {}
+        self.last = None
+        self._regions = {}
+        self._dimension_of = {}
+        self._load_cache()
+
+    # ---- Кэш ----
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return  # Чужой или испорченный файл: индекс строится заново
+        if (data.get("format"), data.get("byteorder")) != (CACHE_FORMAT, sys.byteorder):
+            return
+        try:
+            self._regions = {
+                rel: RegionStats.from_json(entry)
+                for rel, entry in data["regions"].items()
+            }
+        except (KeyError, TypeError, ValueError):
+            self._regions = {}
+
+    def _save_cache(self):
+        data = {
+            "format": CACHE_FORMAT,
+            "byteorder": sys.byteorder,
+            "regions": {rel: s.to_json() for rel, s in self._regions.items()},
+        }
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self.cache_path)
+
+    # ---- Обход ----
+
+    def scan(self, stale_days=STALE_DAYS, now=None) -> list[DimensionSummary]:
+        """
+        Обновление индекса и сводка по измерениям; stale_chunks - чанки,
+        не сохранявшиеся дольше stale_days дней.
+        """
+        started = time.perf_counter()
+        self.dimensions = dimension_region_dirs(self.server_dir)
+        current, changed, where = {}, [], {}
+        for dimension, directory in self.dimensions.items():
+            try:
+                entries = list(os.scandir(directory))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if region_coords(entry.name) is None:
+                    continue
+                rel = os.path.relpath(entry.path, self.server_dir)
+                where[rel] = dimension
+                meta = entry.stat()
+                cached = self._regions.get(rel)
+                if cached and (cached.mtime_ns, cached.size) == (
+                    meta.st_mtime_ns,
+                    meta.st_size,
+                ):
+                    current[rel] = cached
+                else:
+                    changed.append(rel)
+
+        paths = [os.path.join(self.server_dir, rel) for rel in changed]
+        if len(paths) < POOL_THRESHOLD:
+            results = map(scan_region, paths)
+            self._store(current, changed, results)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                results = pool.map(scan_region, paths, chunksize=POOL_CHUNKSIZE)
+                self._store(current, changed, results)
+
+        dirty = bool(changed) or current.keys() != self._regions.keys()
+        self._regions, self._dimension_of = current, where
+        if dirty:
+            self._save_cache()
+        summary = self.last = self.summary(stale_days, now)
+        logger.info(
+            "Индекс мира: %d регионов, прочитано заголовков %d за %.2f с",
+            len(current),
+            len(changed),
+            time.perf_counter() - started,
+        )
+        return summary
+
+    @staticmethod
+    def _store(current: dict, changed: list, results):
+        for rel, stats in zip(changed, results):
+            if stats is not None:
+                current[rel] = stats
+
+    # ---- Сводки ----
+
+    def summary(self, stale_days=STALE_DAYS, now=None) -> list[DimensionSummary]:
+        """Сводка по измерениям последнего scan() без обращения к диску"""
+        moment = (now or time.time()) - stale_days * 86400
+        by_dimension = {dimension: [] for dimension in self.dimensions}
+        for rel, stats in self._regions.items():
+            dimension = self._dimension_of.get(rel)
+            if dimension in by_dimension:
+                by_dimension[dimension].append(stats)
+        result = []
+        for dimension, regions in by_dimension.items():
+            populated = [s for s in regions if s.chunks]
+            result.append(
+                DimensionSummary(
+                    dimension,
+                    len(regions),
+                    sum(s.chunks for s in regions),
+                    sum(s.size for s in regions),
+                    sum(s.sectors for s in regions) * SECTOR,
+                    min((s.timestamps[0] for s in populated), default=None),
+                    max((s.timestamps[-1] for s in populated), default=None),
+                    sum(s.count_older(moment) for s in regions),
+                )
+            )
+        return result
+
+    def stale_chunks(self, dimension: str, stale_days=STALE_DAYS, now=None) -> list:
+        """
+        Чанки измерения, не сохранявшиеся дольше stale_days дней:
+        (chunk_x, chunk_z, время последнего сохранения), старые первыми.
+        Заголовки регионов, где такие чанки есть, перечитываются.
+        """
+        moment = (now or time.time()) - stale_days * 86400
+        chunks = []
+        for rel, stats in self._regions.items():
+            if self._dimension_of.get(rel) != dimension:
+                continue
+            if not stats.count_older(moment):
+                continue
+            region_x, region_z = region_coords(rel)
+            try:
+                _, locations, timestamps, _ = read_header(
+                    os.path.join(self.server_dir, rel)
+                )
+            except FileNotFoundError:
+                continue
+            for index, (location, timestamp) in enumerate(zip(locations, timestamps)):
+                if location and timestamp < moment:
+                    x, z = region_x * 32 + index % 32, region_z * 32 + index // 32
+                    chunks.append((x, z, timestamp))
+        return sorted(chunks, key=lambda chunk: chunk[2])
+
+
+class WorldWatcher:
+    """
+    Индекс мира одного сервера: папка мира определяется заново при каждом
+    обновлении, поэтому смена скрипта запуска в настройках подхватывается.
+    Обходы из фоновой задачи и из API выполняются по одному: они меняют
+    общий индекс и пишут один файл кэша. on_change() вызывается после
+    каждого обхода (перерисовка без опроса серверов).
+    """
+
+    def __init__(self, manager, settings, on_change=None):
+        self.manager = manager
+        self.settings = settings
+        self.on_change = on_change
+        self.index = None
+        self._lock = threading.Lock()
+
+    @property
+    def summary(self) -> list[DimensionSummary] | None:
+        return self.index.last if self.index else None
+
+    def _stale_days(self) -> int:
+        return self.settings.get(SettingsField.WORLD_STALE_DAYS.value, STALE_DAYS)
+
+    def refresh(self) -> list[DimensionSummary] | None:
+        server_dir = self.manager.server_directory()
+        if not server_dir or not os.path.isdir(server_dir):
+            return None
+        with self._lock:
+            if self.index is None or self.index.server_dir != server_dir:
+                self.index = WorldIndex(server_dir)
+            return self.index.scan(self._stale_days())
+
+    def stale_chunks(self, dimension: str) -> list:
+        """WorldIndex.stale_chunks по последнему обходу; [] до первого"""
+        with self._lock:
+            if self.index is None:
+                return []
+            return self.index.stale_chunks(dimension, self._stale_days())
+
+    async def run(self, interval: float):
+        """Обновление в фоновом потоке раз в interval секунд"""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except OSError as e:
+                logger.warning("Индекс мира не обновлён: %s", e)
+            except Exception:
+                # Ошибка одного обхода не должна останавливать обновления
+                logger.exception("Индекс мира не обновлён")
+            if self.on_change:
+                self.on_change()
+            await asyncio.sleep(interval)